@@ -0,0 +1,118 @@
+"""Replay SSE transcripts through the streaming parser and time it.
+
+Usage:
+    python benchmarks/bench_sse.py                      # synthetic 150k-token transcript
+    python benchmarks/bench_sse.py --tokens 500000
+    python benchmarks/bench_sse.py recorded.sse ...     # raw bytes captured from OpenRouter
+
+Each transcript is cut into network-sized chunks and fed to both the
+original line-by-line loop (decode, ``json.loads``, ``+=``) and
+``forge.llm.sse``. The output checks that both produce the same text.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from forge.llm.sse import CONTENT, REASONING, ChunkAccumulator, iter_events  # noqa: E402
+
+
+def synthetic_transcript(tokens: int, reasoning_share: float = 0.2) -> bytes:
+    """OpenRouter-shaped SSE bytes with ``tokens`` single-token deltas."""
+
+    words = ["def", " value", "(", "self", "):", "\n", "    return", " 42", " #", " ok", "é", "✓"]
+    reasoning_tokens = int(tokens * reasoning_share)
+    frames = [b": OPENROUTER PROCESSING\n\n"]
+    for index in range(tokens):
+        key = "reasoning" if index < reasoning_tokens else "content"
+        delta = {key: words[index % len(words)]}
+        frames.append(b"data: " + json.dumps({"choices": [{"delta": delta}]}).encode() + b"\n\n")
+    frames.append(b'data: {"choices": [], "usage": {"completion_tokens": %d}}\n\n' % tokens)
+    frames.append(b"data: [DONE]\n\n")
+    return b"".join(frames)
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def baseline(chunks: list[bytes]) -> tuple[str, str]:
+    """The pre-parser loop: string buffer re-split, per-line decode and ``+=``."""
+
+    buffer = ""
+    full_response = ""
+    full_reasoning = ""
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8", errors="ignore")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if not line.startswith("data: "):
+                continue
+            if line == "data: [DONE]":
+                return full_response, full_reasoning
+            try:
+                delta = json.loads(line[6:]).get("choices", [{}])
+                delta = delta[0].get("delta", {}) if delta else {}
+                if delta.get("reasoning") is not None:
+                    full_reasoning += delta["reasoning"]
+                elif delta.get("content") is not None:
+                    full_response += delta["content"]
+            except Exception:
+                continue
+    return full_response, full_reasoning
+
+
+def parser(chunks: list[bytes]) -> tuple[str, str]:
+    content = ChunkAccumulator()
+    reasoning = ChunkAccumulator()
+    for event in iter_events(chunks):
+        if event.kind == CONTENT:
+            content.append(event.text)
+        elif event.kind == REASONING:
+            reasoning.append(event.text)
+    return content.getvalue(), reasoning.getvalue()
+
+
+def best_of(func, chunks: list[bytes], repeat: int) -> tuple[float, tuple[str, str]]:
+    best = float("inf")
+    result: tuple[str, str] = ("", "")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("transcripts", nargs="*", type=Path)
+    args.add_argument("--tokens", type=int, default=150_000)
+    args.add_argument("--chunk-size", type=int, default=1400)
+    args.add_argument("--repeat", type=int, default=3)
+    options = args.parse_args(argv)
+
+    transcripts = [(path.name, path.read_bytes()) for path in options.transcripts]
+    if not transcripts:
+        transcripts = [(f"synthetic-{options.tokens}", synthetic_transcript(options.tokens))]
+
+    for name, data in transcripts:
+        chunks = chunked(data, options.chunk_size)
+        old_time, old_result = best_of(baseline, chunks, options.repeat)
+        new_time, new_result = best_of(parser, chunks, options.repeat)
+        status = "match" if old_result == new_result else "MISMATCH"
+        print(
+            f"{name}: {len(data) / 1e6:.1f} MB in {len(chunks)} chunks | "
+            f"baseline {old_time * 1000:.0f} ms | parser {new_time * 1000:.0f} ms | "
+            f"speedup {old_time / new_time:.2f}x | output {status}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
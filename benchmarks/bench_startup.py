@@ -0,0 +1,77 @@
+"""Time how long ``import main`` takes, with a cold and a warm bytecode cache.
+
+Usage:
+    python benchmarks/bench_startup.py              # 5 cold/warm pairs
+    python benchmarks/bench_startup.py --runs 10 --top 15
+
+Each pair starts from an empty ``PYTHONPYCACHEPREFIX``. The cold run
+compiles every module it imports, and the warm run loads the bytecode
+the cold run wrote. Times come from ``-X importtime``: the cumulative
+time of ``main``, which is everything imported before the first prompt.
+The heaviest top-level imports of the last warm run are listed after
+the totals. ``tests/test_startup.py`` holds the budgets these numbers
+are checked against.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_times(pycache: str, cwd: str) -> dict[str, tuple[int, int, int]]:
+    """``name -> (self µs, cumulative µs, depth)`` for one ``import main``."""
+
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    env.update(
+        PYTHONPATH=str(ROOT),
+        PYTHONPYCACHEPREFIX=pycache,
+        OMNI_SEARCH_CACHE="0",
+        OMNI_UNDO_DB="0",
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=cwd, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(own), int(cumulative), depth)
+    return times
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--runs", type=int, default=5)
+    args.add_argument("--top", type=int, default=10)
+    options = args.parse_args(argv)
+
+    cold, warm = [], []
+    with tempfile.TemporaryDirectory(prefix="omni-startup-") as scratch:
+        for run in range(options.runs):
+            pycache = os.path.join(scratch, f"pyc{run}")
+            cold.append(import_times(pycache, scratch)["main"][1])
+            times = import_times(pycache, scratch)
+            warm.append(times["main"][1])
+
+    print(f"import main, cold: median {statistics.median(cold) / 1000:.0f} ms (min {min(cold) / 1000:.0f})")
+    print(f"import main, warm: median {statistics.median(warm) / 1000:.0f} ms (min {min(warm) / 1000:.0f})")
+    print("heaviest imports under main (last warm run):")
+    children = [(cumulative, name) for name, (_, cumulative, depth) in times.items() if depth == 1]
+    for cumulative, name in sorted(children, reverse=True)[: options.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,21 @@
+"""Headless batch runs of edit, prompt and shell jobs."""
+
+from .manifest import EDIT, EXEC, KINDS, PROMPT, BatchJob, Manifest, job_from_dict, load_manifest, parse_script
+from .runner import FAILED, OK, SKIPPED, dependencies, run_batch
+
+__all__ = [
+    "EDIT",
+    "EXEC",
+    "KINDS",
+    "PROMPT",
+    "BatchJob",
+    "Manifest",
+    "job_from_dict",
+    "load_manifest",
+    "parse_script",
+    "FAILED",
+    "OK",
+    "SKIPPED",
+    "dependencies",
+    "run_batch",
+]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import os
+import shlex
+from typing import Mapping
+
+
+EDIT = "edit"
+PROMPT = "prompt"
+EXEC = "exec"
+KINDS = (EDIT, PROMPT, EXEC)
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One unit of headless work: an edit, a prompt or a shell command."""
+
+    id: str
+    kind: str
+    text: str
+    files: tuple[str, ...] = ()
+    needs: tuple[str, ...] = ()
+    options: Mapping[str, object] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Manifest:
+    jobs: list[BatchJob]
+    concurrency: int | None = None
+
+
+def _strings(value: object, what: str) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return tuple(value)
+    raise ValueError(f"{what} must be a string or a list of strings")
+
+
+def job_from_dict(entry: Mapping[str, object], index: int, defaults: Mapping[str, object] = {}) -> BatchJob:
+    """Build a job from one manifest entry.
+
+    The kind comes from the key present: ``edit`` (files, with an
+    ``instruction``), ``prompt`` (text, optional context ``files``) or
+    ``exec`` (a shell command). Anything else is passed through as options.
+    """
+
+    if not isinstance(entry, Mapping):
+        raise ValueError(f"job {index + 1}: expected a mapping, got {type(entry).__name__}")
+    merged = {**defaults, **entry}
+    kinds = [kind for kind in KINDS if kind in entry]
+    if len(kinds) != 1:
+        raise ValueError(f"job {index + 1}: needs exactly one of {', '.join(KINDS)}")
+    kind = kinds[0]
+    job_id = str(merged.get("id") or f"{kind}-{index + 1}")
+    if kind == EDIT:
+        files = _strings(merged[EDIT], f"{job_id}: edit")
+        text = merged.get("instruction")
+        if not files or not isinstance(text, str) or not text.strip():
+            raise ValueError(f"{job_id}: an edit job needs files and an instruction")
+    else:
+        text = merged[kind]
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"{job_id}: {kind} must be a non-empty string")
+        files = _strings(merged.get("files"), f"{job_id}: files")
+    reserved = {EDIT, PROMPT, EXEC, "id", "instruction", "files", "needs"}
+    options = {key: value for key, value in merged.items() if key not in reserved}
+    return BatchJob(job_id, kind, text, files, _strings(merged.get("needs"), f"{job_id}: needs"), options)
+
+
+def parse_script(text: str) -> list[BatchJob]:
+    """Jobs from a line-per-job script.
+
+    ``/edit a.py b.py -- instruction`` edits, ``/exec command`` runs a
+    shell command and any other line is a prompt. Blank lines and lines
+    starting with ``#`` are skipped.
+    """
+
+    jobs = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        index = len(jobs)
+        if line.startswith("/edit "):
+            paths, separator, instruction = line[len("/edit "):].partition(" -- ")
+            if not separator:
+                raise ValueError(f"line {number}: use /edit <files> -- <instruction>")
+            jobs.append(job_from_dict({EDIT: shlex.split(paths), "instruction": instruction.strip()}, index))
+        elif line.startswith("/exec "):
+            jobs.append(job_from_dict({EXEC: line[len("/exec "):].strip()}, index))
+        else:
+            jobs.append(job_from_dict({PROMPT: line}, index))
+    return jobs
+
+
+def load_manifest(path: str) -> Manifest:
+    """Read a JSON or YAML manifest, or a line-per-job script (any other extension)."""
+
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ValueError("YAML manifests need the 'PyYAML' package; use JSON instead") from exc
+        data = yaml.safe_load(text)
+    elif extension == ".json":
+        data = json.loads(text)
+    else:
+        return Manifest(parse_script(text))
+
+    if isinstance(data, list):
+        data = {"jobs": data}
+    if not isinstance(data, Mapping) or not isinstance(data.get("jobs"), list):
+        raise ValueError("a manifest is a list of jobs or a mapping with a 'jobs' list")
+    defaults = data.get("defaults") or {}
+    jobs = [job_from_dict(entry, index, defaults) for index, entry in enumerate(data["jobs"])]
+    ids = [job.id for job in jobs]
+    duplicates = sorted({job_id for job_id in ids if ids.count(job_id) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate job ids: {', '.join(duplicates)}")
+    unknown = sorted({need for job in jobs for need in job.needs if need not in ids})
+    if unknown:
+        raise ValueError(f"unknown job ids in needs: {', '.join(unknown)}")
+    concurrency = data.get("concurrency")
+    return Manifest(jobs, int(concurrency) if concurrency else None)
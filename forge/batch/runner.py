@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Mapping
+
+from .manifest import BatchJob
+
+
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+Handler = Callable[[BatchJob, asyncio.Semaphore], Awaitable[Mapping[str, object]]]
+
+
+def dependencies(jobs: list[BatchJob]) -> dict[str, set[str]]:
+    """What each job waits for: its ``needs``, plus earlier jobs touching the same files.
+
+    Raises :class:`ValueError` on a cycle, which would otherwise hang the run.
+    """
+
+    graph: dict[str, set[str]] = {}
+    owners: dict[str, str] = {}
+    for job in jobs:
+        graph[job.id] = set(job.needs)
+        for path in job.files:
+            key = os.path.abspath(path)
+            if key in owners:
+                graph[job.id].add(owners[key])
+            owners[key] = job.id
+
+    visiting: set[str] = set()
+    done: set[str] = set()
+
+    def visit(job_id: str, trail: tuple[str, ...]) -> None:
+        if job_id in done:
+            return
+        if job_id in visiting:
+            raise ValueError(f"dependency cycle: {' -> '.join(trail + (job_id,))}")
+        visiting.add(job_id)
+        for need in graph.get(job_id, ()):
+            visit(need, trail + (job_id,))
+        visiting.discard(job_id)
+        done.add(job_id)
+
+    for job_id in graph:
+        visit(job_id, ())
+    return graph
+
+
+async def run_batch(
+    jobs: list[BatchJob],
+    handlers: Mapping[str, Handler],
+    *,
+    concurrency: int = 4,
+    emit: Callable[[dict[str, object]], None],
+) -> dict[str, object]:
+    """Run ``jobs`` concurrently and ``emit`` one record per job as each finishes.
+
+    Handlers share one semaphore of ``concurrency`` slots and take a slot
+    around each model stream or process they start, so the limit is
+    global, not per job. A job starts once everything it depends on has
+    finished; if a dependency did not succeed it is skipped. A handler
+    fails a job by raising, or by returning a mapping with an ``error``.
+    Returns the summary record, which is also emitted last.
+    """
+
+    graph = dependencies(jobs)
+    slots = asyncio.Semaphore(max(1, concurrency))
+    finished = {job.id: asyncio.Event() for job in jobs}
+    status: dict[str, str] = {}
+    started = time.perf_counter()
+
+    async def run(job: BatchJob) -> None:
+        for need in graph[job.id]:
+            await finished[need].wait()
+        blocked = sorted(need for need in graph[job.id] if status[need] != OK)
+        begin = time.perf_counter()
+        record: dict[str, object] = {"id": job.id, "kind": job.kind}
+        try:
+            if blocked:
+                record.update(status=SKIPPED, error=f"dependency did not succeed: {', '.join(blocked)}")
+            else:
+                result = dict(await handlers[job.kind](job, slots))
+                record.update(status=FAILED if result.get("error") else OK, **result)
+        except asyncio.CancelledError:
+            record.update(status=FAILED, error="cancelled")
+            raise
+        except Exception as exc:  # noqa: BLE001 - reported on the job's record
+            record.update(status=FAILED, error=str(exc) or type(exc).__name__)
+        finally:
+            record["elapsed"] = round(time.perf_counter() - begin, 3)
+            status[job.id] = str(record["status"])
+            finished[job.id].set()
+            emit(record)
+
+    await asyncio.gather(*(run(job) for job in jobs))
+    counts = {name: sum(value == name for value in status.values()) for name in (OK, FAILED, SKIPPED)}
+    summary = {"summary": {"jobs": len(jobs), **counts, "elapsed": round(time.perf_counter() - started, 3)}}
+    emit(summary)
+    return summary
@@ -0,0 +1,12 @@
+"""Terminal-facing helpers for the developer console."""
+
+from .jobs import Job, JobManager, OutputRing
+from .render import ProgressLine, StreamRenderer
+
+__all__ = [
+    "ProgressLine",
+    "StreamRenderer",
+    "Job",
+    "JobManager",
+    "OutputRing",
+]
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import os
+import signal
+import time
+from typing import Callable
+
+
+STDOUT = "stdout"
+STDERR = "stderr"
+READ_CHUNK = 64 * 1024
+MAX_LINE_BYTES = 64 * 1024  # Longer runs without a newline are split, so one line never grows unbounded
+
+LineListener = Callable[["Job", str, str], None]
+
+
+class OutputRing:
+    """The last ``max_lines`` lines of a command's output, capped at ``max_chars``."""
+
+    def __init__(self, max_lines: int = 2000, max_chars: int = 256 * 1024) -> None:
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.dropped = 0
+        self._lines: deque[tuple[str, str]] = deque()
+        self._chars = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, stream: str, line: str) -> None:
+        self._lines.append((stream, line))
+        self._chars += len(line)
+        while len(self._lines) > self.max_lines or (self._chars > self.max_chars and len(self._lines) > 1):
+            _, old = self._lines.popleft()
+            self._chars -= len(old)
+            self.dropped += 1
+
+    def tail(self, lines: int | None = None) -> list[tuple[str, str]]:
+        items = list(self._lines)
+        return items if lines is None else items[-lines:] if lines > 0 else []
+
+
+@dataclass
+class Job:
+    """One shell command, running or finished, and the tail of its output."""
+
+    id: int
+    command: str
+    process: asyncio.subprocess.Process
+    output: OutputRing
+    attach_lines: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    returncode: int | None = None
+    timed_out: bool = False
+    stopped: bool = False
+    reported: bool = False
+    listeners: list[LineListener] = field(default_factory=list)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def running(self) -> bool:
+        return not self.done.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def status(self) -> str:
+        if self.running:
+            return "running"
+        if self.timed_out:
+            return "timed out"
+        if self.stopped:
+            return "stopped"
+        return f"exit {self.returncode}"
+
+    def tail_text(self, lines: int | None = None) -> str:
+        return "\n".join(line for _, line in self.output.tail(lines))
+
+    def context_message(self, lines: int) -> dict[str, object]:
+        """A chat message with the last ``lines`` lines, for the model to read."""
+
+        kept = self.output.tail(lines)
+        skipped = len(self.output) + self.output.dropped - len(kept)
+        note = f" (last {len(kept)} lines, {skipped} earlier lines omitted)" if skipped else ""
+        return {
+            "role": "user",
+            "content": f"Output of `{self.command}` ({self.status}){note}:\n```\n{self.tail_text(lines)}\n```",
+        }
+
+
+class JobManager:
+    """Run shell commands with line-by-line streamed output, in the foreground or background.
+
+    stdout and stderr are read as they arrive and each line goes to the
+    job's listeners and into a bounded :class:`OutputRing`, so a chatty
+    command never holds more than the ring in memory. Output without
+    newlines is cut into lines of at most ``MAX_LINE_BYTES``. A timeout, or
+    cancelling the task awaiting :meth:`run`, terminates the process
+    (then kills it if it ignores ``SIGTERM``).
+    """
+
+    def __init__(self, *, ring_lines: int = 2000, ring_chars: int = 256 * 1024, grace: float = 2.0) -> None:
+        self.ring_lines = ring_lines
+        self.ring_chars = ring_chars
+        self.grace = grace
+        self.jobs: dict[int, Job] = {}
+        self._next_id = 1
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(
+        self,
+        command: str,
+        *,
+        timeout: float | None = None,
+        attach_lines: int = 0,
+        listener: LineListener | None = None,
+    ) -> Job:
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",  # Own process group: signals reach the whole pipeline
+        )
+        job = Job(self._next_id, command, process, OutputRing(self.ring_lines, self.ring_chars), attach_lines)
+        if listener is not None:
+            job.listeners.append(listener)
+        self.jobs[job.id] = job
+        self._next_id += 1
+        task = asyncio.create_task(self._supervise(job, timeout))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _pump(self, job: Job, stream: asyncio.StreamReader, name: str) -> None:
+        pending = bytearray()
+        while True:
+            chunk = await stream.read(READ_CHUNK)
+            if not chunk:
+                break
+            pending += chunk
+            start = 0
+            while (end := pending.find(b"\n", start)) >= 0:
+                self._emit(job, name, bytes(pending[start:end]))
+                start = end + 1
+            while len(pending) - start >= MAX_LINE_BYTES:
+                self._emit(job, name, bytes(pending[start:start + MAX_LINE_BYTES]))
+                start += MAX_LINE_BYTES
+            del pending[:start]
+        if pending:
+            self._emit(job, name, bytes(pending))
+
+    def _emit(self, job: Job, name: str, raw: bytes) -> None:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r")
+        job.output.append(name, line)
+        for listener in list(job.listeners):
+            listener(job, name, line)
+
+    async def _supervise(self, job: Job, timeout: float | None) -> None:
+        pumps = asyncio.gather(
+            self._pump(job, job.process.stdout, STDOUT), self._pump(job, job.process.stderr, STDERR)
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(pumps), timeout)
+        except asyncio.TimeoutError:
+            job.timed_out = True
+            await self._terminate(job)
+        finally:
+            try:
+                await pumps
+            except Exception:  # Pipe errors after a kill; the ring keeps what arrived
+                pass
+            job.returncode = await job.process.wait()
+            job.finished = time.monotonic()
+            job.done.set()
+
+    @staticmethod
+    def _signal(job: Job, sig: int) -> None:
+        try:
+            if os.name == "posix":
+                os.killpg(job.process.pid, sig)
+            elif sig == signal.SIGTERM:
+                job.process.terminate()
+            else:
+                job.process.kill()
+        except ProcessLookupError:
+            pass
+
+    async def _terminate(self, job: Job) -> None:
+        if job.process.returncode is not None:
+            return
+        self._signal(job, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(job.process.wait(), self.grace)
+        except asyncio.TimeoutError:
+            self._signal(job, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    async def stop(self, job: Job) -> None:
+        """Terminate ``job`` and wait until its output is drained."""
+
+        if job.running:
+            job.stopped = True
+            await self._terminate(job)
+        await job.done.wait()
+
+    async def wait(self, job: Job, listener: LineListener | None = None) -> Job:
+        """Follow ``job`` until it exits; cancelling this stops the job."""
+
+        if listener is not None:
+            job.listeners.append(listener)
+        try:
+            await job.done.wait()
+        except asyncio.CancelledError:
+            await asyncio.shield(self.stop(job))
+            raise
+        finally:
+            if listener is not None and listener in job.listeners:
+                job.listeners.remove(listener)
+        return job
+
+    async def run(self, command: str, listener: LineListener, *, timeout: float | None = None, attach_lines: int = 0) -> Job:
+        """Run ``command`` in the foreground, streaming every line to ``listener``."""
+
+        job = await self.start(command, timeout=timeout, attach_lines=attach_lines, listener=listener)
+        job.reported = True  # Its exit is shown in place, not as a background notice
+        return await self.wait(job)
+
+    def get(self, job_id: int | None = None) -> Job | None:
+        """Job by id, or the most recent running one."""
+
+        if job_id is not None:
+            return self.jobs.get(job_id)
+        running = [job for job in self.jobs.values() if job.running]
+        return running[-1] if running else None
+
+    def finished_unreported(self) -> list[Job]:
+        """Jobs that exited since the last call, each returned once."""
+
+        finished = [job for job in self.jobs.values() if not job.running and not job.reported]
+        for job in finished:
+            job.reported = True
+        return finished
+
+    def forget_finished(self) -> None:
+        self.jobs = {job_id: job for job_id, job in self.jobs.items() if job.running or not job.reported}
+
+    async def shutdown(self) -> None:
+        for job in list(self.jobs.values()):
+            if job.running:
+                await self.stop(job)
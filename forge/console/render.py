@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import Callable, TextIO
+
+
+RESET = "\x1b[0m"
+
+
+class StreamRenderer:
+    """Coalesce streamed deltas and write them at a bounded frame rate.
+
+    Text is buffered and written at most ``fps`` times per second in one
+    ``write`` + ``flush``; colour codes are emitted only when the colour
+    actually changes. Under a running event loop a flush is scheduled so
+    buffered text never waits more than one frame for the next delta.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        fps: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.stream = stream or sys.stdout
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.clock = clock
+        self.frames = 0
+        self._parts: list[str] = []
+        self._color: str | None = None
+        self._last_flush = float("-inf")
+        self._scheduled: asyncio.TimerHandle | None = None
+
+    def write(self, text: str, color: str = "") -> None:
+        if not text:
+            return
+        if color != self._color:
+            self._parts.append(RESET + color if self._color else color)
+            self._color = color
+        self._parts.append(text)
+        now = self.clock()
+        if now - self._last_flush >= self.interval:
+            self.flush()
+        else:
+            self._schedule(self._last_flush + self.interval - now)
+
+    def _schedule(self, delay: float) -> None:
+        if self._scheduled is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._scheduled = loop.call_later(max(delay, 0.0), self.flush)
+
+    def flush(self) -> None:
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self.stream.flush()
+            self._parts = []
+            self.frames += 1
+        self._last_flush = self.clock()
+
+    def close(self) -> None:
+        """Write anything buffered and restore the default colour."""
+
+        if self._color:
+            self._parts.append(RESET)
+            self._color = None
+        self.flush()
+
+
+class ProgressLine:
+    """A single self-overwriting status line, redrawn at a bounded rate."""
+
+    def __init__(
+        self,
+        label: str,
+        stream: TextIO | None = None,
+        fps: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.label = label
+        self.stream = stream or sys.stdout
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.clock = clock
+        self._last_draw = float("-inf")
+        self._width = 0
+
+    def _draw(self, text: str, end: str = "") -> None:
+        padding = " " * max(self._width - len(text), 0)
+        self.stream.write(f"\r{text}{padding}{end}")
+        self.stream.flush()
+        self._width = len(text)
+        self._last_draw = self.clock()
+
+    def update(self, status: str) -> None:
+        if self.clock() - self._last_draw >= self.interval:
+            self._draw(f"{self.label} {status}")
+
+    def done(self, status: str) -> None:
+        self._draw(f"{self.label} {status}", end="\n")
@@ -0,0 +1,60 @@
+"""Chat-history context management for the developer console."""
+
+from .budget import (
+    MODEL_CONTEXT_LIMITS,
+    POLICIES,
+    ContextWindow,
+    Eviction,
+    EvictionPolicy,
+    FitReport,
+    LargestFirst,
+    OldestFirst,
+    OldestLargestFirst,
+    context_limit_for,
+    estimate_tokens,
+    is_pinned,
+)
+from .compaction import SUMMARY_PROMPT, CompactionResult, Compactor, render_transcript
+from .ingest import DEFAULT_EXCLUDES, TEXT_SAMPLE_BYTES, IgnoreRules, IngestReport, ingest_tree, looks_like_text, walk_tree
+from .filecache import CachedFile, FileCache
+from .blobs import BLOB_SCHEME, BlobStore, blob_refs
+from .files import ADDED, UNCHANGED, UPDATED, FileContext, FileContextTable, FileUpdate, compact_diff, content_digest
+
+__all__ = [
+    "MODEL_CONTEXT_LIMITS",
+    "POLICIES",
+    "ContextWindow",
+    "Eviction",
+    "EvictionPolicy",
+    "FitReport",
+    "LargestFirst",
+    "OldestFirst",
+    "OldestLargestFirst",
+    "context_limit_for",
+    "estimate_tokens",
+    "is_pinned",
+    "SUMMARY_PROMPT",
+    "CompactionResult",
+    "Compactor",
+    "render_transcript",
+    "ADDED",
+    "UNCHANGED",
+    "UPDATED",
+    "FileContext",
+    "FileContextTable",
+    "FileUpdate",
+    "compact_diff",
+    "content_digest",
+    "DEFAULT_EXCLUDES",
+    "TEXT_SAMPLE_BYTES",
+    "IgnoreRules",
+    "IngestReport",
+    "ingest_tree",
+    "looks_like_text",
+    "walk_tree",
+    "CachedFile",
+    "FileCache",
+    "BLOB_SCHEME",
+    "BlobStore",
+    "blob_refs",
+]
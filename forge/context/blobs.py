@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Iterable, Mapping
+
+from .budget import Message
+
+
+BLOB_SCHEME = "omni-blob:"
+BLOB_KEY = "_blob"
+CHARS_KEY = "_chars"
+PREVIEW_CHARS = 240
+
+
+class BlobStore:
+    """Content-addressed store for large message payloads.
+
+    Messages keep a reference (``_blob`` for text, an ``omni-blob:`` URL for
+    image parts) instead of the payload, so the same file dump or data URI
+    is held once however often it is referenced. Recently used blobs stay
+    in memory up to ``hot_bytes``; colder ones spill to files in
+    ``spill_dir`` (a temp directory made on the first spill, and removed
+    by :meth:`close`, when none is given). :meth:`materialize` swaps payloads back in only when a
+    request is being serialized.
+    """
+
+    def __init__(self, spill_dir: str | None = None, *, hot_bytes: int = 32 * 1024 * 1024) -> None:
+        self.hot_bytes = hot_bytes
+        self._owns_dir = spill_dir is None
+        self.spill_dir = spill_dir
+        self._hot: OrderedDict[str, str] = OrderedDict()
+        self._hot_size = 0
+        self._spilled: dict[str, int] = {}
+
+    def __contains__(self, digest: object) -> bool:
+        return digest in self._hot or digest in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._spilled)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.spill_dir, digest)
+
+    def _ensure_spill_dir(self) -> None:
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="omni-blobs-")
+        else:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    def put(self, data: str) -> str:
+        digest = hashlib.sha256(data.encode("utf-8", errors="surrogatepass")).hexdigest()
+        if digest in self._hot:
+            self._hot.move_to_end(digest)
+        elif digest not in self._spilled:
+            self._hot[digest] = data
+            self._hot_size += len(data)
+            self._spill()
+        return digest
+
+    def get(self, digest: str) -> str:
+        data = self._hot.get(digest)
+        if data is not None:
+            self._hot.move_to_end(digest)
+            return data
+        if digest not in self._spilled:
+            raise KeyError(digest)
+        with open(self._path(digest), "r", encoding="utf-8", errors="surrogatepass") as handle:
+            data = handle.read()
+        del self._spilled[digest]
+        os.remove(self._path(digest))
+        self._hot[digest] = data
+        self._hot_size += len(data)
+        self._spill(keep=digest)
+        return data
+
+    def _spill(self, keep: str | None = None) -> None:
+        while self._hot_size > self.hot_bytes and len(self._hot) > 1:
+            digest = next(iter(self._hot))
+            if digest == keep:
+                self._hot.move_to_end(digest)
+                digest = next(iter(self._hot))
+            data = self._hot.pop(digest)
+            self._hot_size -= len(data)
+            self._ensure_spill_dir()
+            with open(self._path(digest), "w", encoding="utf-8", errors="surrogatepass") as handle:
+                handle.write(data)
+            self._spilled[digest] = len(data)
+
+    def discard(self, digest: str) -> None:
+        data = self._hot.pop(digest, None)
+        if data is not None:
+            self._hot_size -= len(data)
+        if self._spilled.pop(digest, None) is not None:
+            os.remove(self._path(digest))
+
+    def collect(self, *histories: Iterable[Message], extra: Iterable[str] = ()) -> int:
+        """Drop blobs no longer referenced by ``histories`` or ``extra``; returns the count."""
+
+        live = set(extra)
+        for history in histories:
+            for message in history:
+                live.update(blob_refs(message))
+        dead = [digest for digest in [*self._hot, *self._spilled] if digest not in live]
+        for digest in dead:
+            self.discard(digest)
+        return len(dead)
+
+    def clear(self) -> None:
+        for digest in [*self._hot, *self._spilled]:
+            self.discard(digest)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "blobs": len(self),
+            "hot_bytes": self._hot_size,
+            "spilled": len(self._spilled),
+            "spilled_bytes": sum(self._spilled.values()),
+        }
+
+    def close(self) -> None:
+        self.clear()
+        if self._owns_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+
+    # Message helpers
+
+    def offload(self, message: Message, *, min_chars: int = 4096) -> Message:
+        """``message`` with large text and data-URI images replaced by references.
+
+        Text of at least ``min_chars`` is stored and the message keeps a
+        short preview, so local views (``/history``, token estimates,
+        compaction transcripts) stay cheap without touching the blob.
+        """
+
+        content = message.get("content")
+        if BLOB_KEY in message:
+            return message
+        if isinstance(content, str) and len(content) >= min_chars:
+            preview = content[:PREVIEW_CHARS].rstrip() + f" … [{len(content):,} chars]"
+            return {**message, "content": preview, BLOB_KEY: self.put(content), CHARS_KEY: len(content)}
+        if isinstance(content, list) and any(_data_url(part) for part in content):
+            parts = [self.image_part(_data_url(part)) if _data_url(part) else part for part in content]
+            return {**message, "content": parts}
+        return message
+
+    def image_part(self, url: str) -> dict[str, object]:
+        """An ``image_url`` part; data URIs are stored and referenced, links kept inline."""
+
+        if url.startswith("data:"):
+            url = BLOB_SCHEME + self.put(url)
+        return {"type": "image_url", "image_url": {"url": url}}
+
+    def resolve_url(self, url: str) -> str:
+        return self.get(url[len(BLOB_SCHEME):]) if url.startswith(BLOB_SCHEME) else url
+
+    def materialize(self, message: Message) -> Message:
+        """The message with its payloads swapped back in (a copy; the original is untouched)."""
+
+        content = message.get("content")
+        if BLOB_KEY in message:
+            resolved = {key: value for key, value in message.items() if key not in (BLOB_KEY, CHARS_KEY)}
+            resolved["content"] = self.get(str(message[BLOB_KEY]))
+            return resolved
+        if isinstance(content, list) and any(_ref_url(part) for part in content):
+            parts = [
+                {**part, "image_url": {**part["image_url"], "url": self.resolve_url(url)}} if (url := _ref_url(part)) else part
+                for part in content
+            ]
+            return {**message, "content": parts}
+        return message
+
+
+def _part_url(part: object) -> str:
+    if isinstance(part, Mapping) and isinstance(part.get("image_url"), Mapping):
+        url = part["image_url"].get("url", "")
+        return url if isinstance(url, str) else ""
+    return ""
+
+
+def _ref_url(part: object) -> str:
+    url = _part_url(part)
+    return url if url.startswith(BLOB_SCHEME) else ""
+
+
+def _data_url(part: object) -> str:
+    url = _part_url(part)
+    return url if url.startswith("data:") else ""
+
+
+def blob_refs(message: Mapping[str, object]) -> list[str]:
+    """Digests a message points at."""
+
+    refs = [str(message[BLOB_KEY])] if BLOB_KEY in message else []
+    content = message.get("content")
+    if isinstance(content, list):
+        refs.extend(_ref_url(part)[len(BLOB_SCHEME):] for part in content if _ref_url(part))
+    return refs
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+from typing import Callable, Mapping, Protocol, Sequence
+
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+IMAGE_TOKENS = 1000
+DEFAULT_CONTEXT_LIMIT = 128_000
+TRUNCATION_MARKER = "\n[… {dropped} tokens truncated to fit the context budget …]\n"
+
+# Longest matching prefix wins; values are total context windows in tokens.
+MODEL_CONTEXT_LIMITS: Mapping[str, int] = {
+    "anthropic/": 200_000,
+    "google/gemini": 1_000_000,
+    "openai/gpt-4o": 128_000,
+    "openai/o1": 128_000,
+    "meta-llama/": 128_000,
+    "mistralai/": 128_000,
+}
+
+Message = dict[str, object]
+
+
+def estimate_text_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_tokens(message: Mapping[str, object]) -> int:
+    """Cheap local token estimate: ~4 characters per token, flat cost per image."""
+
+    content = message.get("content")
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    if "_chars" in message:  # Blob-backed: count the stored payload, not the preview
+        tokens += math.ceil(int(message["_chars"]) / CHARS_PER_TOKEN)
+    elif isinstance(content, str):
+        tokens += estimate_text_tokens(content)
+    elif isinstance(content, list):
+        for part in content:
+            if not isinstance(part, Mapping):
+                continue
+            if part.get("type") == "text":
+                tokens += estimate_text_tokens(str(part.get("text", "")))
+            else:
+                tokens += IMAGE_TOKENS
+    return tokens
+
+
+def context_limit_for(model: str, limits: Mapping[str, int] = MODEL_CONTEXT_LIMITS) -> int:
+    matches = [prefix for prefix in limits if model.startswith(prefix)]
+    return limits[max(matches, key=len)] if matches else DEFAULT_CONTEXT_LIMIT
+
+
+def is_pinned(message: Mapping[str, object]) -> bool:
+    """System prompts and messages flagged ``_pinned`` are never evicted."""
+
+    return message.get("role") == "system" or bool(message.get("_pinned"))
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """An evictable message with its position and estimated size."""
+
+    index: int
+    tokens: int
+
+
+class EvictionPolicy(Protocol):
+    def order(self, candidates: Sequence[Candidate]) -> list[Candidate]:
+        """Return candidates in the order they should be evicted."""
+
+
+class OldestFirst:
+    """Least recently added first: history order is recency order."""
+
+    def order(self, candidates: Sequence[Candidate]) -> list[Candidate]:
+        return sorted(candidates, key=lambda candidate: candidate.index)
+
+
+class LargestFirst:
+    """Biggest blocks first, oldest first among equals."""
+
+    def order(self, candidates: Sequence[Candidate]) -> list[Candidate]:
+        return sorted(candidates, key=lambda candidate: (-candidate.tokens, candidate.index))
+
+
+class OldestLargestFirst:
+    """Oldest half of the history first, biggest blocks first within it."""
+
+    def order(self, candidates: Sequence[Candidate]) -> list[Candidate]:
+        if not candidates:
+            return []
+        middle = sorted(candidate.index for candidate in candidates)[len(candidates) // 2]
+        return sorted(
+            candidates,
+            key=lambda candidate: (candidate.index >= middle, -candidate.tokens, candidate.index),
+        )
+
+
+POLICIES: Mapping[str, Callable[[], EvictionPolicy]] = {
+    "oldest": OldestFirst,
+    "largest": LargestFirst,
+    "oldest-largest": OldestLargestFirst,
+}
+
+
+@dataclass(frozen=True)
+class Eviction:
+    """One message dropped or shortened to fit the budget."""
+
+    index: int
+    role: str
+    action: str
+    tokens_freed: int
+    preview: str
+
+
+@dataclass
+class FitReport:
+    """What :meth:`ContextWindow.fit` did to a history."""
+
+    budget: int
+    tokens_before: int
+    tokens_after: int
+    evictions: list[Eviction] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.evictions)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens_after > self.budget
+
+
+def _preview(message: Mapping[str, object], width: int = 60) -> str:
+    content = message.get("content")
+    text = content if isinstance(content, str) else "[image/multipart content]"
+    text = " ".join(text.split())
+    return text[:width] + ("…" if len(text) > width else "")
+
+
+class ContextWindow:
+    """Keep a chat history inside a per-model token budget.
+
+    Before each request :meth:`fit` evicts or truncates messages in the
+    order chosen by ``policy``. Pinned messages and the newest
+    ``keep_recent`` messages are never touched. Text blocks much larger
+    than ``truncate_to`` tokens are cut down to their head instead of being
+    dropped outright; blob-backed messages are only ever dropped whole.
+    """
+
+    def __init__(
+        self,
+        policy: EvictionPolicy | None = None,
+        *,
+        reserve_tokens: int = 10_000,
+        budget_override: int | None = None,
+        keep_recent: int = 4,
+        truncate_to: int = 2_000,
+        pinned: Callable[[Mapping[str, object]], bool] = is_pinned,
+    ) -> None:
+        self.policy = policy or OldestLargestFirst()
+        self.reserve_tokens = reserve_tokens
+        self.budget_override = budget_override
+        self.keep_recent = keep_recent
+        self.truncate_to = truncate_to
+        self.pinned = pinned
+
+    def budget_for(self, model: str) -> int:
+        if self.budget_override:
+            return self.budget_override
+        return max(context_limit_for(model) - self.reserve_tokens, 1)
+
+    def _truncate(self, message: Message, tokens: int) -> int | None:
+        """Cut an oversized text block down to its head; returns tokens freed."""
+
+        content = message.get("content")
+        if not isinstance(content, str) or "_blob" in message or tokens <= self.truncate_to * 2:
+            return None
+        keep_chars = self.truncate_to * CHARS_PER_TOKEN
+        dropped = estimate_text_tokens(content[keep_chars:])
+        message["content"] = content[:keep_chars] + TRUNCATION_MARKER.format(dropped=dropped)
+        return tokens - estimate_tokens(message)
+
+    def fit(self, messages: list[Message], model: str) -> FitReport:
+        """Shrink ``messages`` in place until it fits the budget for ``model``."""
+
+        sizes = [estimate_tokens(message) for message in messages]
+        total = sum(sizes)
+        report = FitReport(self.budget_for(model), total, total)
+        if total <= report.budget:
+            return report
+
+        protected_from = max(len(messages) - self.keep_recent, 0)
+        candidates = [
+            Candidate(index, sizes[index])
+            for index in range(protected_from)
+            if not self.pinned(messages[index])
+        ]
+        dropped: set[int] = set()
+        for candidate in self.policy.order(candidates):
+            if total <= report.budget:
+                break
+            message = messages[candidate.index]
+            role = str(message.get("role"))
+            freed = self._truncate(message, candidate.tokens)
+            if freed is not None:
+                total -= freed
+                report.evictions.append(Eviction(candidate.index, role, "truncated", freed, _preview(message)))
+                continue
+            dropped.add(candidate.index)
+            total -= candidate.tokens
+            report.evictions.append(Eviction(candidate.index, role, "dropped", candidate.tokens, _preview(message)))
+
+        if dropped:
+            messages[:] = [message for index, message in enumerate(messages) if index not in dropped]
+        report.tokens_after = total
+        return report
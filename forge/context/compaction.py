@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Mapping
+
+from .budget import Message, estimate_tokens, is_pinned
+
+
+SUMMARY_PROMPT = """You compress developer-assistant conversations.
+Summarize the transcript you are given so the assistant can keep working without it:
+- Keep decisions, requirements, file names, function names, commands, errors and open questions.
+- Keep short code snippets only when they are essential.
+- Drop pleasantries and repetition. Use terse bullet points.
+Output only the summary."""
+
+SUMMARY_PREFIX = "Summary of the earlier conversation (compacted):\n"
+
+
+def render_transcript(messages: list[Message], materialize: Callable[[Message], Message] | None = None) -> str:
+    """Flatten messages into ``ROLE: text`` blocks for the summarizer.
+
+    ``materialize`` swaps stored payloads back in, so blob-backed messages
+    are summarized from their content rather than their preview.
+    """
+
+    blocks = []
+    for message in messages:
+        if materialize is not None:
+            message = materialize(message)
+        content = message.get("content")
+        if isinstance(content, list):
+            parts = [
+                str(part.get("text", "")) if isinstance(part, Mapping) and part.get("type") == "text" else "[image]"
+                for part in content
+            ]
+            content = " ".join(parts)
+        blocks.append(f"{str(message.get('role', 'user')).upper()}: {content}")
+    return "\n\n".join(blocks)
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    """Outcome of one swap: how many turns collapsed and the tokens saved."""
+
+    replaced: int
+    tokens_before: int
+    tokens_after: int
+
+
+class Compactor:
+    """Summarize old turns in the background and swap them in between requests.
+
+    :meth:`maybe_start` launches a summarizer task once the history passes
+    ``threshold_tokens``. The task works on a snapshot; :meth:`apply`
+    later replaces exactly those message objects with one summary message
+    in a single list assignment. System prompts, pinned messages and the
+    newest ``keep_recent`` messages are never summarized.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str], Awaitable[str]],
+        *,
+        threshold_tokens: int = 24_000,
+        keep_recent: int = 6,
+        min_messages: int = 4,
+        pinned: Callable[[Mapping[str, object]], bool] = is_pinned,
+        materialize: Callable[[Message], Message] | None = None,
+    ) -> None:
+        self.summarize = summarize
+        self.threshold_tokens = threshold_tokens
+        self.keep_recent = keep_recent
+        self.min_messages = min_messages
+        self.pinned = pinned
+        self.materialize = materialize
+        self._task: asyncio.Task[str] | None = None
+        self._planned: list[Message] = []
+        self.last_error: BaseException | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def plan(self, messages: list[Message]) -> list[Message]:
+        """The old, unpinned user/assistant messages that would be summarized."""
+
+        cutoff = max(len(messages) - self.keep_recent, 0)
+        return [
+            message for message in messages[:cutoff]
+            if message.get("role") in ("user", "assistant") and not self.pinned(message)
+        ]
+
+    def maybe_start(self, messages: list[Message]) -> bool:
+        """Kick off a background summary if the history has grown past the threshold."""
+
+        if self._task is not None:
+            return False
+        if sum(estimate_tokens(message) for message in messages) <= self.threshold_tokens:
+            return False
+        planned = self.plan(messages)
+        if len(planned) < self.min_messages:
+            return False
+        self._planned = planned
+        self._task = asyncio.ensure_future(self.summarize(render_transcript(planned, self.materialize)))
+        return True
+
+    def apply(self, messages: list[Message]) -> CompactionResult | None:
+        """Swap a finished summary into ``messages``; a no-op while it is still running."""
+
+        if self._task is None or not self._task.done():
+            return None
+        task, planned = self._task, self._planned
+        self._task, self._planned = None, []
+        if task.cancelled():
+            return None
+        self.last_error = task.exception()
+        summary = None if self.last_error else task.result().strip()
+        planned_ids = {id(message) for message in planned}
+        present = [message for message in messages if id(message) in planned_ids]
+        if not summary or not present:
+            return None
+
+        tokens_before = sum(estimate_tokens(message) for message in messages)
+        summary_message: Message = {"role": "user", "content": SUMMARY_PREFIX + summary, "_summary": True}
+        compacted: list[Message] = []
+        inserted = False
+        for message in messages:
+            if id(message) not in planned_ids:
+                compacted.append(message)
+            elif not inserted:
+                compacted.append(summary_message)
+                inserted = True
+        messages[:] = compacted
+        tokens_after = sum(estimate_tokens(message) for message in messages)
+        return CompactionResult(len(present), tokens_before, tokens_after)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._task, self._planned = None, []
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import mmap
+import os
+import threading
+
+from .files import content_digest
+from .ingest import TEXT_SAMPLE_BYTES, looks_like_text
+
+
+StatKey = tuple[str, int, int, int]
+
+
+def _stat_key(path: str) -> StatKey:
+    absolute = os.path.abspath(path)
+    info = os.stat(absolute)
+    return absolute, info.st_ino, info.st_mtime_ns, info.st_size
+
+
+def _universal_newlines(text: str) -> str:
+    """Match what ``open(path, "r")`` returns, so cached text reads the same."""
+
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+@dataclass
+class CachedFile:
+    """Everything derived from one version of a file, filled in lazily."""
+
+    key: StatKey
+    size: int
+    is_text: bool
+    _raw: bytes | mmap.mmap | None = None
+    _text: str | None = None
+    _digest: str | None = None
+    _line_starts: list[int] | None = field(default=None, repr=False)
+
+    @property
+    def path(self) -> str:
+        return self.key[0]
+
+    @property
+    def text(self) -> str:
+        """Decoded UTF-8 text; raises ``UnicodeDecodeError`` for binary content."""
+
+        if self._text is None:
+            raw = self._raw if self._raw is not None else b""
+            self._text = _universal_newlines(bytes(raw[:]).decode("utf-8"))
+            self._raw = None  # The text is the content now; drop the bytes or mapping
+        return self._text
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = content_digest(self.text)
+        return self._digest
+
+    @property
+    def line_starts(self) -> list[int]:
+        """Offset in :attr:`text` where each line begins."""
+
+        if self._line_starts is None:
+            text, starts, index = self.text, [0], -1
+            while True:
+                index = text.find("\n", index + 1)
+                if index == -1 or index + 1 == len(text):
+                    break
+                starts.append(index + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_count(self) -> int:
+        return len(self.line_starts) if self.text else 0
+
+    def line_at(self, offset: int) -> int:
+        """Zero-based line number containing character ``offset``."""
+
+        return bisect_right(self.line_starts, offset) - 1
+
+    def lines(self, start: int, stop: int | None = None) -> str:
+        """Lines ``start:stop`` (zero-based) without splitting the whole file."""
+
+        starts = self.line_starts
+        begin = starts[start] if start < len(starts) else len(self.text)
+        end = starts[stop] if stop is not None and stop < len(starts) else len(self.text)
+        return self.text[begin:end]
+
+
+class FileCache:
+    """Process-wide cache of file contents keyed by ``(path, inode, mtime_ns, size)``.
+
+    A hit costs one ``os.stat``; any change to the file produces a new key,
+    so stale entries are never served even when another program edits the
+    file. Entries are evicted least recently used once their sizes add up
+    to more than ``max_bytes``. Files of ``mmap_threshold`` bytes or more
+    are mapped rather than read, so the text/binary check touches only
+    their first page and the bytes are decoded only when text is requested.
+    Writers in this process should still call :meth:`invalidate`, because
+    coarse filesystem timestamps can hide a same-size rewrite.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, mmap_threshold: int = 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedFile] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._bytes
+
+    def _load(self, key: StatKey) -> CachedFile:
+        path, size = key[0], key[3]
+        with open(path, "rb") as handle:
+            if size and size >= self.mmap_threshold:
+                raw: bytes | mmap.mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raw = handle.read()
+        return CachedFile(key, size, looks_like_text(raw[:TEXT_SAMPLE_BYTES]), raw)
+
+    def get(self, path: str) -> CachedFile:
+        """The cached entry for the current version of ``path``; raises ``OSError``."""
+
+        key = _stat_key(path)
+        with self._lock:
+            entry = self._entries.get(key[0])
+            if entry is not None and entry.key == key:
+                self._entries.move_to_end(key[0])
+                self.hits += 1
+                return entry
+        loaded = self._load(key)
+        with self._lock:
+            self.misses += 1
+            self._discard(key[0])
+            self._entries[key[0]] = loaded
+            self._bytes += loaded.size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._discard(next(iter(self._entries)))
+        return loaded
+
+    def read_text(self, path: str) -> str:
+        return self.get(path).text
+
+    def read_if_text(self, path: str) -> str | None:
+        """Text of ``path``, or ``None`` if it looks binary or is not UTF-8."""
+
+        entry = self.get(path)
+        if not entry.is_text:
+            return None
+        try:
+            return entry.text
+        except UnicodeDecodeError:
+            return None
+
+    def is_text(self, path: str) -> bool:
+        try:
+            return self.get(path).is_text
+        except OSError:
+            return False
+
+    def _discard(self, absolute: str) -> None:
+        entry = self._entries.pop(absolute, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._discard(os.path.abspath(path))
+
+    def clear(self) -> None:
+        with self._lock:
+            for absolute in list(self._entries):
+                self._discard(absolute)
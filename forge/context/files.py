@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import difflib
+import hashlib
+
+from .budget import Message
+
+
+ADDED = "added"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+
+def content_digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def compact_diff(path: str, old: str, new: str, context: int = 2) -> str:
+    """Unified diff from the copy the model holds to the current text."""
+
+    lines = difflib.unified_diff(
+        old.splitlines(), new.splitlines(), f"a/{path}", f"b/{path}", n=context, lineterm=""
+    )
+    return "\n".join(lines)
+
+
+@dataclass
+class FileContext:
+    """The version of one file the model has seen, and the messages that carry it.
+
+    Each carrier is a message plus the exact content object it was sent
+    with, so eviction, truncation or compaction of any of them is noticed.
+    """
+
+    path: str
+    digest: str
+    carriers: list[tuple[Message, object]] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class FileUpdate:
+    """What a ``/add`` needs to send for one file."""
+
+    path: str
+    kind: str
+    digest: str
+    body: str = ""
+
+    def render(self) -> str:
+        if self.kind == ADDED:
+            return f"The following file has been added: {self.path}:\n\n{self.body}\n\n"
+        if self.kind == UPDATED:
+            return (
+                f"The following file has changed since you last saw it: {self.path}\n"
+                f"Apply this diff to your copy:\n```diff\n{self.body}\n```\n\n"
+            )
+        return ""
+
+
+class FileContextTable:
+    """Content-addressed record of the file versions already in a chat history.
+
+    Texts are stored once per SHA-256 digest and each path points at the
+    digest the model last received. :meth:`stage` compares a file against
+    that version: unchanged files send nothing, changed files send a
+    compact diff, and files whose carrying messages have left the history
+    are sent in full again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, FileContext] = {}
+        self._blobs: dict[str, str] = {}
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def paths(self) -> list[str]:
+        return list(self._entries)
+
+    def content_of(self, path: str) -> str | None:
+        entry = self._entries.get(path)
+        return self._blobs.get(entry.digest) if entry else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._blobs.clear()
+
+    def discard(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._release(entry.digest)
+
+    def _release(self, digest: str) -> None:
+        if all(entry.digest != digest for entry in self._entries.values()):
+            self._blobs.pop(digest, None)
+
+    def _live(self, entry: FileContext, history: list[Message]) -> bool:
+        present = {id(message) for message in history}
+        return all(
+            id(message) in present and message.get("content") is content
+            for message, content in entry.carriers
+        )
+
+    def stage(self, path: str, content: str, history: list[Message]) -> FileUpdate:
+        """Work out how to bring the model's copy of ``path`` up to ``content``."""
+
+        digest = content_digest(content)
+        entry = self._entries.get(path)
+        if entry is not None and not self._live(entry, history):
+            self.discard(path)
+            entry = None
+        if entry is None:
+            return FileUpdate(path, ADDED, digest, content)
+        if entry.digest == digest:
+            return FileUpdate(path, UNCHANGED, digest)
+        diff = compact_diff(path, self._blobs[entry.digest], content)
+        if len(diff) >= len(content):
+            return FileUpdate(path, ADDED, digest, content)
+        return FileUpdate(path, UPDATED, digest, diff)
+
+    def commit(self, updates: list[FileUpdate], contents: dict[str, str], message: Message) -> None:
+        """Record that ``message`` (now in the history) delivered ``updates``."""
+
+        carrier = (message, message.get("content"))
+        for update in updates:
+            if update.kind == UNCHANGED:
+                continue
+            previous = self._entries.get(update.path)
+            old_digest = previous.digest if previous is not None else None
+            self._blobs.setdefault(update.digest, contents[update.path])
+            if update.kind == ADDED or previous is None:
+                self._entries[update.path] = FileContext(update.path, update.digest, [carrier])
+            else:
+                previous.digest = update.digest
+                previous.carriers.append(carrier)
+            if old_digest is not None and old_digest != update.digest:
+                self._release(old_digest)
@@ -0,0 +1,36 @@
+"""Editing pipeline helpers for the ``/edit`` command."""
+
+from .parallel import FileEdit, commit_edits, edit_concurrently, run_guarded
+from .patch import (
+    PATCH_EDITOR_PROMPT,
+    Hunk,
+    HunkFailure,
+    PatchResult,
+    apply_hunks,
+    apply_patch,
+    parse_patch,
+)
+from .pipeline import PIPELINE_FORMAT_HINT, EditPipeline, InstructionSplitter
+from .undo import REDO, UNDO, UndoHistory, apply_delta, encode_delta
+
+__all__ = [
+    "PATCH_EDITOR_PROMPT",
+    "Hunk",
+    "HunkFailure",
+    "PatchResult",
+    "apply_hunks",
+    "apply_patch",
+    "parse_patch",
+    "PIPELINE_FORMAT_HINT",
+    "EditPipeline",
+    "InstructionSplitter",
+    "FileEdit",
+    "commit_edits",
+    "edit_concurrently",
+    "run_guarded",
+    "REDO",
+    "UNDO",
+    "UndoHistory",
+    "apply_delta",
+    "encode_delta",
+]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Sequence
+
+
+@dataclass
+class FileEdit:
+    """Outcome of one editor stream, held in memory until the batch commits."""
+
+    path: str
+    original: str = ""
+    result: str = ""
+    prompt: str = ""
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_guarded(
+    semaphore: asyncio.Semaphore,
+    path: str,
+    start: Callable[[], Awaitable[FileEdit]],
+) -> FileEdit:
+    """Run one editor job under ``semaphore``, recording failures on the result."""
+
+    async with semaphore:
+        try:
+            return await start()
+        except Exception as exc:  # noqa: BLE001 - surfaced on the FileEdit
+            return FileEdit(path=path, error=str(exc) or type(exc).__name__)
+
+
+async def edit_concurrently(
+    paths: Sequence[str],
+    job: Callable[[str], Awaitable[FileEdit]],
+    limit: int,
+) -> list[FileEdit]:
+    """Run ``job`` for every path with at most ``limit`` streams in flight.
+
+    Results come back in input order. A failing job is recorded as a
+    :class:`FileEdit` with ``error`` set so one bad file never hides the
+    others; cancellation still propagates to every running job.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, limit))
+    return list(await asyncio.gather(
+        *(run_guarded(semaphore, path, lambda path=path: job(path)) for path in paths)
+    ))
+
+
+def commit_edits(edits: Sequence[FileEdit], write: Callable[[str, str], bool]) -> list[str]:
+    """Write every edit or none of them.
+
+    Returns the paths that blocked the commit: failed edits (nothing is
+    written) or the first failed write (earlier writes are rolled back to
+    their originals). An empty list means every file was written.
+    """
+
+    failed = [edit.path for edit in edits if not edit.ok]
+    if failed:
+        return failed
+
+    written: list[FileEdit] = []
+    for edit in edits:
+        if not write(edit.path, edit.result):
+            for done in reversed(written):
+                write(done.path, done.original)
+            return [edit.path]
+        written.append(edit)
+    return []
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import difflib
+import re
+
+
+SEARCH_RE = re.compile(r"^\s*<{5,9} ?SEARCH\s*$")
+DIVIDER_RE = re.compile(r"^\s*={5,9}\s*$")
+REPLACE_RE = re.compile(r"^\s*>{5,9} ?REPLACE\s*$")
+HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+PATCH_EDITOR_PROMPT = """You are a code-editing AI that answers with patches, never whole files.
+
+For every change output a SEARCH/REPLACE block:
+<<<<<<< SEARCH
+exact lines copied from the current file, with enough context to be unique
+=======
+the lines that replace them
+>>>>>>> REPLACE
+
+- Copy the SEARCH lines exactly, including indentation.
+- Use one block per separate change, in file order.
+- To insert code, SEARCH for the neighbouring lines and repeat them in REPLACE.
+- Output ONLY the blocks. No explanations, no code fences, no whole-file output.
+- If you spot potential issues in the instructions, fix them!"""
+
+
+@dataclass(frozen=True)
+class Hunk:
+    """One replacement: ``search`` lines become ``replace`` lines."""
+
+    search: tuple[str, ...]
+    replace: tuple[str, ...]
+    line_hint: int | None = None
+
+
+@dataclass(frozen=True)
+class HunkFailure:
+    """A hunk that could not be located in the file."""
+
+    index: int
+    reason: str
+    search: str
+
+    def describe(self) -> str:
+        preview = self.search.strip().splitlines()[0][:60] if self.search.strip() else "<empty>"
+        return f"hunk {self.index}: {self.reason} (near '{preview}')"
+
+
+@dataclass
+class PatchResult:
+    """Patched text plus what applied and what did not."""
+
+    text: str
+    applied: int = 0
+    fuzzy: int = 0
+    failures: list[HunkFailure] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.applied > 0 and not self.failures
+
+
+def parse_search_replace(text: str) -> list[Hunk]:
+    """Extract ``<<<<<<< SEARCH / ======= / >>>>>>> REPLACE`` blocks."""
+
+    hunks: list[Hunk] = []
+    search: list[str] | None = None
+    replace: list[str] | None = None
+    for line in text.split("\n"):
+        if SEARCH_RE.match(line):
+            search, replace = [], None
+        elif search is not None and replace is None and DIVIDER_RE.match(line):
+            replace = []
+        elif replace is not None and REPLACE_RE.match(line):
+            hunks.append(Hunk(tuple(search or ()), tuple(replace)))
+            search, replace = None, None
+        elif replace is not None:
+            replace.append(line)
+        elif search is not None:
+            search.append(line)
+    return hunks
+
+
+def parse_unified_diff(text: str) -> list[Hunk]:
+    """Extract ``@@`` hunks from a unified diff; file headers are ignored."""
+
+    hunks: list[Hunk] = []
+    lines = text.split("\n")
+    search: list[str] = []
+    replace: list[str] = []
+    hint: int | None = None
+    in_hunk = False
+
+    def close() -> None:
+        if in_hunk and (search or replace):
+            hunks.append(Hunk(tuple(search), tuple(replace), hint))
+
+    for index, line in enumerate(lines):
+        header = HUNK_HEADER_RE.match(line)
+        next_line = lines[index + 1] if index + 1 < len(lines) else ""
+        if header:
+            close()
+            search, replace, in_hunk = [], [], True
+            hint = max(int(header.group(1)) - 1, 0)
+        elif line.startswith("diff ") or (line.startswith("--- ") and next_line.startswith("+++ ")):
+            close()
+            in_hunk = False
+        elif not in_hunk or line.startswith("\\"):
+            continue
+        elif line.startswith("-"):
+            search.append(line[1:])
+        elif line.startswith("+"):
+            replace.append(line[1:])
+        elif line.startswith("```"):
+            continue
+        else:
+            context = line[1:] if line.startswith(" ") else line
+            search.append(context)
+            replace.append(context)
+    close()
+    return hunks
+
+
+def parse_patch(text: str) -> list[Hunk]:
+    """Parse editor output as SEARCH/REPLACE blocks, else as a unified diff."""
+
+    return parse_search_replace(text) or parse_unified_diff(text)
+
+
+def _closest(candidates: list[int], hint: int) -> int | None:
+    return min(candidates, key=lambda start: abs(start - hint)) if candidates else None
+
+
+def _locate(lines: list[str], search: tuple[str, ...], hint: int, threshold: float) -> tuple[int | None, bool]:
+    """Find where ``search`` starts: exact, then whitespace-insensitive, then fuzzy."""
+
+    size = len(search)
+    starts = range(len(lines) - size + 1)
+    exact = [start for start in starts if tuple(lines[start:start + size]) == search]
+    if exact:
+        return _closest(exact, hint), False
+
+    stripped = tuple(line.strip() for line in search)
+    stripped_lines = [line.strip() for line in lines]
+    loose = [start for start in starts if tuple(stripped_lines[start:start + size]) == stripped]
+    if loose:
+        return _closest(loose, hint), True
+
+    target = "\n".join(stripped)
+    best, best_score = None, threshold
+    for start in starts:
+        window = "\n".join(stripped_lines[start:start + size])
+        matcher = difflib.SequenceMatcher(None, window, target, autojunk=False)
+        if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+            continue
+        score = matcher.ratio()
+        if score > best_score or (score == best_score and best is not None and abs(start - hint) < abs(best - hint)):
+            best, best_score = start, score
+    return best, True
+
+
+def _reindent(matched: list[str], search: tuple[str, ...], replace: tuple[str, ...]) -> list[str]:
+    """Carry a consistent indentation shift from the file over to the replacement."""
+
+    pairs = [(have, want) for have, want in zip(matched, search) if have.strip() and want.strip()]
+    if not pairs:
+        return list(replace)
+    have, want = pairs[0]
+    have_indent = have[: len(have) - len(have.lstrip())]
+    want_indent = want[: len(want) - len(want.lstrip())]
+    if have_indent == want_indent or not have_indent.endswith(want_indent):
+        return list(replace)
+    prefix = have_indent[: len(have_indent) - len(want_indent)]
+    if not all(line.startswith(prefix) for line, _ in pairs):
+        return list(replace)
+    return [prefix + line if line.strip() else line for line in replace]
+
+
+def apply_hunks(original: str, hunks: list[Hunk], threshold: float = 0.85) -> PatchResult:
+    """Apply hunks in order, tolerating whitespace drift and small typos.
+
+    Hunks that cannot be located above ``threshold`` similarity are
+    reported in ``failures``; the others are still applied to ``text``.
+    """
+
+    lines = original.split("\n")
+    result = PatchResult(text=original)
+    cursor = 0
+    offset = 0
+    for index, hunk in enumerate(hunks, 1):
+        hint = hunk.line_hint + offset if hunk.line_hint is not None else cursor
+        if not hunk.search:
+            start, fuzzy = (min(hint, len(lines)) if hunk.line_hint is not None else len(lines)), False
+        else:
+            start, fuzzy = _locate(lines, hunk.search, hint, threshold)
+        if start is None:
+            result.failures.append(HunkFailure(index, "search text not found", "\n".join(hunk.search)))
+            continue
+        end = start + len(hunk.search)
+        replacement = _reindent(lines[start:end], hunk.search, hunk.replace) if fuzzy else list(hunk.replace)
+        lines[start:end] = replacement
+        cursor = start + len(replacement)
+        offset += len(replacement) - len(hunk.search)
+        result.applied += 1
+        result.fuzzy += int(fuzzy)
+    result.text = "\n".join(lines)
+    return result
+
+
+def apply_patch(original: str, patch_text: str, threshold: float = 0.85) -> PatchResult:
+    """Parse ``patch_text`` and apply it to ``original``."""
+
+    hunks = parse_patch(patch_text)
+    if not hunks:
+        return PatchResult(
+            text=original,
+            failures=[HunkFailure(0, "no SEARCH/REPLACE blocks or diff hunks found", patch_text)],
+        )
+    return apply_hunks(original, hunks, threshold)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from typing import Awaitable, Callable, Sequence
+
+from .parallel import FileEdit, run_guarded
+
+
+FILE_HEADER_RE = re.compile(r"^\s*#{1,6}\s*FILE:\s*`?([^`]+?)`?\s*$", re.IGNORECASE)
+
+PIPELINE_FORMAT_HINT = (
+    "Group the instructions by file. Start each file's section with a line of the form "
+    "'### FILE: <path>' using the exact path given above, and put every instruction for "
+    "that file under its header.\n"
+)
+
+
+def _normalize_path(path: str) -> str:
+    return os.path.normpath(path.strip()).replace("\\", "/")
+
+
+class InstructionSplitter:
+    """Incrementally cut a planning stream into per-file instruction sections.
+
+    Text is fed as it streams in; a section is complete once the next
+    ``### FILE:`` header (or the end of the stream) arrives. Text before the
+    first header and sections for unknown paths are dropped.
+    """
+
+    def __init__(self, paths: Sequence[str]) -> None:
+        self._paths = {_normalize_path(path): path for path in paths}
+        self._basenames: dict[str, str] = {}
+        for path in paths:
+            self._basenames.setdefault(os.path.basename(path), path)
+        self._partial: list[str] = []
+        self._current: str | None = None
+        self._lines: list[str] = []
+        self.emitted: set[str] = set()
+
+    def _resolve(self, header_path: str) -> str | None:
+        normalized = _normalize_path(header_path)
+        return self._paths.get(normalized) or self._basenames.get(os.path.basename(normalized))
+
+    def _flush_section(self) -> list[tuple[str, str]]:
+        path, lines = self._current, self._lines
+        self._current, self._lines = None, []
+        if path is None or path in self.emitted:
+            return []
+        self.emitted.add(path)
+        return [(path, "\n".join(lines).strip())]
+
+    def _take_line(self, line: str) -> list[tuple[str, str]]:
+        match = FILE_HEADER_RE.match(line)
+        if match is None:
+            if self._current is not None:
+                self._lines.append(line)
+            return []
+        completed = self._flush_section()
+        self._current = self._resolve(match.group(1))
+        return completed
+
+    def feed(self, text: str) -> list[tuple[str, str]]:
+        """Consume streamed text and return any sections it completed."""
+
+        completed: list[tuple[str, str]] = []
+        if "\n" not in text:
+            self._partial.append(text)
+            return completed
+        head, *middle, tail = text.split("\n")
+        self._partial.append(head)
+        completed.extend(self._take_line("".join(self._partial)))
+        for line in middle:
+            completed.extend(self._take_line(line))
+        self._partial = [tail]
+        return completed
+
+    def close(self) -> list[tuple[str, str]]:
+        """End of stream: emit the final open section."""
+
+        completed = self._take_line("".join(self._partial))
+        self._partial = []
+        return completed + self._flush_section()
+
+
+class EditPipeline:
+    """Start each file's editor stream as soon as its instructions are complete.
+
+    ``job(path, instructions)`` runs with at most ``limit`` streams in flight.
+    Files the planner never gave a section fall back to the full plan.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        job: Callable[[str, str], Awaitable[FileEdit]],
+        limit: int,
+    ) -> None:
+        self.paths = list(paths)
+        self.splitter = InstructionSplitter(paths)
+        self._job = job
+        self._semaphore = asyncio.Semaphore(max(1, limit))
+        self._tasks: dict[str, asyncio.Task[FileEdit]] = {}
+
+    @property
+    def started(self) -> list[str]:
+        return list(self._tasks)
+
+    def _start(self, path: str, instructions: str) -> None:
+        if path not in self._tasks:
+            self._tasks[path] = asyncio.ensure_future(
+                run_guarded(self._semaphore, path, lambda: self._job(path, instructions))
+            )
+
+    def feed(self, text: str) -> None:
+        for path, instructions in self.splitter.feed(text):
+            self._start(path, instructions)
+
+    async def finish(self, full_instructions: str) -> list[FileEdit]:
+        """Close the plan, start stragglers and wait for every file in order."""
+
+        for path, instructions in self.splitter.close():
+            self._start(path, instructions)
+        for path in self.paths:
+            self._start(path, full_instructions)
+        try:
+            return list(await asyncio.gather(*(self._tasks[path] for path in self.paths)))
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable
+
+
+UNDO = "undo"
+REDO = "redo"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL,
+    stack TEXT NOT NULL,
+    source TEXT NOT NULL,
+    delta BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_by_path ON steps (path, stack, id);
+"""
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def encode_delta(source: str, target: str) -> bytes:
+    """Compressed line operations that turn ``source`` into ``target``.
+
+    Only the replaced line ranges and their new lines are kept, so the
+    size follows the change rather than the file.
+    """
+
+    old, new = source.splitlines(keepends=True), target.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    ops = [[i1, i2, new[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def apply_delta(source: str, delta: bytes) -> str:
+    lines = source.splitlines(keepends=True)
+    out: list[str] = []
+    position = 0
+    for start, end, replacement in json.loads(zlib.decompress(delta)):
+        out.extend(lines[position:start])
+        out.extend(replacement)
+        position = end
+    out.extend(lines[position:])
+    return "".join(out)
+
+
+class UndoHistory:
+    """Per-file undo and redo stacks of compressed reverse diffs, kept in SQLite.
+
+    Each step records the digest of the text it applies to, so an undo
+    refuses to run over changes made outside the console. At most
+    ``depth`` undo steps are kept per file, and the oldest steps of any
+    file are dropped once the compressed total passes ``max_bytes``.
+    With a file path the stacks survive restarts.
+    """
+
+    def __init__(self, path: str = ":memory:", *, depth: int = 50, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.path = path
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    def _push(self, key: str, stack: str, source: str, target: str) -> None:
+        """Add a step that turns ``source`` into ``target``, keyed by the digest of ``source``."""
+
+        delta = encode_delta(source, target)
+        self._db.execute(
+            "INSERT INTO steps (path, stack, source, delta, size, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, stack, text_digest(source), delta, len(delta), time.time()),
+        )
+
+    def _trim(self, key: str) -> None:
+        self._db.execute(
+            "DELETE FROM steps WHERE path = ? AND stack = ? AND id NOT IN "
+            "(SELECT id FROM steps WHERE path = ? AND stack = ? ORDER BY id DESC LIMIT ?)",
+            (key, UNDO, key, UNDO, self.depth),
+        )
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM steps").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for step_id, size in self._db.execute("SELECT id, size FROM steps ORDER BY id"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((step_id,))
+            total -= size
+        self._db.executemany("DELETE FROM steps WHERE id = ?", doomed)
+
+    def record(self, path: str, before: str, after: str) -> None:
+        """Remember an edit of ``path`` from ``before`` to ``after``; clears its redo stack."""
+
+        if before == after:
+            return
+        key = self._key(path)
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM steps WHERE path = ? AND stack = ?", (key, REDO))
+            self._push(key, UNDO, after, before)
+            self._trim(key)
+            self._db.execute("COMMIT")
+
+    def _move(self, path: str, current: str, write: Callable[[str, str], bool], steps: int, take: str, give: str) -> int:
+        key = self._key(path)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, source, delta FROM steps WHERE path = ? AND stack = ? ORDER BY id DESC LIMIT ?",
+                (key, take, max(steps, 1)),
+            ).fetchall()
+            if not rows:
+                return 0
+            if rows[0][1] != text_digest(current):
+                raise ValueError(f"{path} changed since its last edit; {take} would overwrite those changes")
+            texts = [current]
+            for index, (_, source, delta) in enumerate(rows):
+                if source != text_digest(texts[-1]):
+                    rows = rows[:index]  # Changed outside the console between these edits; stop short of it
+                    break
+                texts.append(apply_delta(texts[-1], delta))
+            if not write(path, texts[-1]):
+                raise OSError(f"could not write {path}")
+            self._db.execute("BEGIN")
+            self._db.executemany("DELETE FROM steps WHERE id = ?", [(row[0],) for row in rows])
+            for newer, older in zip(texts, texts[1:]):
+                self._push(key, give, older, newer)
+            self._trim(key)
+            self._db.execute("COMMIT")
+        return len(rows)
+
+    def undo(self, path: str, current: str, write: Callable[[str, str], bool], steps: int = 1) -> int:
+        """Roll ``path`` back up to ``steps`` edits; returns how many were undone.
+
+        ``current`` must be the file's text as last recorded, otherwise
+        :class:`ValueError` is raised and nothing is written. Going further
+        back stops early at an edit made outside the console. The stacks
+        only change once ``write`` has succeeded.
+        """
+
+        return self._move(path, current, write, steps, UNDO, REDO)
+
+    def redo(self, path: str, current: str, write: Callable[[str, str], bool], steps: int = 1) -> int:
+        """Re-apply up to ``steps`` undone edits; returns how many were redone."""
+
+        return self._move(path, current, write, steps, REDO, UNDO)
+
+    def counts(self, path: str) -> tuple[int, int]:
+        """``(undo, redo)`` steps available for ``path``."""
+
+        with self._lock:
+            rows = dict(self._db.execute(
+                "SELECT stack, COUNT(*) FROM steps WHERE path = ? GROUP BY stack", (self._key(path),)
+            ).fetchall())
+        return rows.get(UNDO, 0), rows.get(REDO, 0)
+
+    def last_path(self, stack: str = UNDO) -> str | None:
+        """File with the most recent step on ``stack``."""
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path FROM steps WHERE stack = ? ORDER BY id DESC LIMIT 1", (stack,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            files, steps, size = self._db.execute(
+                "SELECT COUNT(DISTINCT path), COUNT(*), COALESCE(SUM(size), 0) FROM steps"
+            ).fetchone()
+        return {"files": files, "steps": steps, "bytes": size}
+
+    def clear(self, path: str | None = None) -> None:
+        with self._lock:
+            if path is None:
+                self._db.execute("DELETE FROM steps")
+            else:
+                self._db.execute("DELETE FROM steps WHERE path = ?", (self._key(path),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
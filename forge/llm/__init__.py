@@ -0,0 +1,65 @@
+"""Model transport and streaming primitives for the developer console."""
+
+from .cache import ResponseCache, payload_key
+from .engine import (
+    StreamEngine,
+    StreamResult,
+    build_chat_payload,
+    reasoning_config_for,
+    run_interruptible,
+)
+from .prompt_cache import CacheStats, CacheUsage, mark_breakpoint, stable_first, supports_cache_breakpoints
+from .resume import (
+    CONTINUE_PROMPT,
+    LineCheckpoint,
+    ResumableLineStream,
+    StreamInterrupted,
+    continuation_messages,
+)
+from .sse import (
+    CONTENT,
+    DONE,
+    REASONING,
+    USAGE,
+    ChunkAccumulator,
+    SSEDecoder,
+    StreamEvent,
+    aiter_events,
+    decode_payload,
+    iter_events,
+)
+from .transport import OPENROUTER_BASE_URL, ModelTransport, TransportConfig, http2_available
+
+__all__ = [
+    "OPENROUTER_BASE_URL",
+    "ResponseCache",
+    "payload_key",
+    "StreamEngine",
+    "StreamResult",
+    "build_chat_payload",
+    "reasoning_config_for",
+    "run_interruptible",
+    "CONTINUE_PROMPT",
+    "LineCheckpoint",
+    "ResumableLineStream",
+    "StreamInterrupted",
+    "continuation_messages",
+    "CONTENT",
+    "DONE",
+    "REASONING",
+    "USAGE",
+    "ChunkAccumulator",
+    "SSEDecoder",
+    "StreamEvent",
+    "aiter_events",
+    "decode_payload",
+    "iter_events",
+    "ModelTransport",
+    "TransportConfig",
+    "http2_available",
+    "CacheStats",
+    "CacheUsage",
+    "mark_breakpoint",
+    "stable_first",
+    "supports_cache_breakpoints",
+]
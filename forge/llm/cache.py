@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from .sse import StreamEvent
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    events BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def payload_key(payload: dict[str, object]) -> str:
+    """Canonical hash of a request body: same model, messages and settings, same key."""
+
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def encode_events(events: list[StreamEvent]) -> bytes:
+    rows = [[event.kind, event.text, event.usage] if event.usage else [event.kind, event.text] for event in events]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_events(blob: bytes) -> list[StreamEvent]:
+    return [StreamEvent(*row) for row in json.loads(zlib.decompress(blob))]
+
+
+class ResponseCache:
+    """Single-file SQLite store of complete model streams.
+
+    Streams are saved as the exact sequence of deltas that arrived, so a
+    replay chunks the same way the live response did. Entries older than
+    ``ttl_seconds`` are never served, and the least recently used ones are
+    evicted once the compressed total passes ``max_bytes``.
+    """
+
+    def __init__(self, path: str, *, ttl_seconds: float = 7 * 24 * 3600, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, key: str) -> list[StreamEvent] | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT events FROM responses WHERE key = ? AND created >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return decode_events(row[0])
+
+    def put(self, key: str, events: list[StreamEvent]) -> None:
+        blob = encode_events(events)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, events, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+async def replay(events: list[StreamEvent], delay: float = 0.0):
+    """Yield cached events one at a time, giving the loop a turn between them."""
+
+    for event in events:
+        yield event
+        await asyncio.sleep(delay)
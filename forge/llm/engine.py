@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import signal
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from .cache import ResponseCache, payload_key, replay
+from .prompt_cache import CacheStats, breakpoint_positions, mark_breakpoint, stable_first, supports_cache_breakpoints
+from .sse import DONE, REASONING, USAGE, ChunkAccumulator, StreamEvent, aiter_events
+from .transport import ModelTransport
+
+
+T = TypeVar("T")
+
+
+def reasoning_config_for(model: str) -> dict[str, object] | None:
+    """Provider-specific reasoning settings understood by OpenRouter."""
+
+    if "anthropic" in model:
+        return {"max_tokens": 8000}
+    if "openai" in model:
+        return {"effort": "high"}
+    return None
+
+
+def build_chat_payload(
+    messages: list[dict[str, object]],
+    model: str,
+    *,
+    max_tokens: int | None = 10000,
+    reasoning: bool = True,
+    materialize: Callable[[dict[str, object]], dict[str, object]] | None = None,
+    prompt_cache: bool = True,
+) -> dict[str, object]:
+    """Assemble the streaming chat-completion request body.
+
+    Keys starting with ``_`` are local bookkeeping (pins, blob refs, ...)
+    and are stripped from the messages that go over the wire.
+    ``materialize`` swaps stored payloads back into referencing messages.
+    With ``prompt_cache``, system prompts and pinned context go first so
+    the prefix is identical across turns, and models that need them get
+    ``cache_control`` breakpoints.
+    """
+
+    stable_count = 0
+    if prompt_cache:
+        messages, stable_count = stable_first(messages)
+    if materialize is not None:
+        messages = [materialize(message) for message in messages]
+    wire_messages = [
+        {key: value for key, value in message.items() if not key.startswith("_")}
+        for message in messages
+    ]
+    if prompt_cache and supports_cache_breakpoints(model):
+        for position in breakpoint_positions(wire_messages, stable_count):
+            wire_messages[position] = mark_breakpoint(wire_messages[position])
+    payload: dict[str, object] = {"model": model, "messages": wire_messages, "stream": True}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    config = reasoning_config_for(model) if reasoning else None
+    if config:
+        payload["reasoning"] = config
+    payload["usage"] = {"include": True}  # Asks OpenRouter for token counts, cache hits included
+    return payload
+
+
+@dataclass
+class StreamResult:
+    """Accumulated output of a stream, partial if it was cancelled."""
+
+    content: str = ""
+    reasoning: str = ""
+    cancelled: bool = False
+    usage: dict[str, object] | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        return {"content": self.content, "reasoning": self.reasoning, "cancelled": self.cancelled}
+
+
+class StreamEngine:
+    """Async streaming front-end that every model call goes through.
+
+    With a :class:`ResponseCache`, identical payloads are replayed from
+    disk; ``bypass_cache`` skips the lookup but still records the fresh
+    response. Usage reported by live streams is totalled in
+    ``prompt_cache``; replays are not counted again.
+    """
+
+    def __init__(self, transport: ModelTransport, cache: ResponseCache | None = None, *, replay_delay: float = 0.0) -> None:
+        self.transport = transport
+        self.cache = cache
+        self.replay_delay = replay_delay
+        self.bypass_cache = False
+        self.prompt_cache = CacheStats()
+
+    async def events(self, payload: dict[str, object]) -> AsyncIterator[StreamEvent]:
+        """Yield reasoning/content deltas as they arrive over SSE.
+
+        A final ``done`` event marks a stream the server terminated with
+        ``[DONE]``; its absence means the stream was cut short. Only
+        streams that reached ``done`` are cached.
+        """
+
+        if self.cache is None:
+            async for event in self._live_events(payload):
+                yield event
+            return
+
+        key = payload_key(payload)
+        cached = None if self.bypass_cache else self.cache.get(key)
+        if cached is not None:
+            async for event in replay(cached, self.replay_delay):
+                yield event
+            return
+        recorded: list[StreamEvent] = []
+        async for event in self._live_events(payload):
+            recorded.append(event)
+            if event.kind == DONE:
+                self.cache.put(key, recorded)  # Before yielding: consumers stop at done
+            yield event
+
+    async def _live_events(self, payload: dict[str, object]) -> AsyncIterator[StreamEvent]:
+        async with self.transport.astream_chat(payload) as response:
+            async for event in aiter_events(response.aiter_bytes()):
+                if event.kind == USAGE:
+                    self.prompt_cache.add(event.usage)
+                yield event
+
+    async def collect(
+        self,
+        payload: dict[str, object],
+        on_event: Callable[[StreamEvent], None] | None = None,
+    ) -> StreamResult:
+        """Drain a stream into a :class:`StreamResult`.
+
+        Cancellation is absorbed: the partial result is returned with
+        ``cancelled`` set instead of the output being thrown away.
+        """
+
+        content = ChunkAccumulator()
+        reasoning = ChunkAccumulator()
+        usage: dict[str, object] | None = None
+        cancelled = False
+        try:
+            async for event in self.events(payload):
+                if event.kind == USAGE:
+                    usage = event.usage
+                    continue
+                if event.kind == DONE:
+                    continue
+                (reasoning if event.kind == REASONING else content).append(event.text)
+                if on_event is not None:
+                    on_event(event)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if task is not None:
+                task.uncancel()
+            cancelled = True
+        return StreamResult(content.getvalue(), reasoning.getvalue(), cancelled, usage)
+
+
+async def run_interruptible(awaitable: Awaitable[T], default: T | None = None) -> T | None:
+    """Run ``awaitable`` as a task that Ctrl-C cancels instead of killing the app.
+
+    Returns ``default`` if the task ends cancelled rather than absorbing the
+    cancellation itself. Platforms without loop signal handlers simply await.
+    """
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(awaitable)
+    previous = signal.getsignal(signal.SIGINT)
+    try:
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+    except (NotImplementedError, RuntimeError, ValueError):
+        previous = None
+    try:
+        return await task
+    except asyncio.CancelledError:
+        current = asyncio.current_task()
+        if not task.cancelled() or (current is not None and current.cancelling()):
+            raise
+        return default
+    finally:
+        if previous is not None:
+            loop.remove_signal_handler(signal.SIGINT)
+            signal.signal(signal.SIGINT, previous)
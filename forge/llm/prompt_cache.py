@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping
+
+
+CACHE_CONTROL = {"type": "ephemeral"}
+MAX_BREAKPOINTS = 4  # Anthropic's limit per request
+
+Message = dict[str, object]
+
+
+def supports_cache_breakpoints(model: str) -> bool:
+    """Whether the provider behind ``model`` needs explicit ``cache_control`` markers.
+
+    OpenAI and DeepSeek models cache matching prefixes on their own;
+    Anthropic and Gemini only cache up to a marked breakpoint.
+    """
+
+    return "anthropic" in model or "gemini" in model
+
+
+def stable_first(messages: list[Message]) -> tuple[list[Message], int]:
+    """System prompts, then pinned context, then the conversation; returns the stable count.
+
+    The relative order within each group is kept. Pinned files are
+    only added, never rewritten, so the system-and-pinned prefix is the
+    same bytes from one turn to the next whatever happens after it.
+    """
+
+    system = [message for message in messages if message.get("role") == "system"]
+    pinned = [message for message in messages if message.get("_pinned") and message.get("role") != "system"]
+    stable = system + pinned
+    held = {id(message) for message in stable}
+    return stable + [message for message in messages if id(message) not in held], len(stable)
+
+
+def mark_breakpoint(message: Message) -> Message:
+    """A copy of ``message`` whose last text block carries ``cache_control``."""
+
+    content = message.get("content")
+    if isinstance(content, str):
+        if not content:
+            return message
+        return {**message, "content": [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]}
+    if isinstance(content, list):
+        for index in range(len(content) - 1, -1, -1):
+            part = content[index]
+            if isinstance(part, Mapping) and part.get("type") == "text" and part.get("text"):
+                parts = list(content)
+                parts[index] = {**part, "cache_control": CACHE_CONTROL}
+                return {**message, "content": parts}
+    return message
+
+
+def breakpoint_positions(messages: list[Message], stable_count: int) -> list[int]:
+    """Where to cut: the end of the system prompt, of the pinned context and of the history.
+
+    The last one lets the next turn read the whole conversation so far
+    from the cache; the earlier ones still hit once compaction or the
+    context budget has rewritten the middle.
+    """
+
+    system_end = sum(message.get("role") == "system" for message in messages[:stable_count])
+    positions = {system_end - 1, stable_count - 1, len(messages) - 1}
+    return sorted(position for position in positions if position >= 0)[-MAX_BREAKPOINTS:]
+
+
+@dataclass
+class CacheUsage:
+    """Prompt tokens of one response and how many of them the provider cache served or stored."""
+
+    prompt: int = 0
+    cached: int = 0
+    written: int = 0
+
+    @classmethod
+    def from_usage(cls, usage: Mapping[str, object] | None) -> CacheUsage:
+        """Read OpenRouter (``prompt_tokens_details``) or Anthropic-style usage blocks."""
+
+        usage = usage or {}
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens") or usage.get("cache_read_input_tokens") or 0
+        written = details.get("cache_write_tokens") or usage.get("cache_creation_input_tokens") or 0
+        prompt = usage.get("prompt_tokens") or usage.get("input_tokens") or 0
+        return cls(int(prompt), int(cached), int(written))
+
+    def describe(self) -> str:
+        share = f" ({self.cached / self.prompt:.0%})" if self.prompt else ""
+        text = f"{self.cached:,} of {self.prompt:,} prompt tokens read from cache{share}"
+        return text + (f", {self.written:,} written" if self.written else "")
+
+
+class CacheStats:
+    """Running totals of :class:`CacheUsage` over a session."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.total = CacheUsage()
+
+    def add(self, usage: Mapping[str, object] | None) -> CacheUsage:
+        counted = CacheUsage.from_usage(usage)
+        self.requests += 1
+        self.total.prompt += counted.prompt
+        self.total.cached += counted.cached
+        self.total.written += counted.written
+        return counted
+
+    def describe(self) -> str:
+        return f"{self.requests} requests, {self.total.describe()}"
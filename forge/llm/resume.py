@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Callable
+
+import httpx
+
+from .engine import StreamEngine
+from .sse import CONTENT, DONE
+
+
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off by a network error. Continue the output exactly "
+    "from the line after the last complete line you sent. Do not repeat any line, do "
+    "not restart, and do not add commentary."
+)
+
+RESUMABLE_ERRORS = (httpx.TransportError,)
+
+
+class StreamInterrupted(RuntimeError):
+    """A stream kept dropping and could not be completed."""
+
+
+class LineCheckpoint:
+    """Complete lines received so far plus the unterminated tail."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self._partial: list[str] = []
+
+    @property
+    def tail(self) -> str:
+        return "".join(self._partial)
+
+    def feed(self, text: str) -> list[str]:
+        """Consume streamed text and return the lines it completed."""
+
+        if "\n" not in text:
+            self._partial.append(text)
+            return []
+        head, *middle, rest = text.split("\n")
+        self._partial.append(head)
+        completed = ["".join(self._partial), *middle]
+        self._partial = [rest] if rest else []
+        self.lines.extend(completed)
+        return completed
+
+    def rollback_partial(self) -> None:
+        """Forget the unterminated tail; a resumed stream restarts at a line boundary."""
+
+        self._partial = []
+
+
+def continuation_messages(
+    messages: list[dict[str, object]],
+    received_lines: list[str],
+) -> list[dict[str, object]]:
+    """Messages asking the model to pick up after ``received_lines``."""
+
+    received = "\n".join(received_lines) + "\n" if received_lines else ""
+    return messages + [
+        {"role": "assistant", "content": received},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+
+
+class ResumableLineStream:
+    """Line-oriented content stream that survives dropped connections.
+
+    Completed lines are checkpointed as they arrive. If the connection
+    drops or the stream ends without ``[DONE]``, a continuation request
+    resumes after the last complete line, up to ``max_resumes`` times;
+    after that :class:`StreamInterrupted` is raised so nothing partial is
+    ever treated as finished.
+    """
+
+    def __init__(
+        self,
+        engine: StreamEngine,
+        messages: list[dict[str, object]],
+        build_payload: Callable[[list[dict[str, object]]], dict[str, object]],
+        *,
+        max_resumes: int = 3,
+        on_resume: Callable[[int, int], None] | None = None,
+    ) -> None:
+        self.engine = engine
+        self.messages = messages
+        self.build_payload = build_payload
+        self.max_resumes = max_resumes
+        self.on_resume = on_resume
+        self.checkpoint = LineCheckpoint()
+        self.resumes = 0
+
+    @property
+    def tail(self) -> str:
+        """Text after the final newline once the stream has completed."""
+
+        return self.checkpoint.tail
+
+    async def lines(self) -> AsyncIterator[str]:
+        while True:
+            messages = (
+                continuation_messages(self.messages, self.checkpoint.lines)
+                if self.resumes else self.messages
+            )
+            finished = False
+            error: BaseException | None = None
+            try:
+                async for event in self.engine.events(self.build_payload(messages)):
+                    if event.kind == DONE:
+                        finished = True
+                        break
+                    if event.kind == CONTENT and event.text:
+                        for line in self.checkpoint.feed(event.text):
+                            yield line
+            except RESUMABLE_ERRORS as exc:
+                error = exc
+            if finished:
+                return
+
+            self.checkpoint.rollback_partial()
+            if self.resumes >= self.max_resumes:
+                reason = f": {error}" if error else ""
+                raise StreamInterrupted(
+                    f"stream dropped after {len(self.checkpoint.lines)} lines "
+                    f"and {self.resumes} resume attempts{reason}"
+                ) from error
+            self.resumes += 1
+            if self.on_resume is not None:
+                self.on_resume(self.resumes, len(self.checkpoint.lines))
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, NamedTuple
+
+try:  # Optional accelerated decoder; stdlib json is the fallback.
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    _loads = json.loads
+
+
+REASONING = "reasoning"
+CONTENT = "content"
+USAGE = "usage"
+DONE = "done"
+
+_DONE_PAYLOAD = b"[DONE]"
+
+
+class StreamEvent(NamedTuple):
+    """One decoded item from the model stream (a tuple: built once per token)."""
+
+    kind: str
+    text: str = ""
+    usage: dict[str, object] | None = None
+
+
+class ChunkAccumulator:
+    """Collects streamed text pieces and joins them once, on demand."""
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._joined: str | None = ""
+
+    def append(self, text: str) -> None:
+        if text:
+            self._parts.append(text)
+            self._joined = None
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    def getvalue(self) -> str:
+        if self._joined is None:
+            self._joined = "".join(self._parts)
+            self._parts = [self._joined]
+        return self._joined
+
+
+class SSEDecoder:
+    """Incremental Server-Sent Events framer working on raw bytes.
+
+    Only the unterminated tail of the previous chunk is carried over, so
+    each byte is split and copied a constant number of times no matter how
+    the transport cuts the stream. Returns the ``data`` payload of every
+    complete event; comment lines and other fields are skipped.
+    """
+
+    def __init__(self) -> None:
+        self._tail: list[bytes] = []
+        self._data: list[bytes] = []
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        if b"\n" not in chunk:
+            self._tail.append(chunk)
+            return []
+        if self._tail:
+            self._tail.append(chunk)
+            chunk = b"".join(self._tail)
+        lines = chunk.split(b"\n")
+        tail = lines.pop()
+        self._tail = [tail] if tail else []
+        payloads: list[bytes] = []
+        data = self._data
+        for line in lines:
+            if line[-1:] == b"\r":
+                line = line[:-1]
+            if not line:
+                if data:
+                    payloads.append(data[0] if len(data) == 1 else b"\n".join(data))
+                    data = []
+            elif line[:6] == b"data: ":
+                data.append(line[6:])
+            elif line[:5] == b"data:":
+                data.append(line[5:])
+        self._data = data
+        return payloads
+
+    def flush(self) -> list[bytes]:
+        """End of stream: dispatch an event that lacked its blank line."""
+
+        payloads = self.feed(b"\n") if self._tail else []
+        if self._data:
+            payloads.append(b"\n".join(self._data))
+            self._data = []
+        return payloads
+
+
+def decode_payload(payload: bytes) -> list[StreamEvent]:
+    """Turn one SSE ``data`` payload into stream events."""
+
+    if payload == _DONE_PAYLOAD:
+        return [StreamEvent(DONE)]
+    try:
+        chunk = _loads(payload)
+    except ValueError:
+        return []
+    if not isinstance(chunk, dict):
+        return []
+    events: list[StreamEvent] = []
+    choices = chunk.get("choices")
+    if choices:
+        delta = choices[0].get("delta") or {}
+        reasoning = delta.get("reasoning")
+        content = delta.get("content")
+        if reasoning is not None:
+            events.append(StreamEvent(REASONING, reasoning))
+        elif content is not None:
+            events.append(StreamEvent(CONTENT, content))
+    usage = chunk.get("usage")
+    if usage:
+        events.append(StreamEvent(USAGE, usage=usage))
+    return events
+
+
+def iter_events(chunks: Iterable[bytes]) -> Iterator[StreamEvent]:
+    """Decode a byte stream into events, stopping after ``done``."""
+
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        for payload in decoder.feed(chunk):
+            for event in decode_payload(payload):
+                yield event
+                if event.kind == DONE:
+                    return
+    for payload in decoder.flush():
+        for event in decode_payload(payload):
+            yield event
+            if event.kind == DONE:
+                return
+
+
+async def aiter_events(chunks: AsyncIterable[bytes]) -> AsyncIterator[StreamEvent]:
+    """Async twin of :func:`iter_events` for httpx ``aiter_bytes()``."""
+
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for payload in decoder.feed(chunk):
+            for event in decode_payload(payload):
+                yield event
+                if event.kind == DONE:
+                    return
+    for payload in decoder.flush():
+        for event in decode_payload(payload):
+            yield event
+            if event.kind == DONE:
+                return
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import importlib.util
+import os
+from typing import AsyncIterator, Mapping
+
+import httpx
+
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+CHAT_COMPLETIONS_PATH = "/chat/completions"
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package on top of httpx."""
+
+    return importlib.util.find_spec("h2") is not None
+
+
+def _env_flag(value: str | None) -> bool:
+    return (value or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """Connection pool, timeout and protocol settings for model traffic."""
+
+    base_url: str = OPENROUTER_BASE_URL
+    api_key: str | None = None
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 300.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> TransportConfig:
+        """Build a config from ``OPENROUTER_API_KEY`` and the ``OMNI_*`` overrides."""
+
+        env = os.environ if environ is None else environ
+        defaults = cls()
+        return cls(
+            base_url=env.get("OMNI_BASE_URL", defaults.base_url).rstrip("/"),
+            api_key=env.get("OPENROUTER_API_KEY"),
+            connect_timeout=float(env.get("OMNI_CONNECT_TIMEOUT", defaults.connect_timeout)),
+            read_timeout=float(env.get("OMNI_READ_TIMEOUT", defaults.read_timeout)),
+            http2=_env_flag(env.get("OMNI_HTTP2")),
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def use_http2(self) -> bool:
+        """HTTP/2 is only negotiated when requested *and* ``h2`` is importable."""
+
+        return self.http2 and http2_available()
+
+
+class ModelTransport:
+    """Shared keep-alive connection pool for every model request.
+
+    Chat turns, ``/edit`` planning and editor streams all go through one
+    instance so that only the first request pays for DNS, TCP and TLS setup.
+    """
+
+    def __init__(self, config: TransportConfig | None = None) -> None:
+        self.config = config or TransportConfig.from_env()
+        self._async_client: httpx.AsyncClient | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.config.api_key:
+            headers["Authorization"] = f"Bearer {self.config.api_key}"
+        return headers
+
+    def _client_options(self) -> dict[str, object]:
+        return {
+            "base_url": self.config.base_url,
+            "headers": self.headers,
+            "timeout": self.config.timeout,
+            "limits": self.config.limits,
+            "http2": self.config.use_http2,
+        }
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The pooled asyncio client, created on first use."""
+
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+
+    @asynccontextmanager
+    async def astream_chat(self, payload: dict[str, object]) -> AsyncIterator[httpx.Response]:
+        """POST a streaming chat completion and yield the open response."""
+
+        async with self.async_client.stream("POST", CHAT_COMPLETIONS_PATH, json=payload) as response:
+            response.raise_for_status()
+            yield response
+
+    async def aprewarm(self) -> bool:
+        """Open a pooled connection ahead of the first real request.
+
+        Any HTTP status counts as success: the point is the handshake, not
+        the body. Network errors are swallowed so startup never fails here.
+        """
+
+        try:
+            await self.async_client.head("/models")
+        except httpx.HTTPError:
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
@@ -0,0 +1,21 @@
+"""Image handling for the ``/image`` command."""
+
+from .images import (
+    SUPPORTED_FORMATS,
+    ImageFailure,
+    ImageLimits,
+    ImagePipeline,
+    PreparedImage,
+    shrink_image,
+    sniff_format,
+)
+
+__all__ = [
+    "SUPPORTED_FORMATS",
+    "ImageFailure",
+    "ImageLimits",
+    "ImagePipeline",
+    "PreparedImage",
+    "shrink_image",
+    "sniff_format",
+]
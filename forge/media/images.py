@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import hashlib
+from io import BytesIO
+import os
+
+import httpx
+
+
+SUPPORTED_FORMATS = frozenset({"jpeg", "png", "webp", "gif"})
+SNIFF_BYTES = 32
+PROBE_BYTES = 64 * 1024  # Enough for the format header and, in practice, the dimensions
+USER_AGENT = "Mozilla/5.0 (compatible; OmniEngineer/1.0)"
+
+
+def sniff_format(header: bytes) -> str | None:
+    """Image format from magic bytes, without decoding anything."""
+
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+@dataclass(frozen=True)
+class ImageLimits:
+    """Largest image sent as-is; anything bigger is downscaled and re-encoded."""
+
+    max_dimension: int = 2048
+    max_bytes: int = 4 * 1024 * 1024
+    max_download_bytes: int = 32 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """An image ready for a chat message: a data URI, or the original URL."""
+
+    source: str
+    url: str
+    format: str
+    digest: str = ""
+    width: int = 0
+    height: int = 0
+    size: int = 0
+    original_size: tuple[int, int] | None = None
+    cached: bool = False
+
+    @property
+    def resized(self) -> bool:
+        return self.original_size is not None
+
+    def message(self) -> dict[str, object]:
+        return {"role": "user", "content": [{"type": "image_url", "image_url": {"url": self.url}}]}
+
+
+@dataclass(frozen=True)
+class ImageFailure:
+    source: str
+    error: str
+
+
+def _dimensions(header: bytes) -> tuple[int, int] | None:
+    """Image size parsed from a file's leading bytes, if they reach that far."""
+
+    from PIL import Image
+
+    try:
+        with Image.open(BytesIO(header)) as image:
+            return image.size
+    except Exception:  # Truncated or unrecognised header
+        return None
+
+
+def _data_uri(data: bytes, fmt: str) -> str:
+    return f"data:image/{fmt};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def shrink_image(data: bytes, limits: ImageLimits) -> tuple[bytes, str, tuple[int, int], tuple[int, int] | None]:
+    """Return ``(bytes, format, size, original_size)`` within ``limits``.
+
+    Images already inside the limits are returned untouched. Larger ones
+    are downscaled to ``max_dimension`` and re-encoded (PNG when they have
+    transparency, JPEG otherwise), stepping quality and size down until
+    they fit ``max_bytes``.
+    """
+
+    from PIL import Image
+
+    try:
+        opened = Image.open(BytesIO(data))
+    except Image.DecompressionBombError as exc:
+        raise ValueError(f"Image is too large to decode safely: {exc}") from exc
+    with opened as image:
+        fmt = (image.format or "").lower()
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported image format: {fmt or 'unknown'}")
+        size = image.size
+        if max(size) <= limits.max_dimension and len(data) <= limits.max_bytes:
+            return data, fmt, size, None
+
+        image.seek(0)
+        has_alpha = image.mode in ("RGBA", "LA", "P") and ("transparency" in image.info or image.mode != "P")
+        frame = image.convert("RGBA" if has_alpha else "RGB")
+    dimension = min(limits.max_dimension, max(size))
+    quality = 85
+    while True:
+        scaled = frame.copy()
+        scaled.thumbnail((dimension, dimension), Image.LANCZOS)
+        buffer = BytesIO()
+        if has_alpha:
+            scaled.save(buffer, "PNG", optimize=True)
+            out_fmt = "png"
+        else:
+            scaled.save(buffer, "JPEG", quality=quality, optimize=True)
+            out_fmt = "jpeg"
+        encoded = buffer.getvalue()
+        if len(encoded) <= limits.max_bytes or dimension <= 256:
+            return encoded, out_fmt, scaled.size, size
+        if not has_alpha and quality > 60:
+            quality -= 10
+        else:
+            dimension = int(dimension * 0.75)
+
+
+class ImagePipeline:
+    """Validate, shrink and encode images for the chat, several at a time.
+
+    Local files are sniffed from their first bytes before being read in
+    full. URLs are checked with a ranged ``GET`` of their first bytes and
+    passed by reference when they are within the limits; otherwise they
+    are downloaded and downscaled like local files. Encoded results
+    are cached by content hash, so re-adding an image is free.
+    """
+
+    def __init__(self, limits: ImageLimits | None = None, *, concurrency: int = 4, cache_size: int = 64) -> None:
+        self.limits = limits or ImageLimits()
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, PreparedImage] = OrderedDict()
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0), follow_redirects=True, headers={"User-Agent": USER_AGENT}
+            )
+        return self._client
+
+    async def _encode(self, source: str, data: bytes) -> PreparedImage:
+        digest = hashlib.sha256(data).hexdigest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._cache.move_to_end(digest)
+            return replace(cached, source=source, cached=True)
+        encoded, fmt, size, original = await asyncio.to_thread(shrink_image, data, self.limits)
+        uri = await asyncio.to_thread(_data_uri, encoded, fmt)
+        prepared = PreparedImage(source, uri, fmt, digest, size[0], size[1], len(encoded), original)
+        self._cache[digest] = prepared
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return prepared
+
+    async def prepare_file(self, path: str) -> PreparedImage:
+        def read() -> bytes:
+            with open(path, "rb") as handle:
+                if sniff_format(handle.read(SNIFF_BYTES)) is None:
+                    raise ValueError("not a JPEG, PNG, WebP or GIF image")
+                if os.fstat(handle.fileno()).st_size > self.limits.max_download_bytes:
+                    raise ValueError("file is too large")
+                handle.seek(0)
+                return handle.read()
+
+        return await self._encode(path, await asyncio.to_thread(read))
+
+    async def _probe(self, url: str) -> tuple[str | None, int | None, tuple[int, int] | None]:
+        """Format, byte length and dimensions from a ranged ``GET`` of the first bytes."""
+
+        header = bytearray()
+        async with self.client.stream("GET", url, headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"}) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():  # Servers may ignore Range; stop early anyway
+                header += chunk
+                if len(header) >= PROBE_BYTES:
+                    break
+            total = response.headers.get("content-range", "").rpartition("/")[2]
+            if response.status_code == 200:
+                total = response.headers.get("content-length", "")
+        header = bytes(header[:PROBE_BYTES])
+        return sniff_format(header), int(total) if total.isdigit() else None, await asyncio.to_thread(_dimensions, header)
+
+    async def prepare_url(self, url: str) -> PreparedImage:
+        fmt, length, dimensions = await self._probe(url)
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError("the URL doesn't point to a JPEG, PNG, WebP or GIF image")
+        fits = dimensions is not None and max(dimensions) <= self.limits.max_dimension
+        if fits and length is not None and length <= self.limits.max_bytes:
+            return PreparedImage(url, url, fmt, width=dimensions[0], height=dimensions[1], size=length)
+        if length is not None and length > self.limits.max_download_bytes:
+            raise ValueError(f"image is too large to download ({length:,} bytes)")
+
+        body = bytearray()
+        async with self.client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > self.limits.max_download_bytes:
+                    raise ValueError("image is too large to download")
+        image = await self._encode(url, bytes(body))
+        if image.resized:
+            return image
+        return PreparedImage(url, url, image.format, image.digest, image.width, image.height, len(body))  # Fits: keep the link
+
+    async def prepare_all(self, sources: list[str]) -> list[PreparedImage | ImageFailure]:
+        """Prepare every source concurrently; results keep input order."""
+
+        semaphore = asyncio.Semaphore(max(self.concurrency, 1))
+
+        async def one(source: str) -> PreparedImage | ImageFailure:
+            remote = source.startswith(("http://", "https://"))
+            async with semaphore:
+                try:
+                    return await (self.prepare_url(source) if remote else self.prepare_file(source))
+                except FileNotFoundError:
+                    return ImageFailure(source, "file not found")
+                except (OSError, ValueError, httpx.HTTPError, httpx.InvalidURL) as exc:
+                    return ImageFailure(source, str(exc) or type(exc).__name__)
+
+        return list(await asyncio.gather(*(one(source) for source in sources)))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,26 @@
+"""Web search helpers for the ``/search`` command."""
+
+from .backend import DuckDuckGoBackend, SearchBackend, SearchResult
+from .cache import CachedSearch, SearchCache, SearchService, normalize_query
+from .fetch import Document, FetchFailure, PageFetcher, extract_text, render_documents
+from .fanout import FanOutReport, MergedResult, fan_out, merge_results, normalize_url
+
+__all__ = [
+    "DuckDuckGoBackend",
+    "SearchBackend",
+    "SearchResult",
+    "CachedSearch",
+    "SearchCache",
+    "SearchService",
+    "normalize_query",
+    "FanOutReport",
+    "MergedResult",
+    "fan_out",
+    "merge_results",
+    "normalize_url",
+    "Document",
+    "FetchFailure",
+    "PageFetcher",
+    "extract_text",
+    "render_documents",
+]
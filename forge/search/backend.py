@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Mapping, Protocol
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """One web result, independent of the provider that returned it."""
+
+    title: str
+    url: str
+    snippet: str = ""
+
+    @classmethod
+    def from_ddgs(cls, row: Mapping[str, object]) -> SearchResult:
+        return cls(str(row.get("title", "")), str(row.get("href", row.get("url", ""))), str(row.get("body", "")))
+
+    def to_dict(self) -> dict[str, str]:
+        return asdict(self)
+
+
+class SearchBackend(Protocol):
+    """A search provider; tests pass a fake, the console uses DuckDuckGo."""
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        ...
+
+
+class DuckDuckGoBackend:
+    """``duckduckgo_search`` behind the :class:`SearchBackend` interface.
+
+    Newer releases only ship the blocking client, so it runs on a worker
+    thread when no async method is available.
+    """
+
+    def __init__(self, proxy: str | None = None) -> None:
+        self.proxy = proxy
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        from duckduckgo_search import DDGS
+
+        client = DDGS(proxy=self.proxy)
+        if hasattr(client, "atext"):
+            rows = await client.atext(query, max_results=max_results)
+        else:
+            rows = await asyncio.to_thread(client.text, query, max_results=max_results)
+        return [SearchResult.from_ddgs(row) for row in rows or []]
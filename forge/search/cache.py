@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import sqlite3
+import threading
+import time
+
+from .backend import SearchBackend, SearchResult
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    query TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    exhausted INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key for a query."""
+
+    return " ".join(query.casefold().split())
+
+
+@dataclass(frozen=True)
+class CachedSearch:
+    results: list[SearchResult]
+    exhausted: bool
+
+
+class SearchCache:
+    """SQLite store of search results by normalized query, with a TTL.
+
+    ``exhausted`` records that the provider returned fewer results than
+    were asked for, so a bigger request would not find more.
+    """
+
+    def __init__(self, path: str = ":memory:", *, ttl_seconds: float = 24 * 3600) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+
+    def get(self, query: str) -> CachedSearch | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results, exhausted FROM searches WHERE query = ? AND created >= ?",
+                (normalize_query(query), time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedSearch([SearchResult(**item) for item in json.loads(row[0])], bool(row[1]))
+
+    def put(self, query: str, results: list[SearchResult], exhausted: bool) -> None:
+        rows = json.dumps([result.to_dict() for result in results])
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches (query, results, exhausted, created) VALUES (?, ?, ?, ?)",
+                (normalize_query(query), rows, int(exhausted), time.time()),
+            )
+            self._db.execute("DELETE FROM searches WHERE created < ?", (time.time() - self.ttl_seconds,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM searches")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SearchService:
+    """Fetch only the results the context will use, paging lazily from the cache.
+
+    The first request for a query asks the backend for ``limit`` results.
+    Asking for more later re-queries with the larger count and replaces
+    the cached list; anything already covered is served from the cache.
+    """
+
+    def __init__(self, backend: SearchBackend, cache: SearchCache | None = None, *, page_size: int = 8) -> None:
+        self.backend = backend
+        self.cache = cache or SearchCache()
+        self.page_size = page_size
+        self.hits = 0
+        self.misses = 0
+
+    async def results(self, query: str, limit: int | None = None) -> list[SearchResult]:
+        limit = limit or self.page_size
+        cached = self.cache.get(query)
+        if cached is not None and (len(cached.results) >= limit or cached.exhausted):
+            self.hits += 1
+            return cached.results[:limit]
+        self.misses += 1
+        fetched = await self.backend.search(query, limit)
+        self.cache.put(query, fetched, exhausted=len(fetched) < limit)
+        return fetched[:limit]
+
+    async def page(self, query: str, number: int) -> list[SearchResult]:
+        """Zero-based page ``number`` of ``page_size`` results."""
+
+        start = number * self.page_size
+        results = await self.results(query, start + self.page_size)
+        return results[start:]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .backend import SearchResult
+from .cache import SearchService
+
+
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "msclkid", "ref", "ref_src"})
+
+
+def normalize_url(url: str) -> str:
+    """Collapse URLs that name the same page (scheme, ``www.``, tracking, fragments)."""
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+@dataclass
+class MergedResult:
+    """A result seen by one or more queries; ``rank`` is its best position."""
+
+    result: SearchResult
+    queries: list[str] = field(default_factory=list)
+    rank: int = 0
+
+
+@dataclass
+class FanOutReport:
+    queries: list[str]
+    merged: list[MergedResult]
+    per_query: dict[str, list[SearchResult]]
+    errors: dict[str, BaseException]
+
+    def render(self, limit: int | None = None, snippet_chars: int = 100) -> str:
+        """One compact block for the chat history."""
+
+        lines = [f"Search results for {len(self.queries)} queries: {' | '.join(self.queries)}"]
+        for index, item in enumerate(self.merged[:limit], 1):
+            hits = f" [{len(item.queries)} queries]" if len(item.queries) > 1 else ""
+            lines.append(f"{index}. {item.result.title} ({item.result.url}){hits}: {item.result.snippet[:snippet_chars]}...")
+        return "\n".join(lines) + "\n"
+
+
+def merge_results(per_query: dict[str, list[SearchResult]]) -> list[MergedResult]:
+    """Deduplicate by normalized URL, ranking by how many queries found each page."""
+
+    merged: dict[str, MergedResult] = {}
+    for query, results in per_query.items():
+        for rank, result in enumerate(results):
+            key = normalize_url(result.url) or result.title
+            item = merged.get(key)
+            if item is None:
+                merged[key] = MergedResult(result, [query], rank)
+            elif query not in item.queries:
+                item.queries.append(query)
+                item.rank = min(item.rank, rank)
+    # Stable sort: ties keep first-seen order
+    return sorted(merged.values(), key=lambda item: (-len(item.queries), item.rank))
+
+
+async def fan_out(
+    service: SearchService,
+    queries: list[str],
+    *,
+    limit: int | None = None,
+    concurrency: int = 4,
+) -> FanOutReport:
+    """Run ``queries`` concurrently (at most ``concurrency`` at once) and merge them.
+
+    A failing query is reported in ``errors`` without sinking the others.
+    """
+
+    queries = list(dict.fromkeys(query.strip() for query in queries if query.strip()))
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(query: str) -> list[SearchResult]:
+        async with semaphore:
+            return await service.results(query, limit)
+
+    outcomes = await asyncio.gather(*(run(query) for query in queries), return_exceptions=True)
+    per_query: dict[str, list[SearchResult]] = {}
+    errors: dict[str, BaseException] = {}
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, BaseException):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            errors[query] = outcome
+        else:
+            per_query[query] = outcome
+    return FanOutReport(queries, merge_results(per_query), per_query, errors)
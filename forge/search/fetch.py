@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+import re
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..context.budget import CHARS_PER_TOKEN
+
+
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "nav", "footer", "header", "form", "iframe"})
+BLOCK_TAGS = frozenset({
+    "p", "div", "section", "article", "main", "br", "li", "ul", "ol", "tr", "table", "pre",
+    "blockquote", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd",
+})
+_SPACES_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.title: list[str] = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip = max(self._skip - 1, 0)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title.append(data)
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def extract_text(html: str) -> tuple[str, str]:
+    """Readable ``(title, text)`` from an HTML page; scripts, styles and chrome are dropped."""
+
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = _SPACES_RE.sub(" ", "".join(parser.parts))
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+    return " ".join("".join(parser.title).split()), text
+
+
+@dataclass(frozen=True)
+class Document:
+    """Extracted text of one fetched page."""
+
+    url: str
+    title: str
+    text: str
+    etag: str | None = None
+    truncated: bool = False
+    revalidated: bool = False
+
+    def excerpt(self, max_tokens: int) -> str:
+        """Leading text within ``max_tokens``, cut at a paragraph or sentence end."""
+
+        limit = max_tokens * CHARS_PER_TOKEN
+        if len(self.text) <= limit:
+            return self.text
+        head = self.text[:limit]
+        cut = max(head.rfind("\n\n"), head.rfind(". "))
+        return (head[: cut + 1] if cut > limit // 2 else head).rstrip() + " …"
+
+
+@dataclass(frozen=True)
+class FetchFailure:
+    url: str
+    error: str
+
+
+class PageFetcher:
+    """Download pages concurrently through one pooled async client.
+
+    At most ``max_concurrency`` requests run at once and at most
+    ``per_host`` against any single host. Bodies are read up to
+    ``max_bytes`` and the rest dropped. Extracted documents are kept by
+    URL together with their ETag, and a repeat fetch revalidates with
+    ``If-None-Match``, so an unchanged page is not downloaded or parsed
+    again. The limits are created inside the running event loop on first
+    use, and again if a later ``asyncio.run`` brings a new loop.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        *,
+        max_concurrency: int = 8,
+        per_host: int = 2,
+        max_bytes: int = 2 * 1024 * 1024,
+        timeout: float = 10.0,
+        cache_size: int = 256,
+    ) -> None:
+        self._client = client
+        self._owns_client = client is None
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.cache_size = cache_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._documents: OrderedDict[str, Document] = OrderedDict()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; OmniEngineer/1.0)"},
+            )
+        return self._client
+
+    def _limits(self, host: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """The per-host and global slots for ``host``, bound to the running loop."""
+
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._hosts = {}
+        host_slots = self._hosts.get(host)
+        if host_slots is None:
+            host_slots = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return host_slots, self._slots
+
+    def cached(self, url: str) -> Document | None:
+        return self._documents.get(url)
+
+    def _remember(self, document: Document) -> None:
+        self._documents[document.url] = document
+        self._documents.move_to_end(document.url)
+        while len(self._documents) > self.cache_size:
+            self._documents.popitem(last=False)
+
+    async def fetch(self, url: str) -> Document:
+        host = urlsplit(url).netloc.lower()
+        host_slots, slots = self._limits(host)
+        previous = self._documents.get(url)
+        headers = {"If-None-Match": previous.etag} if previous is not None and previous.etag else {}
+        async with host_slots, slots:
+            async with self.client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and previous is not None:
+                    document = Document(previous.url, previous.title, previous.text, previous.etag, previous.truncated, True)
+                    self._remember(document)
+                    return document
+                response.raise_for_status()
+                body = bytearray()
+                truncated = False
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= self.max_bytes:
+                        del body[self.max_bytes:]
+                        truncated = True
+                        break
+                encoding = response.encoding or "utf-8"
+                content_type = response.headers.get("content-type", "")
+                etag = response.headers.get("etag")
+        raw = bytes(body).decode(encoding, errors="replace")
+        if "html" in content_type or raw.lstrip()[:1] == "<":
+            title, text = await asyncio.to_thread(extract_text, raw)
+        else:
+            title, text = "", raw.strip()
+        document = Document(url, title or url, text, etag, truncated)
+        self._remember(document)
+        return document
+
+    async def fetch_all(self, urls: list[str]) -> list[Document | FetchFailure]:
+        """Fetch ``urls`` concurrently; results keep input order and failures are values."""
+
+        async def guarded(url: str) -> Document | FetchFailure:
+            try:
+                return await self.fetch(url)
+            except (httpx.HTTPError, httpx.InvalidURL, ValueError, UnicodeError) as exc:
+                return FetchFailure(url, str(exc) or type(exc).__name__)
+
+        return list(await asyncio.gather(*(guarded(url) for url in dict.fromkeys(urls))))
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+
+def render_documents(documents: list[Document], token_budget: int) -> str:
+    """One context block with an excerpt per page, sharing ``token_budget`` evenly."""
+
+    if not documents:
+        return ""
+    share = max(token_budget // len(documents), 1)
+    blocks = [f"Fetched page: {doc.title} ({doc.url})\n{doc.excerpt(share)}" for doc in documents]
+    return "\n\n".join(blocks) + "\n"
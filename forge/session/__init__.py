@@ -0,0 +1,12 @@
+"""Crash-safe session persistence for the developer console."""
+
+from .journal import COMPRESSIONS, SessionJournal, decode_record, encode_record, is_journal, latest_session
+
+__all__ = [
+    "COMPRESSIONS",
+    "SessionJournal",
+    "decode_record",
+    "encode_record",
+    "is_journal",
+    "latest_session",
+]
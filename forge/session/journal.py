@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import os
+import struct
+from typing import Callable, Iterable, Iterator
+
+from ..context.budget import Message
+
+
+COMPRESSIONS = ("gzip", "zstd")
+INDEX_ENTRY = struct.Struct("<QIB")  # Record offset, length and flags; fixed width so the index can be read backwards
+INDEX_SUFFIX = ".idx"
+JOURNAL_KEY = "_j"  # Set on history messages once they are journaled
+
+ASSISTANT = 1
+RESET = 2
+
+_SCAN_ENTRIES = 4096
+
+
+def _codec(name: str) -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if name == "gzip":
+        return (lambda data: gzip.compress(data, compresslevel=6)), gzip.decompress
+    if name == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ValueError("zstd compression needs the 'zstandard' package") from exc
+        return zstandard.ZstdCompressor(level=6).compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"Unknown journal compression: {name!r} (expected one of {', '.join(COMPRESSIONS)})")
+
+
+def encode_record(record: Message, compression: str | None = None, min_bytes: int = 1024) -> bytes:
+    """One JSONL line; bodies of at least ``min_bytes`` are compressed when asked."""
+
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compression and len(line) >= min_bytes:
+        packed = _codec(compression)[0](line)
+        if len(packed) < len(line):
+            line = json.dumps({"_z": compression, "data": base64.b64encode(packed).decode("ascii")}).encode("ascii")
+    return line + b"\n"
+
+
+def decode_record(line: bytes) -> Message:
+    record = json.loads(line)
+    if "_z" in record:
+        record = json.loads(_codec(record["_z"])[1](base64.b64decode(record["data"])))
+    return record
+
+
+def record_flags(record: Message) -> int:
+    if record.get("_op") == "reset":
+        return RESET
+    return ASSISTANT if record.get("role") == "assistant" else 0
+
+
+class SessionJournal:
+    """Append-only JSONL log of a chat session with a fixed-width offset index.
+
+    Every message is written as it enters the history, so a crash loses
+    at most the turn in flight. The ``.idx`` sidecar holds one entry per
+    record; :meth:`tail` walks it backwards to find where the last few
+    turns start and parses only those records, so resuming costs the
+    same however long the session is. A torn final line from a crash is
+    trimmed, and records missing from the index are re-indexed, on open.
+    A new journal's files are only created by the first :meth:`append`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        compression: str | None = None,
+        compress_min_bytes: int = 1024,
+        materialize: Callable[[Message], Message] | None = None,
+    ) -> None:
+        if compression:
+            _codec(compression)  # Fail early on an unknown codec or a missing package
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.compression = compression or None
+        self.compress_min_bytes = compress_min_bytes
+        self.materialize = materialize
+        self._log = self._index = None
+        self._size = 0
+        if os.path.exists(path):
+            self._open()
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._log = open(self.path, "a+b")
+        self._index = open(self.index_path, "a+b")
+        self._recover()
+
+    def _recover(self) -> None:
+        size = self._log.seek(0, os.SEEK_END)
+        if size:
+            self._log.seek(size - 1)
+            if self._log.read(1) != b"\n":  # Torn write: drop the partial record
+                self._log.seek(0)
+                size = self._log.read().rfind(b"\n") + 1
+                self._log.truncate(size)
+        count = self._index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+        self._index.truncate(count * INDEX_ENTRY.size)
+        end = 0
+        while count:
+            offset, length, _ = self._entry(count - 1)
+            if offset + length <= size:
+                end = offset + length
+                break
+            count -= 1  # The log lost this record; forget it
+            self._index.truncate(count * INDEX_ENTRY.size)
+        self._log.seek(end)
+        entries = bytearray()
+        offset = end
+        for line in self._log:
+            entries += INDEX_ENTRY.pack(offset, len(line), record_flags(decode_record(line)))
+            offset += len(line)
+        if entries:
+            self._index.seek(0, os.SEEK_END)
+            self._index.write(entries)
+            self._index.flush()
+        self._size = size
+
+    def __len__(self) -> int:
+        if self._index is None:
+            return 0
+        return self._index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+
+    def _entry(self, index: int) -> tuple[int, int, int]:
+        self._index.seek(index * INDEX_ENTRY.size)
+        return INDEX_ENTRY.unpack(self._index.read(INDEX_ENTRY.size))
+
+    def append(self, record: Message) -> int:
+        """Write one record and return its position in the journal."""
+
+        line = encode_record(record, self.compression, self.compress_min_bytes)
+        if self._log is None:
+            self._open()
+        self._log.seek(0, os.SEEK_END)
+        self._log.write(line)
+        self._log.flush()
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(INDEX_ENTRY.pack(self._size, len(line), record_flags(record)))
+        self._index.flush()
+        self._size += len(line)
+        return len(self) - 1
+
+    def sync(self, history: Iterable[Message]) -> int:
+        """Journal the messages of ``history`` not written yet; returns how many were."""
+
+        written = 0
+        for message in history:
+            if JOURNAL_KEY in message or message.get("role") == "system" or message.get("_summary"):
+                continue  # System prompts come from the code; summaries stand in for turns already journaled
+            record = self.materialize(message) if self.materialize is not None else message
+            message[JOURNAL_KEY] = self.append({key: value for key, value in record.items() if key != JOURNAL_KEY})
+            written += 1
+        return written
+
+    def mark_reset(self) -> None:
+        """Record that the chat was reset; :meth:`tail` never reads past this point."""
+
+        if len(self):  # Nothing earlier to hide, so don't create the file for it
+            self.append({"_op": "reset"})
+
+    def read(self, index: int) -> Message:
+        offset, length, _ = self._entry(index)
+        self._log.seek(offset)
+        return decode_record(self._log.read(length))
+
+    def _entries_backwards(self) -> Iterator[tuple[int, int]]:
+        end = len(self)
+        while end > 0:
+            start = max(end - _SCAN_ENTRIES, 0)
+            self._index.seek(start * INDEX_ENTRY.size)
+            block = self._index.read((end - start) * INDEX_ENTRY.size)
+            entries = list(INDEX_ENTRY.iter_unpack(block))
+            for position in range(len(entries) - 1, -1, -1):
+                yield start + position, entries[position][2]
+            end = start
+
+    def tail_start(self, turns: int) -> int:
+        """Index of the first record in the last ``turns`` turns (since the last reset)."""
+
+        replies = 0
+        for index, flags in self._entries_backwards():
+            if flags & RESET:
+                return index + 1
+            if flags & ASSISTANT:
+                replies += 1
+                if replies > turns:
+                    return index + 1
+        return 0
+
+    def tail(self, turns: int) -> list[Message]:
+        """Messages of the last ``turns`` turns, marked as already journaled."""
+
+        start = self.tail_start(turns)
+        if start >= len(self):
+            return []
+        offset = self._entry(start)[0]
+        self._log.seek(offset)
+        messages = []
+        for index, line in enumerate(self._log.read(self._size - offset).split(b"\n")[:-1], start):
+            message = decode_record(line)
+            if "_op" not in message:
+                message[JOURNAL_KEY] = index
+                messages.append(message)
+        return messages
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._index.close()
+
+    @classmethod
+    def export(cls, path: str, messages: Iterable[Message], **options: object) -> SessionJournal:
+        """Write ``messages`` to a fresh journal at ``path`` (replacing any there)."""
+
+        for stale in (path, path + INDEX_SUFFIX):
+            if os.path.exists(stale):
+                os.remove(stale)
+        journal = cls(path, **options)
+        for message in messages:
+            record = journal.materialize(message) if journal.materialize is not None else message
+            journal.append({key: value for key, value in record.items() if key != JOURNAL_KEY})
+        return journal
+
+
+def is_journal(path: str) -> bool:
+    """Whether ``path`` is a journal rather than a legacy ``/save`` JSON array."""
+
+    with open(path, "rb") as handle:
+        return handle.read(64).lstrip()[:1] != b"["
+
+
+def latest_session(directory: str, exclude: str | None = None) -> str | None:
+    """Most recently written non-empty journal in ``directory``."""
+
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".jsonl")]
+    except FileNotFoundError:
+        return None
+    paths = [os.path.join(directory, name) for name in names]
+    paths = [path for path in paths if exclude is None or os.path.abspath(path) != os.path.abspath(exclude)]
+    paths = [path for path in paths if os.path.getsize(path)]  # A session that never chatted has nothing to resume
+    return max(paths, key=os.path.getmtime, default=None)
@@ -1,37 +1,80 @@
 import os
-from openai import OpenAI
 import sys
+import argparse
+import contextlib
 from dotenv import load_dotenv
 from colorama import init, Fore, Back, Style
 import difflib
 import asyncio
-from duckduckgo_search import DDGS
 import json
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters import TerminalFormatter
-from rich.console import Console
-from rich.table import Table
-import base64
+import time
 from urllib.parse import urlparse
-import requests
-from PIL import Image
-from io import BytesIO
-from atproto import Client
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.completion import WordCompleter
-from prompt_toolkit.application.current import get_app
+# atproto, pygments, rich and prompt_toolkit are imported where they are first needed;
+# tests/test_startup.py keeps them (and PIL, duckduckgo_search) off the import path.
+from forge.batch import EDIT, EXEC, FAILED, PROMPT, SKIPPED, dependencies, load_manifest, run_batch
+from forge.console import JobManager, ProgressLine, StreamRenderer
+from forge.context import (
+    ADDED,
+    BLOB_SCHEME,
+    POLICIES,
+    SUMMARY_PROMPT,
+    UNCHANGED,
+    UPDATED,
+    BlobStore,
+    Compactor,
+    ContextWindow,
+    FileCache,
+    FileContextTable,
+    FileUpdate,
+    OldestLargestFirst,
+    ingest_tree,
+)
+from forge.edits import (
+    PATCH_EDITOR_PROMPT,
+    PIPELINE_FORMAT_HINT,
+    REDO,
+    UNDO,
+    EditPipeline,
+    FileEdit,
+    UndoHistory,
+    apply_patch,
+    commit_edits,
+    edit_concurrently,
+)
+from forge.llm import (
+    CacheUsage,
+    ModelTransport,
+    ResponseCache,
+    ResumableLineStream,
+    StreamEngine,
+    TransportConfig,
+    build_chat_payload,
+    run_interruptible,
+)
+from forge.media import ImageFailure, ImageLimits, ImagePipeline
+from forge.session import SessionJournal, is_journal, latest_session
+from forge.search import DuckDuckGoBackend, FetchFailure, PageFetcher, SearchCache, SearchService, fan_out, render_documents
 
 is_diff_on = True
 
 init(autoreset=True)
 load_dotenv()
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
+# One pooled keep-alive transport shared by DEFAULT_MODEL and EDITOR_MODEL traffic
+transport = ModelTransport(TransportConfig.from_env())
+# Opt-in on-disk cache of complete responses ("1" for the default file, or a path)
+response_cache = None
+if os.getenv("OMNI_RESPONSE_CACHE", "") not in ("", "0"):
+    response_cache = ResponseCache(
+        ".omni_response_cache.sqlite" if os.getenv("OMNI_RESPONSE_CACHE") == "1" else os.getenv("OMNI_RESPONSE_CACHE"),
+        ttl_seconds=float(os.getenv("OMNI_RESPONSE_CACHE_TTL", str(7 * 24 * 3600))),
+        max_bytes=int(os.getenv("OMNI_RESPONSE_CACHE_MB", "64")) * 1024 * 1024,
+    )
+# Every model call streams through the async engine so the event loop never blocks
+engine = StreamEngine(transport, response_cache)
+# Per-model token budget enforced on the chat histories before each request
+context_window = ContextWindow(
+    POLICIES.get(os.getenv("OMNI_CONTEXT_POLICY", "oldest-largest"), OldestLargestFirst)(),
+    budget_override=int(os.getenv("OMNI_CONTEXT_BUDGET", "0")) or None,
 )
 
 AT_IDENTIFIER = os.getenv("AT_IDENTIFIER")
@@ -40,6 +83,13 @@ at_client = None
 
 DEFAULT_MODEL = "anthropic/claude-3.7-sonnet:thinking"
 EDITOR_MODEL = "google/gemini-2.0-flash-001"
+EDIT_CONCURRENCY = int(os.getenv("OMNI_EDIT_CONCURRENCY", "4"))  # Parallel editor streams for /edit -p
+EDIT_FORMAT = os.getenv("OMNI_EDIT_FORMAT", "whole")  # "patch" asks the editor for SEARCH/REPLACE blocks
+QUIET_EDITS = os.getenv("OMNI_QUIET_EDITS", "").lower() in ("1", "true", "yes")  # One progress line per file
+RENDER_FPS = float(os.getenv("OMNI_RENDER_FPS", "30"))  # Max terminal redraws per second while streaming
+ADD_MAX_FILE_BYTES = int(os.getenv("OMNI_ADD_MAX_FILE_BYTES", str(256 * 1024)))  # Larger files are skipped by folder /add
+ADD_MAX_TOTAL_BYTES = int(os.getenv("OMNI_ADD_MAX_TOTAL_BYTES", str(4 * 1024 * 1024)))  # Cap per folder /add
+COMPACT_TOKENS = int(os.getenv("OMNI_COMPACT_TOKENS", "24000"))  # History size that triggers compaction; 0 disables
 # Other common models:
 # "openai/gpt-4o-2024-08-06"
 # "meta-llama/llama-3.1-405b-instruct"
@@ -73,73 +123,97 @@ ULTRA IMPORTANT:
 - Never change imports or function definitions unless explicitly instructed
 - If you spot potential issues in the instructions, fix them!"""
 
-added_files = []
-stored_searches = {}
+file_cache = FileCache(max_bytes=int(os.getenv("OMNI_FILE_CACHE_MB", "64")) * 1024 * 1024)  # Stat-keyed; shared by /add, /edit and /show
+file_contexts = FileContextTable()  # File versions the chat model already holds, by path and content hash
+# Large payloads (file dumps, fetched pages, image data URIs) live here once; messages hold references
+blob_store = BlobStore(os.getenv("OMNI_BLOB_DIR") or None, hot_bytes=int(os.getenv("OMNI_BLOB_HOT_MB", "32")) * 1024 * 1024)
+BLOB_MIN_CHARS = int(os.getenv("OMNI_BLOB_MIN_CHARS", "4096"))  # Shorter text stays inline in the message
+# Every chat message is appended to a JSONL journal here as it happens ("0" disables journaling)
+SESSION_DIR = os.getenv("OMNI_SESSION_DIR", ".omni_sessions")
+SESSION_COMPRESSION = os.getenv("OMNI_SESSION_COMPRESSION", "")  # "", "gzip" or "zstd", per record
+LOAD_TURNS = int(os.getenv("OMNI_LOAD_TURNS", "20"))  # Turns read back by /load, however long the session
+session_journal = None
+stored_searches = {}  # Full query -> results added to the chat so far
+SEARCH_RESULTS = int(os.getenv("OMNI_SEARCH_RESULTS", "8"))  # Results per /search page sent to the model
+SEARCH_CONCURRENCY = int(os.getenv("OMNI_SEARCH_CONCURRENCY", "4"))  # Queries in flight for a multi-query /search
+FETCH_PAGES = int(os.getenv("OMNI_FETCH_PAGES", "3"))  # Result pages downloaded by /search --deep
+FETCH_TOKENS = int(os.getenv("OMNI_FETCH_TOKENS", "4000"))  # Context budget shared by fetched page excerpts
+# Pooled client for /fetch and /search --deep, with per-host limits and an ETag-aware document cache
+page_fetcher = PageFetcher(
+    max_bytes=int(os.getenv("OMNI_FETCH_MAX_BYTES", str(2 * 1024 * 1024))),
+    timeout=float(os.getenv("OMNI_FETCH_TIMEOUT", "10")),
+)
+search_service = None  # Opened by get_search_service() on the first /search
 file_templates = {
     "python": "def main():\n    pass\n\nif __name__ == \"__main__\":\n    main()",
     "html": "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n    <meta charset=\"UTF-8\">\n    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">\n    <title>Document</title>\n</head>\n<body>\n    \n</body>\n</html>",
     "javascript": "// Your JavaScript code here"
 }
-undo_history = {}
+undo_history = None  # Opened by get_undo_history() on the first edit or /undo
+# /exec streams output line by line; each job keeps only a bounded ring of its latest lines
+job_manager = JobManager(ring_lines=int(os.getenv("OMNI_EXEC_BUFFER_LINES", "2000")))
+EXEC_TIMEOUT = float(os.getenv("OMNI_EXEC_TIMEOUT", "0")) or None  # Seconds; 0 means no limit
 stored_images = {}
-command_history = FileHistory('.aiconsole_history.txt')
-commands = WordCompleter([
-    '/add', '/edit', '/new', '/search', '/image',
+# Images are validated from their headers, downscaled past these limits and cached by content hash
+image_pipeline = ImagePipeline(ImageLimits(
+    max_dimension=int(os.getenv("OMNI_IMAGE_MAX_DIMENSION", "2048")),
+    max_bytes=int(os.getenv("OMNI_IMAGE_MAX_BYTES", str(4 * 1024 * 1024))),
+))
+commands = [
+    '/add', '/edit', '/new', '/search', '/fetch', '/image',
     '/clear', '/reset', '/diff', '/history', '/save',
-    '/load', '/undo', '/list', '/exec', '/atpost', '/sovereign_gateway', '/help',
-    '/model', '/change_model', '/show', 'exit'
-], ignore_case=True)
-session = PromptSession(history=command_history)
+    '/load', '/undo', '/redo', '/list', '/exec', '/jobs', '/fg', '/atpost', '/sovereign_gateway', '/help',
+    '/model', '/change_model', '/show', '/cache', 'exit'
+]
+prompt_session = None
+
+def get_prompt_session():
+    """The REPL prompt, with file history and command completion, built on first use."""
+    global prompt_session
+    if prompt_session is None:
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+        from prompt_toolkit.completion import WordCompleter
+        from prompt_toolkit.history import FileHistory
+        prompt_session = PromptSession(
+            history=FileHistory('.aiconsole_history.txt'),
+            auto_suggest=AutoSuggestFromHistory(),
+            completer=WordCompleter(commands, ignore_case=True),
+        )
+    return prompt_session
+
+def get_search_service():
+    """The /search service, opening its on-disk cache on first use."""
+    global search_service
+    if search_service is None:
+        # Search results are cached by normalized query ("0" keeps the cache in memory only)
+        search_service = SearchService(
+            DuckDuckGoBackend(),
+            SearchCache(
+                ":memory:" if os.getenv("OMNI_SEARCH_CACHE") == "0" else os.getenv("OMNI_SEARCH_CACHE", ".omni_search_cache.sqlite"),
+                ttl_seconds=float(os.getenv("OMNI_SEARCH_CACHE_TTL", str(24 * 3600))),
+            ),
+            page_size=SEARCH_RESULTS,
+        )
+    return search_service
+
+def get_undo_history():
+    """The undo/redo store, opened on the first edit or /undo."""
+    global undo_history
+    if undo_history is None:
+        # Per-file undo/redo stacks of compressed reverse diffs, kept across restarts ("0" keeps them in memory only)
+        undo_history = UndoHistory(
+            ":memory:" if os.getenv("OMNI_UNDO_DB") == "0" else os.getenv("OMNI_UNDO_DB", ".omni_undo.sqlite"),
+            depth=int(os.getenv("OMNI_UNDO_DEPTH", "50")),
+            max_bytes=int(os.getenv("OMNI_UNDO_MB", "16")) * 1024 * 1024,
+        )
+    return undo_history
 
 async def get_input_async(message):
-    session = PromptSession()
-    result = await session.prompt_async(HTML(f"<ansired>{message}</ansired> "),
-        auto_suggest=AutoSuggestFromHistory(),
-        completer=commands,
-        refresh_interval=0.5)
+    from prompt_toolkit.formatted_text import HTML
+    result = await get_prompt_session().prompt_async(HTML(f"<ansired>{message}</ansired> "), refresh_interval=0.5)
     return result.strip()
 
-def encode_image(image_path):
-    """Turn a local image into base64."""
-    try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-    except FileNotFoundError:
-        return None
-    except IOError:
-        return None
-
-def validate_image_url(url, timeout=10):
-    try:
-        response = requests.get(
-            url,
-            stream=True,
-            timeout=timeout,
-            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.28 Safari/537.36'}
-        )
-        response.raise_for_status()
-
-        # Check Content-Type
-        content_type = response.headers.get('Content-Type', '').lower()
-        if content_type.startswith(('image/', 'application/octet-stream')):
-            return True
-
-        # Force load it as an image
-        image = Image.open(BytesIO(response.content))
-        image.verify()
-
-        return True
-
-    except requests.exceptions.RequestException as e:
-        print_colored(f"Network error: {e}", Fore.RED)
-        return False
-    except Image.UnidentifiedImageError:
-        print_colored(f"The URL doesn't point to a valid image.", Fore.RED)
-        return False
-    except Exception as e:
-        print_colored(f"Unexpected error: {e}", Fore.RED)
-        return False
-
 def is_url(string):
     """Check if a string is a valid URL."""
     try:
@@ -154,70 +228,35 @@ async def handle_image_command(filepaths_or_urls, default_chat_history):
         print_colored("❌ No images or URLs provided.", Fore.RED)
         return default_chat_history
 
-    processed_images = 0
+    # Every image is validated and shrunk concurrently; results come back in order
+    prepared = await image_pipeline.prepare_all(filepaths_or_urls)
     success_images = 0
+    for idx, image in enumerate(prepared, 1):
+        if isinstance(image, ImageFailure):
+            print_colored(f"❌ {image.source} isn't a valid image. Error: {image.error}. Skipping.", Fore.RED)
+            continue
+        message = blob_store.offload(image.message())  # Data URIs are stored once and referenced
+        stored_images[f"image_{len(stored_images) + 1}"] = {
+            "type": "image",
+            "source": "url" if is_url(image.source) else "local",
+            "content": message["content"][0]["image_url"]["url"],
+        }
+        default_chat_history.append(message)
+        if image.resized:
+            note = f" (downscaled {image.original_size[0]}×{image.original_size[1]} → {image.width}×{image.height}, {image.size / 1024:,.0f} KiB)"
+        elif image.url == image.source:
+            note = " (sent as a link)"
+        else:
+            note = ""
+        print_colored(f"✅ Image {idx} added successfully{' from cache' if image.cached else ''}!{note}", Fore.GREEN)
+        success_images += 1
 
-    for idx, image_path in enumerate(filepaths_or_urls, 1):
-        try:
-            if is_url(image_path):  # URL-based
-                if validate_image_url(image_path):
-                    stored_images[f"image_{len(stored_images) + 1}"] = {
-                        "type": "image",
-                        "source": "url",
-                        "content": image_path
-                    }
-                    default_chat_history.append({
-                        "role": "user",
-                        "content": [{"type": "image_url", "image_url": {"url": image_path}}]
-                    })
-                    print_colored(f"✅ URL-based image {idx} added successfully!", Fore.GREEN)
-                    success_images += 1
-                else:
-                    print_colored(f"❌ {image_path} isn't a valid image URL. Skipping.", Fore.RED)
-
-            else:  # Local filepath
-                image_content = encode_image(image_path)
-                if image_content:
-                    try:
-                        # Detect if it's actually an image
-                        with Image.open(image_path) as img:
-                            img_format = img.format.lower() if img.format else None
-                            if img_format not in ['jpeg', 'jpg', 'png', 'webp', 'gif']:
-                                raise ValueError(f"Unsupported image format: {img_format}")
-
-                            data_uri = f"data:image/{img_format};base64,{image_content}"
-
-                            stored_images[f"image_{len(stored_images) + 1}"] = {
-                                "type": "image",
-                                "source": "local",
-                                "content": data_uri
-                            }
-                            default_chat_history.append({
-                                "role": "user",
-                                "content": [{
-                                    "type": "image_url",
-                                    "image_url": {"url": data_uri}
-                                }]
-                            })
-                            print_colored(f"✅ Local image {idx} added successfully!", Fore.GREEN)
-                            success_images += 1
-                    except (IOError, ValueError) as e:
-                        print_colored(f"❌ {image_path} isn't a valid image. Error: {e}. Skipping.", Fore.RED)
-                else:
-                    print_colored(f"❌ Failed loading: {image_path}", Fore.RED)
-
-        except Exception as e:
-            print_colored(f"❌ Unexpected error processing {image_path}: {e}. Skipping.", Fore.RED)
-
-        processed_images += 1  # Always increment, even if we skip
-
-    print_colored(f"🖼️ {processed_images} images processed. {success_images} added successfully. {len(stored_images)} total images in memory!", Fore.CYAN)
+    print_colored(f"🖼️ {len(prepared)} images processed. {success_images} added successfully. {len(stored_images)} total images in memory!", Fore.CYAN)
 
     return default_chat_history
 
-async def aget_results(word):
-    results = await DDGS(proxy=None).atext(word, max_results=100)
-    return results
+async def aget_results(word, page=0):
+    return await get_search_service().page(word, page)
 
 def clear_console():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -225,105 +264,92 @@ def clear_console():
 def print_colored(text, color=Fore.WHITE, style=Style.NORMAL, end='\n'):
     print(f"{style}{color}{text}{Style.RESET_ALL}", end=end)
 
-def get_streaming_response(messages, model):
+def fit_context(messages, model):
+    """Evict or truncate old context so the next request fits the model's budget."""
+    report = context_window.fit(messages, model)
+    if report.changed:
+        print_colored(
+            f"🧹 Context over budget (~{report.tokens_before} > {report.budget} tokens): "
+            f"freed ~{report.tokens_before - report.tokens_after} tokens.",
+            Fore.YELLOW,
+        )
+        for eviction in report.evictions:
+            print_colored(f"   {eviction.action} {eviction.role} message (~{eviction.tokens_freed} tokens): {eviction.preview}", Fore.YELLOW)
+    return report
+
+async def summarize_transcript(transcript):
+    """Condense old turns with the fast editor model for background compaction."""
+    messages = [{"role": "system", "content": SUMMARY_PROMPT}, {"role": "user", "content": transcript}]
+    result = await engine.collect(build_chat_payload(messages, EDITOR_MODEL, max_tokens=2000, reasoning=False))
+    if result.cancelled:
+        raise asyncio.CancelledError()
+    return result.content
+
+def apply_compaction(messages):
+    """Swap in a finished background summary; only ever called between requests."""
+    result = compactor.apply(messages)
+    if result:
+        print_colored(
+            f"🗜️ Compacted {result.replaced} earlier messages into a summary "
+            f"(~{result.tokens_before} → ~{result.tokens_after} tokens).",
+            Fore.CYAN,
+        )
+    elif compactor.last_error:
+        print_colored(f"⚠️ Background compaction failed: {compactor.last_error}", Fore.YELLOW)
+        compactor.last_error = None
+
+# Old turns are summarized in the background once the history passes COMPACT_TOKENS
+compactor = Compactor(summarize_transcript, threshold_tokens=COMPACT_TOKENS, materialize=blob_store.materialize)
+
+async def get_streaming_response(messages, model, on_content=None):
     try:
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
-            "Content-Type": "application/json"
-        }
-        
-        # Configure model-specific reasoning settings
-        reasoning_config = None
-        if "anthropic" in model:
-            reasoning_config = {
-                "max_tokens": 8000  # For Anthropic models
-            }
-        elif "openai" in model:
-            reasoning_config = {
-                "effort": "high"  # For OpenAI models
-            }
-        
-        payload = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": 10000,
-            "stream": True
-        }
-        
-        # Only add reasoning if we have a configuration
-        if reasoning_config:
-            payload["reasoning"] = reasoning_config
-        
-        # Make the direct API call
-        response = requests.post(url, json=payload, headers=headers, stream=True)
-        response.raise_for_status()
-        
-        full_response = ""
-        full_reasoning = ""
+        fit_context(messages, model)
+        payload = build_chat_payload(messages, model, materialize=blob_store.materialize)
         current_mode = None  # Track if we're in reasoning or content mode
-        
-        # Process the SSE stream
-        for line in response.iter_lines():
-            if line:
-                line = line.decode('utf-8')
-                if line.startswith('data: '):
-                    if line == 'data: [DONE]':
-                        break
-                    
-                    line = line[6:]  # Remove 'data: ' prefix
-                    try:
-                        chunk = json.loads(line)
-                        delta = chunk.get('choices', [{}])[0].get('delta', {})
-                        
-                        # Check for reasoning tokens
-                        if 'reasoning' in delta and delta['reasoning'] is not None:
-                            # Check if we need to transition from content to reasoning
-                            if current_mode != "reasoning":
-                                current_mode = "reasoning"
-                            
-                            # Print reasoning in cyan, no prefix
-                            print_colored(delta['reasoning'], Fore.CYAN, end="")
-                            full_reasoning += delta['reasoning']
-                        
-                        # Check for content tokens
-                        elif 'content' in delta and delta['content'] is not None:
-                            # Check if we need to transition from reasoning to content
-                            if current_mode == "reasoning":
-                                print("\n\n")  # Add spacing between reasoning and content
-                                current_mode = "content"
-                            elif current_mode is None:
-                                current_mode = "content"
-                            
-                            # Print content in white, no prefix
-                            print_colored(delta['content'], Fore.WHITE, end="")
-                            full_response += delta['content']
-                            
-                    except json.JSONDecodeError:
-                        continue
-                    except Exception as e:
-                        # Just continue on parse errors
-                        continue
-        
+        renderer = StreamRenderer(fps=RENDER_FPS)  # Coalesce deltas into bounded-rate frames
+
+        def render(event):
+            nonlocal current_mode
+            if event.kind == "reasoning":
+                current_mode = "reasoning"
+                # Print reasoning in cyan, no prefix
+                renderer.write(event.text, Fore.CYAN)
+            else:
+                if current_mode == "reasoning":
+                    renderer.write("\n\n\n", Fore.WHITE)  # Add spacing between reasoning and content
+                current_mode = "content"
+                # Print content in white, no prefix
+                renderer.write(event.text, Fore.WHITE)
+                if on_content is not None:
+                    on_content(event.text)
+
+        try:
+            result = await engine.collect(payload, on_event=render)
+        finally:
+            renderer.close()
+
         # Ensure newline at end
         print()
-        
-        return {
-            "content": full_response,
-            "reasoning": full_reasoning
-        }
+        if result.cancelled:
+            print_colored("⏹️ Generation cancelled. Partial output kept.", Fore.YELLOW)
+        cache_usage = CacheUsage.from_usage(result.usage)
+        if cache_usage.cached or cache_usage.written:
+            print_colored(f"💾 Prompt cache: {cache_usage.describe()}", Fore.CYAN)
+
+        return result.to_dict()
     except Exception as e:
         print_colored(f"Error in streaming response: {e}", Fore.RED)
-        return {"content": "", "reasoning": ""}
+        return {"content": "", "reasoning": "", "cancelled": False}
 
 def read_file_content(filepath):
     try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return file.read()
+        return file_cache.read_text(filepath)
     except FileNotFoundError:
         return f"❌ Error: File not found: {filepath}"
     except IOError as e:
         return f"❌ Error reading {filepath}: {e}"
+    except UnicodeDecodeError:
+        return f"❌ Error reading {filepath}: not a UTF-8 text file"
 
 def write_file_content(filepath, content):
     try:
@@ -332,64 +358,96 @@ def write_file_content(filepath, content):
         return True
     except IOError:
         return False
+    finally:
+        file_cache.invalidate(filepath)  # Same-size rewrites can keep the old mtime on coarse filesystems
 
-def is_text_file(file_path, sample_size=8192, text_characters=set(bytes(range(32,127)) + b'\n\r\t\b')):
+def is_text_file(file_path):
     """Determine whether a file is text or binary."""
-    try:
-        with open(file_path, 'rb') as f:
-            chunk = f.read(sample_size)
-
-        if not chunk:  # Empty files are considered text
-            return True
-
-        if b'\x00' in chunk:  # Null bytes usually indicate binary
-            return False
-
-        # If >30% of chars are non-text, probably binary
-        text_chars = sum(byte in text_characters for byte in chunk)
-        return text_chars / len(chunk) > 0.7
-
-    except IOError:
-        return False
+    return file_cache.is_text(file_path)
 
-async def handle_add_command(chat_history, *paths):
-    global added_files
+async def handle_add_command(chat_history, *paths, pin=False, recursive=False, include=(), exclude=()):
     contents = []
-    new_context = ""
 
     for path in paths:
         if os.path.isfile(path):  # File handling
             content = read_file_content(path)
             if not content.startswith("❌"):
                 contents.append((path, content))
-                added_files.append(path)
 
         elif os.path.isdir(path):  # Directory handling
-            print_colored(f"📁 Processing folder: {path}", Fore.CYAN)
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                if os.path.isfile(item_path) and is_text_file(item_path):
-                    content = read_file_content(item_path)
-                    if not content.startswith("❌"):
-                        contents.append((item_path, content))
-                        added_files.append(item_path)
+            print_colored(f"📁 Processing folder{' recursively' if recursive else ''}: {path}", Fore.CYAN)
+            report = await asyncio.to_thread(
+                ingest_tree, path, recursive=recursive, include=include, exclude=exclude,
+                max_file_bytes=ADD_MAX_FILE_BYTES, max_total_bytes=ADD_MAX_TOTAL_BYTES, reader=file_cache.read_if_text,
+            )
+            contents.extend(report.files)
+            print_colored(f"📦 Ingested {report.summary()}", Fore.CYAN)
 
         else:
             print_colored(f"❌ '{path}' is neither a valid file nor folder.", Fore.RED)
 
-    if contents:
-        for fp, content in contents:
-            new_context += f"""The following file has been added: {fp}:
-\n{content}\n\n"""
-
-        chat_history.append({"role": "user", "content": new_context})
-        print_colored(f"✅ Added {len(contents)} files to knowledge!", Fore.GREEN)
-    else:
+    if not contents:
         print_colored("❌ No valid files were added to knowledge.", Fore.YELLOW)
+        return chat_history
+
+    contents = dict(contents)
+    updates = [file_contexts.stage(fp, content, chat_history) for fp, content in contents.items()]
+    changed = [update for update in updates if update.kind != UNCHANGED]
+    unchanged = len(updates) - len(changed)
+    if changed:
+        message = {"role": "user", "content": "".join(update.render() for update in changed)}
+        if pin:
+            message["_pinned"] = True  # Never evicted by the context budget
+        message = blob_store.offload(message, min_chars=BLOB_MIN_CHARS)
+        chat_history.append(message)
+        file_contexts.commit(changed, contents, message)
+        added = sum(update.kind == ADDED for update in changed)
+        summary = f"✅ Added {added} files to knowledge" if added else "✅ Knowledge is up to date"
+        if len(changed) > added:
+            summary += f", sent diffs for {len(changed) - added} changed files"
+        print_colored(f"{summary}{' (pinned)' if pin else ''}!", Fore.GREEN)
+    if unchanged:
+        print_colored(f"ℹ️ {unchanged} files unchanged since they were added; nothing re-sent.", Fore.YELLOW)
 
     return chat_history
 
-async def handle_edit_command(default_chat_history, editor_chat_history, filepaths):
+def parse_add_args(args):
+    """Split `/add` arguments into paths and the options for handle_add_command."""
+    paths, options = [], {"pin": False, "recursive": False, "include": [], "exclude": []}
+    args = iter(args)
+    for arg in args:
+        if arg == "--pin":
+            options["pin"] = True
+        elif arg in ("-r", "--recursive"):
+            options["recursive"] = True
+        elif arg in ("--include", "--exclude"):
+            pattern = next(args, "")
+            if pattern:
+                options[arg[2:]].append(pattern)
+        else:
+            paths.append(arg)
+    return paths, options
+
+def sync_file_contexts(chat_history, filepaths):
+    """After /edit writes files, send the chat model a diff for those it already holds."""
+    tracked = {fp: read_file_content(fp) for fp in filepaths if fp in file_contexts}
+    contents = {fp: content for fp, content in tracked.items() if not content.startswith("❌")}
+    if not contents:
+        return
+    updates = [file_contexts.stage(fp, content, chat_history) for fp, content in contents.items()]
+    changed = [update for update in updates if update.kind == UPDATED]
+    for update in updates:
+        if update.kind == ADDED:
+            file_contexts.discard(update.path)  # Evicted meanwhile; the next /add sends it in full
+    if changed:
+        message = {"role": "user", "content": "".join(update.render() for update in changed)}
+        chat_history.append(message)
+        file_contexts.commit(changed, contents, message)
+
+async def handle_edit_command(default_chat_history, editor_chat_history, filepaths, concurrency=1, pipelined=False, edit_format=None, quiet=None):
+    edit_format = edit_format or EDIT_FORMAT
+    quiet = QUIET_EDITS if quiet is None else quiet
+    fit_context(editor_chat_history, EDITOR_MODEL)  # Editor history grows by a whole file per edit
     all_contents = [read_file_content(fp) for fp in filepaths]
     valid_files, valid_contents = [], []
 
@@ -409,61 +467,41 @@ async def handle_edit_command(default_chat_history, editor_chat_history, filepat
     instructions_prompt = "For these files:\n"
     instructions_prompt += "\n".join([f"File: {fp}\n```\n{content}\n```\n" for fp, content in zip(valid_files, valid_contents)])
     instructions_prompt += f"User wants: {user_request}\nProvide LINE-BY-LINE edit instructions for ALL files. Number each instruction and specify which file it applies to.\n"
+    if pipelined:
+        instructions_prompt += PIPELINE_FORMAT_HINT
 
     default_chat_history.append({"role": "user", "content": instructions_prompt})
-    default_instructions = get_streaming_response(default_chat_history, DEFAULT_MODEL)
+    if pipelined:
+        await edit_files_pipelined(default_chat_history, editor_chat_history, valid_files, valid_contents, concurrency, edit_format)
+        sync_file_contexts(default_chat_history, valid_files)
+        return default_chat_history, editor_chat_history
+
+    response = await get_streaming_response(default_chat_history, DEFAULT_MODEL)
+    default_instructions = response["content"]
     default_chat_history.append({"role": "assistant", "content": default_instructions})
 
     print_colored("\n" + "=" * 50, Fore.MAGENTA)
 
+    if concurrency > 1 and len(valid_files) > 1:
+        await edit_files_in_parallel(editor_chat_history, valid_files, valid_contents, default_instructions, concurrency, edit_format)
+        sync_file_contexts(default_chat_history, valid_files)
+        return default_chat_history, editor_chat_history
+
     for idx, (filepath, content) in enumerate(zip(valid_files, valid_contents), 1):
         try:
             print_colored(f"📝 EDITING {filepath} ({idx}/{len(valid_files)}):", Fore.BLUE)
 
-            edit_message = f"""
-            Original code:
-
-            {content}
-
-            Instructions: {default_instructions}
-
-            Follow only instructions applicable to {filepath}. Output ONLY the new code. No explanations. DO NOT ADD ANYTHING ELSE. no type of file at the beginning of the file like ```python etq. no ``` at the end of the file.
-            """
-
+            edit_message = build_edit_message(filepath, content, default_instructions, edit_format)
             editor_chat_history.append({"role": "user", "content": edit_message})
 
             current_content = read_file_content(filepath)  # Read fresh
             if current_content.startswith("❌"):
                 return default_chat_history, editor_chat_history
 
-            lines = current_content.split('\n')
-            buffer = ""
-            edited_lines = lines.copy()  # Create a copy to store edited lines
-            line_index = 0
-
-            for chunk in client.chat.completions.create(
-                model=EDITOR_MODEL,
-                messages=editor_chat_history,
-                stream=True,
-            ):
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    print_colored(content, end="")
-                    buffer += content
-
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        if line_index < len(edited_lines):
-                            edited_lines[line_index] = line
-                            print_colored(f"✏️ Updated Line {line_index+1}: {line[:50]}...", Fore.CYAN)
-                            line_index += 1
-                        else:
-                            edited_lines.append(line)
-                            print_colored(f"➕ NEW Line {line_index+1}: {line[:50]}...", Fore.YELLOW)
-                            line_index += 1
-
-            result = '\n'.join(edited_lines)
-            undo_history[filepath] = current_content   # Store undo
+            result = await generate_file_edit(
+                editor_chat_history, filepath, content, current_content, default_instructions, edit_format,
+                display="quiet" if quiet else "full",
+            )
             editor_chat_history.append({"role": "assistant", "content": result})
 
             if is_diff_on:
@@ -471,6 +509,7 @@ async def handle_edit_command(default_chat_history, editor_chat_history, filepat
 
             # Write the changes to the file only after the entire editing process
             if write_file_content(filepath, result):
+                get_undo_history().record(filepath, current_content, result)  # Store undo
                 print_colored(f"✅ {filepath} successfully edited and saved!", Fore.GREEN)
             else:
                 print_colored(f"❌ Failed to save changes to {filepath}", Fore.RED)
@@ -479,8 +518,194 @@ async def handle_edit_command(default_chat_history, editor_chat_history, filepat
         except Exception as e:
             print_colored(f"❌ Error editing {filepath}: {e}", Fore.RED)
 
+    sync_file_contexts(default_chat_history, valid_files)
     return default_chat_history, editor_chat_history
 
+def build_edit_message(filepath, content, instructions, edit_format="whole"):
+    if edit_format == "patch":
+        output_rule = f"Follow only instructions applicable to {filepath}. Output ONLY SEARCH/REPLACE blocks for {filepath}. No explanations. DO NOT output the whole file."
+    else:
+        output_rule = f"Follow only instructions applicable to {filepath}. Output ONLY the new code. No explanations. DO NOT ADD ANYTHING ELSE. no type of file at the beginning of the file like ```python etq. no ``` at the end of the file."
+    return f"""
+            Original code:
+
+            {content}
+
+            Instructions: {instructions}
+
+            {output_rule}
+            """
+
+async def generate_file_edit(editor_messages, filepath, original, current_content, instructions, edit_format="whole", display="full"):
+    """Produce the edited file, via patch blocks when asked, else whole-file regeneration."""
+    if edit_format == "patch":
+        patch_messages = [{"role": "system", "content": PATCH_EDITOR_PROMPT}, editor_messages[-1]]
+        payload = build_chat_payload(patch_messages, EDITOR_MODEL, max_tokens=None, reasoning=False)
+        renderer = StreamRenderer(fps=RENDER_FPS)
+        try:
+            response = await engine.collect(payload, on_event=(lambda event: renderer.write(event.text)) if display == "full" else None)
+        finally:
+            renderer.close()
+        if response.cancelled:
+            raise asyncio.CancelledError()
+        outcome = apply_patch(current_content, response.content)
+        if outcome.ok:
+            if display != "off":
+                print_colored(f"🩹 Applied {outcome.applied} patch block(s) to {filepath} ({outcome.fuzzy} fuzzy)", Fore.CYAN)
+            return outcome.text
+        for failure in outcome.failures:
+            print_colored(f"⚠️ {filepath} {failure.describe()}", Fore.YELLOW)
+        print_colored(f"↩️ Falling back to whole-file regeneration for {filepath}", Fore.YELLOW)
+        whole_message = build_edit_message(filepath, original, instructions)
+        editor_messages = editor_messages[:-1] + [{"role": "user", "content": whole_message}]
+    return await stream_file_edit(editor_messages, current_content, display, label=filepath)
+
+async def stream_file_edit(editor_messages, current_content, display="full", label="file"):
+    """Stream one editor completion and rebuild the file line by line.
+
+    Received lines are checkpointed, so a dropped connection resumes after
+    the last complete line instead of regenerating the whole file. With
+    display="quiet" a single progress line replaces the per-line log.
+    """
+    lines = current_content.split('\n')
+    edited_lines = lines.copy()  # Create a copy to store edited lines
+    line_index = 0
+    renderer = StreamRenderer(fps=RENDER_FPS) if display == "full" else None
+    progress = ProgressLine(f"✏️ {label}:") if display == "quiet" else None
+
+    def on_resume(attempt, received):
+        if renderer:
+            renderer.flush()
+        print_colored(f"\n🔁 Editor stream dropped after {received} lines; resuming (attempt {attempt})...", Fore.YELLOW)
+
+    stream = ResumableLineStream(
+        engine,
+        editor_messages,
+        lambda messages: build_chat_payload(messages, EDITOR_MODEL, max_tokens=None, reasoning=False),
+        on_resume=on_resume,
+    )
+    try:
+        async for line in stream.lines():
+            if renderer:
+                renderer.write(line + "\n", Fore.WHITE)
+            if line_index < len(edited_lines):
+                edited_lines[line_index] = line
+                if renderer:
+                    renderer.write(f"✏️ Updated Line {line_index+1}: {line[:50]}...\n", Fore.CYAN)
+                line_index += 1
+            else:
+                edited_lines.append(line)
+                if renderer:
+                    renderer.write(f"➕ NEW Line {line_index+1}: {line[:50]}...\n", Fore.YELLOW)
+                line_index += 1
+            if progress:
+                progress.update(f"{line_index} lines received")
+        if stream.tail:  # The model ended the file without a trailing newline
+            if renderer:
+                renderer.write(stream.tail + "\n", Fore.WHITE)
+            if line_index < len(edited_lines):
+                edited_lines[line_index] = stream.tail
+            else:
+                edited_lines.append(stream.tail)
+            line_index += 1
+    finally:
+        if renderer:
+            renderer.close()
+    if progress:
+        progress.done(f"{line_index} lines received ✅")
+
+    return '\n'.join(edited_lines)
+
+def make_edit_job(editor_chat_history, originals, edit_format="whole"):
+    """Build the per-file editor job shared by the parallel and pipelined modes."""
+    async def edit_one(filepath, instructions):
+        current_content = read_file_content(filepath)  # Read fresh
+        if current_content.startswith("❌"):
+            raise IOError(current_content)
+        edit_message = build_edit_message(filepath, originals[filepath], instructions, edit_format)
+        messages = editor_chat_history + [{"role": "user", "content": edit_message}]
+        result = await generate_file_edit(
+            messages, filepath, originals[filepath], current_content, instructions, edit_format, display="off"
+        )
+        print_colored(f"✏️ Finished generating {filepath}", Fore.CYAN)
+        return FileEdit(filepath, current_content, result, edit_message)
+
+    return edit_one
+
+async def edit_files_in_parallel(editor_chat_history, filepaths, contents, instructions, concurrency, edit_format="whole"):
+    """Run the editor streams concurrently, then write every file or none."""
+    print_colored(f"⚡ Editing {len(filepaths)} files with up to {concurrency} parallel streams...", Fore.BLUE)
+    edit_one = make_edit_job(editor_chat_history, dict(zip(filepaths, contents)), edit_format)
+    edits = await edit_concurrently(filepaths, lambda filepath: edit_one(filepath, instructions), concurrency)
+    commit_parallel_edits(editor_chat_history, edits)
+
+async def edit_files_pipelined(default_chat_history, editor_chat_history, filepaths, contents, concurrency, edit_format="whole"):
+    """Start each file's editor stream as soon as its planning section has streamed in."""
+    edit_one = make_edit_job(editor_chat_history, dict(zip(filepaths, contents)), edit_format)
+    pipeline = EditPipeline(filepaths, edit_one, concurrency)
+    try:
+        response = await get_streaming_response(default_chat_history, DEFAULT_MODEL, on_content=pipeline.feed)
+    except asyncio.CancelledError:
+        pipeline.cancel()
+        raise
+    default_chat_history.append({"role": "assistant", "content": response["content"]})
+
+    if response["cancelled"] or not response["content"]:
+        pipeline.cancel()
+        print_colored("❌ Planning did not complete; no files were changed.", Fore.RED)
+        return
+
+    print_colored("\n" + "=" * 50, Fore.MAGENTA)
+    if pipeline.started:
+        print_colored(f"⚡ Editing started while planning for: {', '.join(pipeline.started)}", Fore.BLUE)
+    edits = await pipeline.finish(response["content"])
+    commit_parallel_edits(editor_chat_history, edits)
+
+def commit_parallel_edits(editor_chat_history, edits):
+    """Report each file in the original order, then write every file or none."""
+    for idx, edit in enumerate(edits, 1):
+        print_colored(f"📝 {edit.path} ({idx}/{len(edits)}):", Fore.BLUE)
+        if not edit.ok:
+            print_colored(f"❌ Error editing {edit.path}: {edit.error}", Fore.RED)
+        elif is_diff_on:
+            display_diff(edit.original, edit.result)
+        print_colored("=" * 50, Fore.MAGENTA)
+
+    blocked = commit_edits(edits, write_file_content)
+    if blocked:
+        print_colored(f"❌ No files were changed; blocked by: {', '.join(blocked)}", Fore.RED)
+        return
+
+    for edit in edits:
+        get_undo_history().record(edit.path, edit.original, edit.result)  # Store undo
+        editor_chat_history.append({"role": "user", "content": edit.prompt})
+        editor_chat_history.append({"role": "assistant", "content": edit.result})
+    print_colored(f"✅ All {len(edits)} files successfully edited and saved!", Fore.GREEN)
+
+def parse_edit_args(args):
+    """Split `/edit` arguments into file paths and the options for handle_edit_command."""
+    filepaths, concurrency, pipelined, edit_format, quiet = [], None, False, None, None
+    args = iter(args)
+    for arg in args:
+        if arg in ("--patch", "--whole"):
+            edit_format = arg[2:]
+            continue
+        if arg in ("-q", "--quiet"):
+            quiet = True
+            continue
+        if arg in ("-p", "--parallel"):
+            concurrency = EDIT_CONCURRENCY
+        elif arg == "-j":
+            limit = next(args, "")
+            concurrency = max(1, int(limit)) if limit.isdigit() else EDIT_CONCURRENCY
+        elif arg == "--pipeline":
+            pipelined = True
+        else:
+            filepaths.append(arg)
+    if concurrency is None:
+        concurrency = EDIT_CONCURRENCY if pipelined else 1
+    return filepaths, {"concurrency": concurrency, "pipelined": pipelined, "edit_format": edit_format, "quiet": quiet}
+
 async def handle_new_command(default_chat_history, editor_chat_history, filepaths):
     if not filepaths:
         print_colored("❌ No file paths provided.", Fore.RED)
@@ -511,12 +736,23 @@ async def handle_new_command(default_chat_history, editor_chat_history, filepath
 
     return default_chat_history, editor_chat_history
 
-async def handle_clear_command():
-    global added_files, stored_searches, stored_images
+def collect_blobs(*histories):
+    """Drop stored payloads no chat history or stored image still points at."""
+    images = [image["content"][len(BLOB_SCHEME):] for image in stored_images.values() if image["content"].startswith(BLOB_SCHEME)]
+    return blob_store.collect(*histories, extra=images)
+
+def describe_blob_store():
+    stats = blob_store.stats()
+    hot = stats["hot_bytes"] / (1024 * 1024)
+    spilled = stats["spilled_bytes"] / (1024 * 1024)
+    return f"{stats['blobs']} blobs, {hot:.1f} MiB in memory, {stats['spilled']} spilled to disk ({spilled:.1f} MiB)"
+
+async def handle_clear_command(*histories):
+    global stored_searches, stored_images
     cleared_something = False
 
-    if added_files:
-        added_files.clear()
+    if file_contexts:
+        file_contexts.clear()
         cleared_something = True
         print_colored("✅ Cleared memory of added files.", Fore.GREEN)
 
@@ -531,17 +767,26 @@ async def handle_clear_command():
         cleared_something = True
         print_colored(f"✅ Cleared {image_count} images from memory.", Fore.GREEN)
 
+    freed = collect_blobs(*histories)
+    if freed:
+        cleared_something = True
+        print_colored(f"✅ Released {freed} stored payloads no longer referenced by the chat.", Fore.GREEN)
+
     if not cleared_something:
         print_colored("ℹ️ No files, searches or images in memory to clear.", Fore.YELLOW)
 
 async def handle_reset_command(default_chat_history, editor_chat_history):
     """Clears all chat history and added files memory."""
-    global added_files, stored_searches, stored_images
+    global stored_searches, stored_images
+    journal_history(default_chat_history)
+    if session_journal is not None:
+        session_journal.mark_reset()  # A later /load resumes from here
     default_chat_history.clear()
     editor_chat_history.clear()
-    added_files.clear()
+    file_contexts.clear()
     stored_searches.clear()
     stored_images.clear()
+    blob_store.clear()
 
     # Re-initialize:
     default_chat_history = [{"role": "system", "content": SYSTEM_PROMPT}]
@@ -570,59 +815,196 @@ def handle_history_command(chat_history):
         content = message['content'][:100] + "..." if len(message['content']) > 100 else message['content']
         print_colored(f"{idx}. {role}: {content}", Fore.CYAN)
 
+def open_session_journal(path=None):
+    """Open the journal this session appends to; a new timestamped one by default."""
+    if os.getenv("OMNI_SESSION_JOURNAL", "1") == "0":
+        return None
+    path = path or os.path.join(SESSION_DIR, time.strftime("session-%Y%m%d-%H%M%S.jsonl"))
+    return SessionJournal(path, compression=SESSION_COMPRESSION or None, materialize=blob_store.materialize)
+
+def journal_history(chat_history):
+    """Append any messages not yet journaled; cheap when nothing is new."""
+    if session_journal is not None:
+        session_journal.sync(chat_history)
+
 async def handle_save_command(chat_history):
     filename = await get_input_async("Enter filename to save chat history:")
     try:
-        with open(filename, 'w') as f:
-            json.dump(chat_history, f)
+        SessionJournal.export(
+            filename, chat_history, compression=SESSION_COMPRESSION or None, materialize=blob_store.materialize
+        ).close()
         print_colored(f"✅ Chat history saved to {filename}", Fore.GREEN)
-    except IOError as e:
+    except (IOError, ValueError) as e:
         print_colored(f"❌ Error saving chat history: {e}", Fore.RED)
 
 async def handle_load_command():
-    filename = await get_input_async("Enter filename to load chat history:")
+    """Resume a journal (the latest session by default) from its last LOAD_TURNS turns."""
+    global session_journal
+    current = session_journal.path if session_journal is not None else None
+    filename = await get_input_async("Enter filename to load chat history (blank for the latest session):")
+    filename = filename.strip() or latest_session(SESSION_DIR, exclude=current)
+    if not filename:
+        print_colored("❌ No saved sessions found.", Fore.RED)
+        return None
     try:
-        with open(filename, 'r') as f:
-            loaded_history = json.load(f)
-        print_colored(f"✅ Chat history loaded from {filename}", Fore.GREEN)
+        if not is_journal(filename):  # A whole-file JSON history from an older /save
+            with open(filename, 'r') as f:
+                loaded_history = json.load(f)
+            print_colored(f"✅ Chat history loaded from {filename}", Fore.GREEN)
+            return loaded_history
+        journal = SessionJournal(filename, compression=SESSION_COMPRESSION or None, materialize=blob_store.materialize)
+        loaded_history = journal.tail(LOAD_TURNS)
+        if not loaded_history:
+            journal.close()
+            print_colored(f"❌ Nothing to resume in {filename}.", Fore.RED)
+            return None
+        if session_journal is not None:
+            session_journal.close()
+        session_journal = journal  # New messages continue the resumed session
+        print_colored(
+            f"✅ Resumed {filename}: last {len(loaded_history)} of {len(journal)} journaled messages.", Fore.GREEN
+        )
         return loaded_history
-    except IOError as e:
+    except (IOError, ValueError) as e:
         print_colored(f"❌ Error loading chat history: {e}", Fore.RED)
         return None
 
-async def handle_undo_command(filepath):
+def parse_undo_args(args):
+    """`/undo [N] [file]` and `/redo [N] [file]`: step count and optional path."""
+    steps, filepath = 1, None
+    for arg in args:
+        if arg.isdigit():
+            steps = max(int(arg), 1)
+        else:
+            filepath = arg
+    return steps, filepath
+
+async def handle_undo_command(args, redo=False):
+    """Step a file back (or forward) through its edits; defaults to the last edited file."""
+    action = "redo" if redo else "undo"
+    steps, filepath = parse_undo_args(args)
+    filepath = filepath or get_undo_history().last_path(REDO if redo else UNDO)
     if not filepath:
-        print_colored("❌ No filepath provided for undo operation.", Fore.RED)
+        print_colored(f"❌ Nothing to {action}.", Fore.RED)
         return
-    if filepath in undo_history:
-        content = undo_history[filepath]
-        if write_file_content(filepath, content):
-            print_colored(f"✅ Undid last edit for {filepath}", Fore.GREEN)
-            del undo_history[filepath]  # Remove the used undo history
-        else:
-            print_colored(f"❌ Failed to undo edit for {filepath}", Fore.RED)
-    else:
-        print_colored(f"❌ No undo history for {filepath}", Fore.RED)
+    current = read_file_content(filepath)
+    if current.startswith("❌"):
+        print_colored(current, Fore.RED)
+        return
+    move = get_undo_history().redo if redo else get_undo_history().undo
+    try:
+        done = move(filepath, current, write_file_content, steps)
+    except (ValueError, OSError) as e:
+        print_colored(f"❌ Failed to {action} edit for {filepath}: {e}", Fore.RED)
+        return
+    if not done:
+        print_colored(f"❌ No {action} history for {filepath}", Fore.RED)
+        return
+    undo_left, redo_left = get_undo_history().counts(filepath)
+    past = "Redid" if redo else "Undid"
+    print_colored(
+        f"✅ {past} {done} edit{'s' if done > 1 else ''} for {filepath} ({undo_left} undo, {redo_left} redo left)",
+        Fore.GREEN,
+    )
+    if done < steps and (redo_left if redo else undo_left):
+        print_colored(f"⚠️ Stopped after {done}: {filepath} was changed outside the console before the next edit.", Fore.YELLOW)
 
-async def handle_exec_command(command):
-    """Execute a shell command and display the output."""
+def parse_exec_args(text):
+    """Split `/exec [&] [--timeout S] [--tail N] <command> [&]` into the command and its options."""
+    options = {"background": False, "timeout": EXEC_TIMEOUT, "tail": 0}
+    text = text.strip()
+    while True:
+        if text.startswith("&"):
+            options["background"], text = True, text[1:].lstrip()
+            continue
+        head, _, rest = text.partition(" ")
+        value, _, remainder = rest.lstrip().partition(" ")
+        if head in ("--timeout", "--tail") and value.replace(".", "", 1).isdigit():
+            options[head[2:]] = float(value) if head == "--timeout" else int(float(value))
+            text = remainder.lstrip()
+            continue
+        break
+    if text.endswith("&") and not text.endswith("&&"):
+        options["background"], text = True, text[:-1].rstrip()
+    return text, options
+
+def print_job_line(job, stream, line):
+    print_colored(line, Fore.RED if stream == "stderr" else Fore.WHITE)
+
+def finish_job(job, default_chat_history):
+    """Report a finished job and, if asked with --tail, add its last lines to the chat."""
+    color = Fore.GREEN if job.returncode == 0 and job.status.startswith("exit") else Fore.YELLOW
+    print_colored(f"🏁 [{job.id}] {job.status} after {job.elapsed:.1f}s: {job.command}", color)
+    if job.output.dropped:
+        print_colored(f"ℹ️ Kept the last {len(job.output)} lines; {job.output.dropped} earlier lines were dropped.", Fore.YELLOW)
+    if job.attach_lines:
+        default_chat_history.append(job.context_message(job.attach_lines))
+        print_colored(f"📎 Added the last {job.attach_lines} lines of output to the chat.", Fore.CYAN)
+
+async def handle_exec_command(text, default_chat_history):
+    """Run a shell command, streaming its output; `&` runs it as a background job."""
+    command, options = parse_exec_args(text)
     if not command:
         print_colored("❌ No command provided.", Fore.RED)
-        return
+        return default_chat_history
     try:
-        process = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
+        if options["background"]:
+            job = await job_manager.start(command, timeout=options["timeout"], attach_lines=options["tail"])
+            print_colored(f"🚀 [{job.id}] Started in the background: {command} (/jobs, /fg {job.id})", Fore.CYAN)
+            return default_chat_history
+        job = await job_manager.start(
+            command, timeout=options["timeout"], attach_lines=options["tail"], listener=print_job_line
         )
-        stdout, _ = await process.communicate()
-        output = stdout.decode().strip()
-        if output:
-            print(output)
-        else:
+        job.reported = True  # Reported right here rather than at the next prompt
+        await run_interruptible(job_manager.wait(job))  # Ctrl-C stops the command, keeping what was printed
+        await job.done.wait()
+        if not len(job.output):
             print_colored("(no output)", Fore.YELLOW)
+        finish_job(job, default_chat_history)
     except Exception as e:
         print_colored(f"❌ Error executing command: {e}", Fore.RED)
+    return default_chat_history
+
+def report_finished_jobs(default_chat_history):
+    for job in job_manager.finished_unreported():
+        finish_job(job, default_chat_history)
+
+async def handle_jobs_command(args):
+    """`/jobs` lists background jobs; `/jobs stop <id>` terminates one."""
+    if len(args) == 2 and args[0] == "stop" and args[1].isdigit():
+        job = job_manager.get(int(args[1]))
+        if job is None or not job.running:
+            print_colored(f"❌ No running job {args[1]}.", Fore.RED)
+            return
+        await job_manager.stop(job)
+        print_colored(f"✅ Stopped job {job.id}.", Fore.GREEN)
+        return
+    if not job_manager.jobs:
+        print_colored("No jobs.", Fore.YELLOW)
+        return
+    for job in job_manager.jobs.values():
+        last = job.tail_text(1)
+        print_colored(f"[{job.id}] {job.status:<10} {job.elapsed:7.1f}s  {job.command}", Fore.CYAN)
+        if last:
+            print_colored(f"      {last[:100]}", Fore.WHITE)
+    job_manager.forget_finished()
+
+async def handle_fg_command(args, default_chat_history):
+    """Follow a background job's output until it exits; Ctrl-C stops it."""
+    job = job_manager.get(int(args[0]) if args and args[0].isdigit() else None)
+    if job is None:
+        print_colored("❌ No such job (see /jobs).", Fore.RED)
+        return default_chat_history
+    tail = job.tail_text(20)
+    if tail:
+        print_colored(tail, Fore.WHITE)
+    if job.running:
+        print_colored(f"▶️ [{job.id}] {job.command}", Fore.CYAN)
+        job.reported = True
+        await run_interruptible(job_manager.wait(job, print_job_line))
+        await job.done.wait()
+        finish_job(job, default_chat_history)
+    return default_chat_history
 
 def get_at_client():
     """Initialize and return an authenticated AT Protocol client."""
@@ -636,6 +1018,7 @@ def get_at_client():
         )
         return None
     try:
+        from atproto import Client
         at_client = Client()
         at_client.login(AT_IDENTIFIER, AT_PASSWORD)
         return at_client
@@ -731,23 +1114,23 @@ async def handle_sovereign_gateway(default_chat_history):
 
 async def handle_list_command():
     """List files, searches, and images currently in memory."""
-    if not added_files and not stored_searches and not stored_images:
+    if not file_contexts and not stored_searches and not stored_images and not len(blob_store):
         print_colored("No files, searches, or images in memory.", Fore.YELLOW)
         return
     print_files_and_searches_in_memory()
-    if stored_images:
-        image_list = ', '.join(stored_images.keys())
-        print_colored(
-            f"🖼️ Images currently in memory: {image_list}",
-            Fore.CYAN,
-            Style.BRIGHT,
-        )
+    if len(blob_store):
+        print_colored(f"📦 Stored payloads: {describe_blob_store()}", Fore.CYAN, Style.BRIGHT)
 
 def syntax_highlight(code, language):
+    from pygments import highlight
+    from pygments.formatters import TerminalFormatter
+    from pygments.lexers import get_lexer_by_name
     lexer = get_lexer_by_name(language)
     return highlight(code, lexer, TerminalFormatter())
 
 def print_welcome_message():
+    from rich.console import Console
+    from rich.table import Table
     print_colored(
         "🔮 Welcome to the Assistant Developer Console! 🔮", Fore.MAGENTA, Style.BRIGHT
     )
@@ -758,26 +1141,31 @@ def print_welcome_message():
     table.add_column("Command", style="cyan", no_wrap=True)
     table.add_column("Description")
 
-    table.add_row("/add", "Add files to AI's knowledge base")
-    table.add_row("/edit", "Edit existing files")
+    table.add_row("/add", "Add files or folders to AI's knowledge base (-r recurses, --include/--exclude GLOB, --pin keeps them in context)")
+    table.add_row("/edit", "Edit existing files (-p / -j N parallel, --pipeline to edit while planning, --patch for patch edits, -q for quiet progress)")
     table.add_row("/new", "Create new files")
-    table.add_row("/search", "Perform a DuckDuckGo search")
+    table.add_row("/search", "Perform a DuckDuckGo search (/search <query>[; <query>...], --more for the next page, --deep to read the top pages)")
+    table.add_row("/fetch", "Download web pages and add readable excerpts to the chat")
     table.add_row("/image", "Add image(s) to AI's knowledge base")
     table.add_row("/clear", "Clear added files, searches, and images from AI's memory")
     table.add_row("/reset", "Reset entire chat and file memory")
     table.add_row("/diff", "Toggle display of diffs")
     table.add_row("/history", "View chat history")
-    table.add_row("/save", "Save chat history to a file")
-    table.add_row("/load", "Load chat history from a file")
-    table.add_row("/undo", "Undo last edit for a specific file")
+    table.add_row("/save", "Save chat history to a journal file")
+    table.add_row("/load", "Resume a session journal (latest by default)")
+    table.add_row("/undo", "Undo the last N edits of a file (/undo [N] [file])")
+    table.add_row("/redo", "Redo undone edits of a file (/redo [N] [file])")
     table.add_row("/list", "List files, searches, and images in memory")
-    table.add_row("/exec", "Execute a shell command")
+    table.add_row("/exec", "Run a shell command, streaming output (& for background, --timeout S, --tail N)")
+    table.add_row("/jobs", "List background jobs (/jobs stop <id> to end one)")
+    table.add_row("/fg", "Follow a background job's output (/fg [id])")
     table.add_row("/atpost", "Post a message to the AT Protocol Fedaverse")
     table.add_row("/sovereign_gateway", "Run the AT handle onboarding wizard")
     table.add_row("/help", "Show this help message")
     table.add_row("/model", "Show current AI model")
     table.add_row("/change_model", "Change the AI model")
     table.add_row("/show", "Show content of a file")
+    table.add_row("/cache", "Show prompt and response cache stats (bypass toggles the response cache, clear empties it)")
     table.add_row("exit", "Exit the application")
 
     console.print(table)
@@ -792,8 +1180,8 @@ def print_welcome_message():
     )
 
 def print_files_and_searches_in_memory():
-    if added_files:
-        file_list = ', '.join(added_files)
+    if file_contexts:
+        file_list = ', '.join(file_contexts.paths)
         print_colored(
             f"📂 Files currently in memory: {file_list}", Fore.CYAN, Style.BRIGHT
         )
@@ -822,8 +1210,41 @@ def display_diff(original, edited):
         else:
             print_colored(line, Fore.BLUE)
 
-async def handle_search_command(default_chat_history):
-    search_query = await get_input_async("What would you like to search?")
+async def handle_fetch_command(default_chat_history, urls):
+    """Download pages concurrently and add a token-budgeted excerpt of each."""
+    urls = [url if "://" in url else f"https://{url}" for url in urls]
+    if not urls:
+        print_colored("❌ No URLs provided.", Fore.RED)
+        return default_chat_history
+    print_colored(f"🌐 Fetching {len(urls)} pages...", Fore.BLUE)
+    fetched = await page_fetcher.fetch_all(urls)
+    documents = [doc for doc in fetched if not isinstance(doc, FetchFailure)]
+    for failure in fetched:
+        if isinstance(failure, FetchFailure):
+            print_colored(f"❌ Could not fetch {failure.url}: {failure.error}", Fore.RED)
+    for doc in documents:
+        note = " (unchanged, from cache)" if doc.revalidated else " (truncated)" if doc.truncated else ""
+        print_colored(f"✅ {doc.title[:80]}: {len(doc.text):,} chars{note}", Fore.GREEN)
+    if documents:
+        message = {"role": "user", "content": render_documents(documents, FETCH_TOKENS)}
+        default_chat_history.append(blob_store.offload(message, min_chars=BLOB_MIN_CHARS))
+    return default_chat_history
+
+async def handle_search_command(default_chat_history, args=""):
+    deep = "--deep" in args.split()
+    args = " ".join(arg for arg in args.split() if arg != "--deep")
+    more = args.strip() == "--more"
+    if more:
+        if not stored_searches:
+            print_colored("❌ No previous search to continue.", Fore.RED)
+            return default_chat_history
+        search_query = next(reversed(stored_searches))
+    else:
+        search_query = args.strip() or await get_input_async("What would you like to search? (separate queries with ';')")
+    queries = [query.strip() for query in search_query.split(";") if query.strip()]
+    if len(queries) > 1:
+        return await handle_multi_search(default_chat_history, queries, deep=deep)
+    search_query = queries[0] if queries else ""
     if not search_query.strip():
         print_colored("❌ Empty search query. Please provide a search term.", Fore.RED)
         return default_chat_history
@@ -831,22 +1252,48 @@ async def handle_search_command(default_chat_history):
     print_colored(f"\n🔍 Searching for: {search_query}", Fore.BLUE)
 
     try:
-        results = await aget_results(search_query)
-        search_name = search_query[:10].strip()  # Truncate to first 10 characters
-        stored_searches[search_name] = results
-        print_colored(f"✅ Search results for '{search_name}' stored in memory.", Fore.GREEN)
+        seen = stored_searches.get(search_query, []) if more else []
+        results = await aget_results(search_query, page=len(seen) // SEARCH_RESULTS)
+        if not results:
+            print_colored(f"ℹ️ No {'more ' if more else ''}results for '{search_query}'.", Fore.YELLOW)
+            return default_chat_history
+        stored_searches.pop(search_query, None)
+        stored_searches[search_query] = seen + results  # Keyed by the full query; newest last
+        print_colored(f"✅ Search results for '{search_query}' stored in memory.", Fore.GREEN)
 
         # Add search results to chat history
         search_content = f"Search results for '{search_query}':\n"
-        for idx, result in enumerate(results[:8], 1):  # Limit to first 5 results for brevity
-            search_content += f"{idx}. {result['title']}: {result['body'][:100]}...\n"
+        for idx, result in enumerate(results, len(seen) + 1):
+            search_content += f"{idx}. {result.title} ({result.url}): {result.snippet[:100]}...\n"
         default_chat_history.append({"role": "user", "content": search_content})
+        if deep:
+            default_chat_history = await handle_fetch_command(default_chat_history, [result.url for result in results[:FETCH_PAGES]])
 
     except Exception as e:
         print_colored(f"❌ Error performing search: {e}", Fore.RED)
 
     return default_chat_history
 
+async def handle_multi_search(default_chat_history, queries, deep=False):
+    """Run several queries concurrently and add one merged, deduplicated block."""
+    print_colored(f"\n🔍 Searching {len(queries)} queries concurrently: {' | '.join(queries)}", Fore.BLUE)
+    report = await fan_out(get_search_service(), queries, limit=SEARCH_RESULTS, concurrency=SEARCH_CONCURRENCY)
+    for query, error in report.errors.items():
+        print_colored(f"❌ Error searching '{query}': {error}", Fore.RED)
+    if not report.merged:
+        print_colored("ℹ️ No results to add.", Fore.YELLOW)
+        return default_chat_history
+    for query, results in report.per_query.items():
+        stored_searches.pop(query, None)
+        stored_searches[query] = results
+    total = sum(len(results) for results in report.per_query.values())
+    print_colored(f"✅ {len(report.merged)} unique results from {total} across {len(report.per_query)} queries stored in memory.", Fore.GREEN)
+    default_chat_history.append({"role": "user", "content": report.render(limit=SEARCH_RESULTS * 2)})
+    if deep:
+        urls = [item.result.url for item in report.merged[:FETCH_PAGES]]
+        default_chat_history = await handle_fetch_command(default_chat_history, urls)
+    return default_chat_history
+
 async def handle_help_command():
     print_welcome_message()
 
@@ -859,6 +1306,30 @@ async def change_model():
     DEFAULT_MODEL = new_model
     print_colored(f"Model changed to: {DEFAULT_MODEL}", Fore.GREEN)
 
+def handle_cache_command(args):
+    """Show prompt and response cache stats, or `bypass` / `clear` the response cache."""
+    if engine.prompt_cache.requests and not args:
+        print_colored(f"💾 Prompt cache: {engine.prompt_cache.describe()}", Fore.CYAN)
+    if response_cache is None:
+        print_colored("ℹ️ Response cache is off. Set OMNI_RESPONSE_CACHE=1 to enable it.", Fore.YELLOW)
+        return
+    if args[:1] == ["bypass"]:
+        engine.bypass_cache = not engine.bypass_cache
+        state = "on: fresh responses are fetched and re-recorded" if engine.bypass_cache else "off"
+        print_colored(f"♻️ Cache bypass is {state}", Fore.CYAN)
+        return
+    if args[:1] == ["clear"]:
+        response_cache.clear()
+        print_colored("✅ Response cache cleared.", Fore.GREEN)
+        return
+    stats = response_cache.stats()
+    print_colored(
+        f"♻️ Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['entries']} entries ({stats['bytes'] / 1024:,.1f} KiB) in {response_cache.path}"
+        f"{' (bypassed)' if engine.bypass_cache else ''}",
+        Fore.CYAN,
+    )
+
 async def show_file_content(filepath):
     content = read_file_content(filepath)
     if content.startswith("❌"):
@@ -867,16 +1338,153 @@ async def show_file_content(filepath):
         print_colored(f"Content of {filepath}:", Fore.CYAN)
         print(content)
 
+async def close_resources():
+    """Release clients, caches and jobs on the way out of the REPL or a batch run."""
+    await transport.aclose()
+    await page_fetcher.aclose()
+    await image_pipeline.aclose()
+    await job_manager.shutdown()
+    if undo_history is not None:
+        undo_history.close()
+    if session_journal is not None:
+        session_journal.close()
+    blob_store.close()
+    if response_cache is not None:
+        response_cache.close()
+
+def unified_diff_text(path, original, edited):
+    lines = difflib.unified_diff(original.splitlines(), edited.splitlines(), f"a/{path}", f"b/{path}", lineterm="")
+    return "\n".join(lines)
+
+async def batch_edit(job, slots, dry_run=False):
+    """Apply a job's instruction to its files; every file is written or none is."""
+    originals = {}
+    for filepath in job.files:
+        content = read_file_content(filepath)
+        if content.startswith("❌"):
+            return {"error": content}
+        originals[filepath] = content
+    edit_one = make_edit_job([{"role": "system", "content": EDITOR_PROMPT}], originals, job.options.get("format") or EDIT_FORMAT)
+
+    async def edit_in_slot(filepath):
+        async with slots:  # One slot per editor stream, shared by every job in the run
+            return await edit_one(filepath, job.text)
+
+    edits = await edit_concurrently(list(job.files), edit_in_slot, len(job.files))
+    files = [
+        {"path": edit.path, "diff": unified_diff_text(edit.path, edit.original, edit.result)} if edit.ok
+        else {"path": edit.path, "error": edit.error}
+        for edit in edits
+    ]
+    if not all(edit.ok for edit in edits):
+        return {"files": files, "written": False, "error": "some edits failed; no files were changed"}
+    if dry_run:
+        return {"files": files, "written": False}
+    blocked = commit_edits(edits, write_file_content)
+    if blocked:
+        return {"files": files, "written": False, "error": f"could not write {', '.join(blocked)}; no files were changed"}
+    for edit in edits:
+        get_undo_history().record(edit.path, edit.original, edit.result)
+    return {"files": files, "written": True}
+
+async def batch_prompt(job, slots):
+    """Ask the chat model one question, with the job's files as context."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    context = ""
+    for filepath in job.files:
+        content = read_file_content(filepath)
+        if content.startswith("❌"):
+            return {"error": content}
+        context += FileUpdate(filepath, ADDED, "", content).render()
+    if context:
+        messages.append({"role": "user", "content": context})
+    messages.append({"role": "user", "content": job.text})
+    async with slots:
+        result = await engine.collect(build_chat_payload(messages, job.options.get("model") or DEFAULT_MODEL))
+    record = {"content": result.content}
+    if result.cancelled:
+        record["error"] = "response was cut off"
+    if result.usage:
+        record["usage"] = result.usage
+    return record
+
+async def batch_exec(job, slots):
+    """Run a shell command and report its exit status and the tail of its output."""
+    timeout = float(job.options.get("timeout") or 0) or EXEC_TIMEOUT
+    async with slots:
+        ran = await job_manager.run(job.text, lambda *_: None, timeout=timeout)
+    record = {"exit": ran.returncode, "output": ran.tail_text(int(job.options.get("tail", 50)))}
+    if ran.status != "exit 0":
+        record["error"] = ran.status
+    return record
+
+def load_batch(path):
+    """Read and validate a batch file; raises OSError or ValueError before any job runs."""
+    manifest = load_manifest(path)
+    dependencies(manifest.jobs)  # Reject dependency cycles up front
+    return manifest
+
+async def run_headless(manifest, concurrency=None, output=None, dry_run=False):
+    """Run a loaded manifest without the REPL, writing one JSON line per finished job."""
+    handlers = {
+        EDIT: lambda job, slots: batch_edit(job, slots, dry_run=dry_run),
+        PROMPT: batch_prompt,
+        EXEC: batch_exec,
+    }
+    sink = open(output, "w", encoding="utf-8") if output else sys.stdout
+
+    def emit(record):
+        sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+        sink.flush()
+
+    try:
+        with contextlib.redirect_stdout(sys.stderr):  # Progress messages stay off the JSONL stream
+            summary = await run_batch(
+                manifest.jobs, handlers, concurrency=concurrency or manifest.concurrency or EDIT_CONCURRENCY, emit=emit
+            )
+    finally:
+        if output:
+            sink.close()
+        await close_resources()
+    counts = summary["summary"]
+    return 1 if counts[FAILED] or counts[SKIPPED] else 0
+
+def parse_cli(argv):
+    parser = argparse.ArgumentParser(description="Omni Engineer developer console")
+    parser.add_argument("--batch", metavar="FILE", help="run a JSON/YAML manifest or a line-per-job script without the REPL")
+    parser.add_argument("-j", "--concurrency", type=int, help="model streams and commands in flight at once (batch mode)")
+    parser.add_argument("-o", "--output", metavar="FILE", help="write JSONL results here instead of stdout (batch mode)")
+    parser.add_argument("--dry-run", action="store_true", help="report edit diffs without writing files (batch mode)")
+    return parser.parse_args(argv)
+
 async def main():
+    global session_journal
+    session_journal = open_session_journal()
     default_chat_history = [{"role": "system", "content": SYSTEM_PROMPT}]
     editor_chat_history = [{"role": "system", "content": EDITOR_PROMPT}]
     clear_console()
+    # Warm the pooled connection while the user types the first prompt
+    prewarm_task = asyncio.create_task(transport.aprewarm())
     print_welcome_message()
     print_files_and_searches_in_memory()
-
+    try:
+        await repl(default_chat_history, editor_chat_history)
+    finally:
+        prewarm_task.cancel()  # Don't close the client under a HEAD still in flight
+        with contextlib.suppress(asyncio.CancelledError):
+            await prewarm_task
+        await close_resources()  # Also on Ctrl-D and Ctrl-C, so temp files and child processes go too
+
+async def repl(default_chat_history, editor_chat_history):
     while True:
         try:
+            report_finished_jobs(default_chat_history)
+            journal_history(default_chat_history)
+            # Summarize old turns in the background while the user is typing
+            if COMPACT_TOKENS:
+                compactor.maybe_start(default_chat_history)
             prompt = await get_input_async(f"\n\nYou:")
+            apply_compaction(default_chat_history)
 
             print_files_and_searches_in_memory()
 
@@ -887,14 +1495,15 @@ async def main():
                 break
 
             if prompt.startswith("/add "):
-                filepaths = prompt.split("/add ", 1)[1].strip().split()
-                default_chat_history = await handle_add_command(default_chat_history, *filepaths)
+                filepaths, add_options = parse_add_args(prompt.split("/add ", 1)[1].strip().split())
+                default_chat_history = await handle_add_command(default_chat_history, *filepaths, **add_options)
                 continue
 
             if prompt.startswith("/edit "):
-                filepaths = prompt.split("/edit ", 1)[1].strip().split()
-                default_chat_history, editor_chat_history = await handle_edit_command(
-                    default_chat_history, editor_chat_history, filepaths
+                filepaths, edit_options = parse_edit_args(prompt.split("/edit ", 1)[1].strip().split())
+                default_chat_history, editor_chat_history = await run_interruptible(
+                    handle_edit_command(default_chat_history, editor_chat_history, filepaths, **edit_options),
+                    default=(default_chat_history, editor_chat_history),
                 )
                 continue
 
@@ -905,15 +1514,20 @@ async def main():
                 )
                 continue
 
+            if prompt.startswith("/fetch"):
+                default_chat_history = await handle_fetch_command(default_chat_history, prompt.split()[1:])
+                continue
+
             if prompt.startswith("/search"):
-                default_chat_history = await handle_search_command(default_chat_history)
+                default_chat_history = await handle_search_command(default_chat_history, prompt[len("/search"):])
                 continue
 
             if prompt.startswith("/clear"):
-                await handle_clear_command()
+                await handle_clear_command(default_chat_history, editor_chat_history)
                 continue
 
             if prompt.startswith("/reset"):
+                compactor.cancel()
                 default_chat_history, editor_chat_history = await handle_reset_command(
                     default_chat_history, editor_chat_history
                 )
@@ -939,12 +1553,17 @@ async def main():
             if prompt.startswith("/load"):
                 loaded_history = await handle_load_command()
                 if loaded_history:
-                    default_chat_history = loaded_history
+                    compactor.cancel()
+                    file_contexts.clear()  # The loaded history carries its own file versions
+                    loaded_history = [message for message in loaded_history if message.get("role") != "system"]
+                    default_chat_history = [{"role": "system", "content": SYSTEM_PROMPT}] + [
+                        blob_store.offload(message, min_chars=BLOB_MIN_CHARS) for message in loaded_history
+                    ]
+                    collect_blobs(default_chat_history, editor_chat_history)
                 continue
 
-            if prompt.startswith("/undo "):
-                filepath = prompt.split("/undo ", 1)[1].strip()
-                await handle_undo_command(filepath)
+            if prompt.startswith(("/undo", "/redo")):
+                await handle_undo_command(prompt.split()[1:], redo=prompt.startswith("/redo"))
                 continue
 
             if prompt.startswith("/list"):
@@ -953,7 +1572,15 @@ async def main():
 
             if prompt.startswith("/exec "):
                 command = prompt.split("/exec ", 1)[1].strip()
-                await handle_exec_command(command)
+                default_chat_history = await handle_exec_command(command, default_chat_history)
+                continue
+
+            if prompt.startswith("/jobs"):
+                await handle_jobs_command(prompt.split()[1:])
+                continue
+
+            if prompt.startswith("/fg"):
+                default_chat_history = await handle_fg_command(prompt.split()[1:], default_chat_history)
                 continue
 
             if prompt.startswith("/atpost "):
@@ -977,6 +1604,10 @@ async def main():
                 await change_model()
                 continue
 
+            if prompt.startswith("/cache"):
+                handle_cache_command(prompt.split()[1:])
+                continue
+
             if prompt.startswith("/show "):
                 filepath = prompt.split("/show ", 1)[1].strip()
                 await show_file_content(filepath)
@@ -985,7 +1616,11 @@ async def main():
             print_colored("\n🤖 Assistant:", Fore.BLUE)
             try:
                 default_chat_history.append({"role": "user", "content": prompt})
-                response = get_streaming_response(default_chat_history, DEFAULT_MODEL)
+                # Ctrl-C cancels the generation but keeps the partial output
+                response = await run_interruptible(
+                    get_streaming_response(default_chat_history, DEFAULT_MODEL),
+                    default={"content": "", "reasoning": "", "cancelled": True},
+                )
                 
                 # Store both content and reasoning in chat history
                 default_chat_history.append({
@@ -993,12 +1628,23 @@ async def main():
                     "content": response["content"],
                     "reasoning": response["reasoning"] if response["reasoning"] else None
                 })
+                journal_history(default_chat_history)  # Persist the turn now, not at the next prompt
             except Exception as e:
                 print_colored(f"Error: {e}. Please try again.", Fore.RED)
 
+        except EOFError:
+            break
         except Exception as e:
             print_colored(f"An error occurred: {e}", Fore.RED)
             continue
 
 if __name__ == "__main__":
+    options = parse_cli(sys.argv[1:])
+    if options.batch:
+        try:
+            manifest = load_batch(options.batch)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not run {options.batch}: {e}", file=sys.stderr)
+            sys.exit(2)
+        sys.exit(asyncio.run(run_headless(manifest, options.concurrency, options.output, options.dry_run)))
     asyncio.run(main())
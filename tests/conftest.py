@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+import pytest
+
+
+def sse_body(deltas: list[dict[str, object]], usage: dict[str, object] | None = None) -> bytes:
+    """Render OpenRouter-style SSE frames for a list of delta dicts."""
+
+    frames = [f"data: {json.dumps({'choices': [{'delta': delta}]})}\n\n" for delta in deltas]
+    if usage is not None:
+        frames.append(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n")
+    frames.append("data: [DONE]\n\n")
+    return "".join(frames).encode("utf-8")
+
+
+class StandInServer:
+    """Local OpenRouter stand-in that replays scripted SSE bodies and serves static pages."""
+
+    def __init__(self) -> None:
+        self.responses: list[bytes] = []
+        self.requests: list[dict[str, object]] = []
+        self.connections = 0
+        self.frame_delay = 0.0
+        self.pages: dict[str, bytes] = {}
+        self.gets: list[tuple[str, str | None]] = []
+        self.active_gets = 0
+        self.peak_gets = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+            def do_HEAD(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.gets.append((self.path, self.headers.get("If-None-Match")))
+                    server.active_gets += 1
+                    server.peak_gets = max(server.peak_gets, server.active_gets)
+                try:
+                    time.sleep(server.frame_delay)
+                    body = server.pages.get(self.path)
+                    if body is None:
+                        self.send_response(404)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server.active_gets -= 1
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append(payload)
+                    body = server.responses.pop(0) if server.responses else sse_body([])
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not server.frame_delay:
+                    self.wfile.write(body)
+                    return
+                for frame in body.split(b"\n\n")[:-1]:
+                    self.wfile.write(frame + b"\n\n")
+                    self.wfile.flush()
+                    time.sleep(server.frame_delay)
+
+        return Handler
+
+    def start(self) -> StandInServer:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def sse_server():
+    server = StandInServer().start()
+    try:
+        yield server
+    finally:
+        server.stop()
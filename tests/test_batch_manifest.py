@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from forge.batch import EDIT, EXEC, PROMPT, load_manifest, parse_script
+
+
+def test_json_manifest_with_defaults_and_options(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({
+        "concurrency": 3,
+        "defaults": {"model": "m"},
+        "jobs": [
+            {"id": "fix", "edit": ["a.py", "b.py"], "instruction": "add types", "format": "patch"},
+            {"prompt": "summarise", "files": "a.py", "needs": "fix"},
+            {"exec": "pytest -q", "timeout": 30},
+        ],
+    }))
+    manifest = load_manifest(str(path))
+    fix, ask, run = manifest.jobs
+    assert manifest.concurrency == 3
+    assert (fix.kind, fix.files, fix.text, fix.options) == (EDIT, ("a.py", "b.py"), "add types", {"model": "m", "format": "patch"})
+    assert (ask.id, ask.kind, ask.files, ask.needs) == ("prompt-2", PROMPT, ("a.py",), ("fix",))
+    assert (run.kind, run.text, run.options["timeout"]) == (EXEC, "pytest -q", 30)
+
+
+def test_script_lines():
+    jobs = parse_script("# setup\n\n/edit a.py 'b c.py' -- rename x to y\n/exec make test\nwhat changed?\n")
+    assert [(job.kind, job.files, job.text) for job in jobs] == [
+        (EDIT, ("a.py", "b c.py"), "rename x to y"),
+        (EXEC, (), "make test"),
+        (PROMPT, (), "what changed?"),
+    ]
+    with pytest.raises(ValueError, match="line 1"):
+        parse_script("/edit a.py no separator")
+
+
+@pytest.mark.parametrize("jobs, message", [
+    ([{"id": "a", "exec": "x"}, {"id": "a", "exec": "y"}], "duplicate"),
+    ([{"exec": "x", "needs": ["missing"]}], "unknown"),
+    ([{"exec": "x", "prompt": "y"}], "exactly one"),
+    ([{"edit": ["a.py"]}], "instruction"),
+])
+def test_invalid_manifests_are_rejected(tmp_path, jobs, message):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(jobs))
+    with pytest.raises(ValueError, match=message):
+        load_manifest(str(path))
+
+
+def test_yaml_manifest(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    path = tmp_path / "jobs.yaml"
+    path.write_text(yaml.safe_dump({"jobs": [{"id": "t", "exec": "true"}]}))
+    assert [job.id for job in load_manifest(str(path)).jobs] == ["t"]
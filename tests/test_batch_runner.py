@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from forge.batch import EDIT, EXEC, FAILED, OK, SKIPPED, BatchJob, dependencies, run_batch
+
+
+def run(jobs, handlers, concurrency=4):
+    records = []
+    summary = asyncio.run(run_batch(jobs, handlers, concurrency=concurrency, emit=records.append))
+    return records, summary
+
+
+def test_jobs_sharing_a_file_run_in_order():
+    jobs = [BatchJob("a", EDIT, "x", ("f.py",)), BatchJob("b", EXEC, "y"), BatchJob("c", EDIT, "z", ("./f.py",))]
+    assert dependencies(jobs) == {"a": set(), "b": set(), "c": {"a"}}
+    with pytest.raises(ValueError, match="cycle"):
+        dependencies([BatchJob("a", EXEC, "x", needs=("b",)), BatchJob("b", EXEC, "y", needs=("a",))])
+
+
+def test_concurrency_limit_is_shared_across_jobs():
+    active = peak = 0
+
+    async def handler(job, slots):
+        nonlocal active, peak
+        async with slots:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+        return {}
+
+    records, summary = run([BatchJob(str(i), EXEC, "x") for i in range(6)], {EXEC: handler}, concurrency=2)
+    assert peak == 2
+    assert summary["summary"]["ok"] == 6 and records[-1] is summary
+
+
+def test_failed_dependency_skips_dependents():
+    async def handler(job, slots):
+        if job.id == "boom":
+            raise RuntimeError("broke")
+        if job.id == "soft":
+            return {"error": "exit 1"}
+        return {"done": True}
+
+    jobs = [
+        BatchJob("boom", EXEC, "x"),
+        BatchJob("soft", EXEC, "x"),
+        BatchJob("after", EXEC, "x", needs=("boom",)),
+        BatchJob("chained", EXEC, "x", needs=("after",)),
+        BatchJob("fine", EXEC, "x"),
+    ]
+    records, summary = run(jobs, {EXEC: handler})
+    status = {record["id"]: record["status"] for record in records if "id" in record}
+    assert status == {"boom": FAILED, "soft": FAILED, "after": SKIPPED, "chained": SKIPPED, "fine": OK}
+    assert next(record for record in records if record.get("id") == "boom")["error"] == "broke"
+    assert summary["summary"] | {"elapsed": 0} == {"jobs": 5, "ok": 1, "failed": 2, "skipped": 2, "elapsed": 0}
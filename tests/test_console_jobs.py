@@ -0,0 +1,97 @@
+import asyncio
+import sys
+
+import pytest
+
+from forge.console import JobManager, OutputRing
+
+
+PY = sys.executable
+
+
+def py(code):
+    return f'"{PY}" -c "{code}"'
+
+
+def test_output_ring_keeps_the_tail():
+    ring = OutputRing(max_lines=3, max_chars=1000)
+    for index in range(10):
+        ring.append("stdout", f"line {index}")
+    assert [line for _, line in ring.tail()] == ["line 7", "line 8", "line 9"] and ring.dropped == 7
+
+    by_chars = OutputRing(max_lines=100, max_chars=10)
+    for line in ("aaaa", "bbbb", "cccc"):
+        by_chars.append("stdout", line)
+    assert [line for _, line in by_chars.tail()] == ["bbbb", "cccc"]
+
+
+def test_lines_stream_before_the_command_exits():
+    seen = []
+
+    async def go():
+        manager = JobManager()
+        job = await manager.start(
+            py("import sys,time; print('first', flush=True); print('err', file=sys.stderr, flush=True); time.sleep(0.5); print('last')"),
+            listener=lambda job, stream, line: seen.append((stream, line, job.running)),
+        )
+        await asyncio.sleep(0.3)
+        early = list(seen)
+        await manager.wait(job)
+        return early, job
+
+    early, job = asyncio.run(go())
+    assert ("stdout", "first", True) in early and ("stderr", "err", True) in early
+    assert seen[-1][:2] == ("stdout", "last") and job.status == "exit 0"
+
+
+def test_timeout_stops_the_process_group():
+    async def go():
+        manager = JobManager(grace=0.5)
+        return await manager.run(py("import time; print('up', flush=True); time.sleep(30)"), lambda *_: None, timeout=0.3)
+
+    job = asyncio.run(go())
+    assert job.timed_out and job.status == "timed out" and job.tail_text() == "up" and job.elapsed < 5
+
+
+def test_cancelling_a_foreground_wait_stops_the_job():
+    async def go():
+        manager = JobManager(grace=0.5)
+        job = await manager.start(py("import time; time.sleep(30)"))
+        waiter = asyncio.create_task(manager.wait(job))
+        await asyncio.sleep(0.2)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return job
+
+    job = asyncio.run(go())
+    assert not job.running and job.status == "stopped"
+
+
+def test_background_jobs_are_reported_once_with_a_tail_message():
+    async def go():
+        manager = JobManager(ring_lines=5)
+        job = await manager.start(py("[print(i) for i in range(50)]"), attach_lines=2)
+        await job.done.wait()
+        return manager, job
+
+    manager, job = asyncio.run(go())
+    assert manager.finished_unreported() == [job] and manager.finished_unreported() == []
+    message = job.context_message(job.attach_lines)
+    assert message["content"].endswith("```\n48\n49\n```") and "48 earlier lines omitted" in message["content"]
+    manager.forget_finished()
+    assert manager.jobs == {}
+
+
+def test_output_without_newlines_is_split_into_bounded_lines():
+    from forge.console.jobs import MAX_LINE_BYTES
+
+    async def go():
+        manager = JobManager()
+        job = await manager.start(py(f"import sys; sys.stdout.write('x' * {MAX_LINE_BYTES * 3 + 10} + chr(10) + 'end')"))
+        return await manager.wait(job)
+
+    job = asyncio.run(go())
+    lines = [line for _, line in job.output.tail()]
+    assert [len(line) for line in lines] == [MAX_LINE_BYTES] * 3 + [10, 3]
+    assert lines[-1] == "end"
@@ -0,0 +1,68 @@
+import asyncio
+import io
+
+from forge.console import ProgressLine, StreamRenderer
+from forge.console.render import RESET
+
+CYAN, WHITE = "\x1b[36m", "\x1b[37m"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_renderer_coalesces_deltas_into_bounded_frames():
+    out, clock = io.StringIO(), FakeClock()
+    renderer = StreamRenderer(out, fps=10, clock=clock)
+
+    for index in range(100):
+        clock.now = index * 0.01
+        renderer.write("x")
+    renderer.close()
+
+    assert out.getvalue() == "x" * 100
+    assert renderer.frames == 11
+
+
+def test_renderer_emits_colour_codes_only_on_change():
+    out = io.StringIO()
+    renderer = StreamRenderer(out, fps=0)
+
+    renderer.write("think", CYAN)
+    renderer.write("ing", CYAN)
+    renderer.write("answer", WHITE)
+    renderer.close()
+
+    assert out.getvalue() == f"{CYAN}think" "ing" f"{RESET}{WHITE}answer{RESET}"
+
+
+def test_renderer_flushes_pending_text_within_one_frame_on_the_event_loop():
+    out = io.StringIO()
+
+    async def run():
+        renderer = StreamRenderer(out, fps=50)
+        renderer.write("a")
+        renderer.write("b")
+        pending = out.getvalue()
+        await asyncio.sleep(0.05)
+        return pending
+
+    assert asyncio.run(run()) == "a"
+    assert out.getvalue() == "ab"
+
+
+def test_progress_line_redraws_in_place_and_finishes_with_newline():
+    out, clock = io.StringIO(), FakeClock()
+    progress = ProgressLine("app.py:", out, fps=2, clock=clock)
+
+    progress.update("1 lines")
+    progress.update("2 lines")
+    clock.now = 1.0
+    progress.update("30 lines")
+    progress.done("done")
+
+    assert out.getvalue() == "\rapp.py: 1 lines\rapp.py: 30 lines\rapp.py: done    \n"
@@ -0,0 +1,72 @@
+import os
+
+from forge.context import BlobStore, ContextWindow, blob_refs, estimate_tokens
+from forge.llm import build_chat_payload
+
+
+DATA_URI = "data:image/png;base64," + "A" * 5000
+
+
+def test_offload_keeps_preview_and_materializes_payload(tmp_path):
+    store = BlobStore(str(tmp_path))
+    text = "line of a large file\n" * 500
+    message = store.offload({"role": "user", "content": text, "_pinned": True})
+
+    assert len(message["content"]) < 300 and message["_pinned"]
+    assert estimate_tokens(message) == estimate_tokens({"role": "user", "content": text})
+    payload = build_chat_payload([message], "m", materialize=store.materialize)
+    assert payload["messages"] == [{"role": "user", "content": text}]
+    assert store.offload({"role": "user", "content": "short"}) == {"role": "user", "content": "short"}
+
+
+def test_identical_payloads_are_stored_once(tmp_path):
+    store = BlobStore(str(tmp_path))
+    first = store.offload({"role": "user", "content": [{"type": "image_url", "image_url": {"url": DATA_URI}}]})
+    second = store.offload({"role": "user", "content": [{"type": "image_url", "image_url": {"url": DATA_URI}}]})
+
+    assert len(store) == 1 and blob_refs(first) == blob_refs(second)
+    assert first["content"][0]["image_url"]["url"].startswith("omni-blob:")
+    assert store.materialize(second)["content"][0]["image_url"]["url"] == DATA_URI
+
+
+def test_cold_blobs_spill_to_disk_and_come_back(tmp_path):
+    store = BlobStore(str(tmp_path), hot_bytes=10_000)
+    digests = [store.put(str(index) * 6_000) for index in range(3)]
+
+    stats = store.stats()
+    assert stats["spilled"] == 2 and stats["hot_bytes"] == 6_000
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(digests[:2])
+    assert store.get(digests[0]) == "0" * 6_000
+    assert (tmp_path / digests[0]).exists() is False and store.stats()["spilled"] == 2
+
+
+def test_temp_spill_dir_is_made_on_first_spill_and_removed_on_close():
+    store = BlobStore(hot_bytes=10)
+    store.put("small")
+    assert store.spill_dir is None
+    store.put("x" * 20)
+    spill_dir = store.spill_dir
+    assert spill_dir is not None and os.listdir(spill_dir)
+    store.close()
+    assert not os.path.exists(spill_dir)
+
+
+def test_collect_drops_unreferenced_blobs(tmp_path):
+    store = BlobStore(str(tmp_path), hot_bytes=1)
+    kept = store.offload({"role": "user", "content": "k" * 5000})
+    dropped = store.offload({"role": "user", "content": "d" * 5000})
+    extra = store.put("x" * 5000)
+
+    assert store.collect([kept], extra=[extra]) == 1
+    assert blob_refs(dropped)[0] not in store and extra in store
+    store.clear()
+    assert len(store) == 0 and list(tmp_path.iterdir()) == []
+
+
+def test_context_window_evicts_blob_messages_instead_of_truncating(tmp_path):
+    store = BlobStore(str(tmp_path))
+    big = store.offload({"role": "user", "content": "word " * 40_000})
+    history = [{"role": "system", "content": "s"}, big] + [{"role": "user", "content": "hi"}] * 4
+
+    report = ContextWindow(budget_override=1_000, truncate_to=100).fit(history, "m")
+    assert big not in history and [eviction.action for eviction in report.evictions] == ["dropped"]
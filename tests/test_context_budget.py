@@ -0,0 +1,64 @@
+from forge.context import (
+    ContextWindow,
+    LargestFirst,
+    OldestFirst,
+    context_limit_for,
+    estimate_tokens,
+)
+from forge.llm.engine import build_chat_payload
+
+
+def history(*sizes, pinned=()):
+    messages = [{"role": "system", "content": "s" * 400}]
+    for index, size in enumerate(sizes):
+        message = {"role": "user" if index % 2 == 0 else "assistant", "content": f"{index}" + "x" * (size * 4 - 1)}
+        if index in pinned:
+            message["_pinned"] = True
+        messages.append(message)
+    return messages
+
+
+def test_estimate_tokens_counts_text_and_images():
+    assert estimate_tokens({"role": "user", "content": "x" * 400}) == 104
+    image = {"role": "user", "content": [{"type": "image_url", "image_url": {"url": "data:..."}}]}
+    assert estimate_tokens(image) == 1004
+
+
+def test_context_limit_uses_longest_matching_prefix():
+    assert context_limit_for("anthropic/claude-3.7-sonnet:thinking") == 200_000
+    assert context_limit_for("google/gemini-2.0-flash-001") == 1_000_000
+    assert context_limit_for("unknown/model") == 128_000
+
+
+def test_fit_drops_oldest_unpinned_messages_and_reports_them():
+    messages = history(300, 300, 300, 300, 50, 50, pinned={0})
+    window = ContextWindow(OldestFirst(), budget_override=1000, keep_recent=2, truncate_to=10_000)
+
+    report = window.fit(messages, "any/model")
+
+    assert [eviction.index for eviction in report.evictions] == [2, 3]
+    assert all(eviction.action == "dropped" for eviction in report.evictions)
+    assert [message["content"][0] for message in messages[1:]] == ["0", "3", "4", "5"]
+    assert messages[0]["role"] == "system"
+    assert report.tokens_after <= 1000 < report.tokens_before
+
+
+def test_fit_truncates_oversized_blocks_instead_of_dropping_them():
+    messages = history(100, 5000, 50, 50)
+    window = ContextWindow(LargestFirst(), budget_override=1500, keep_recent=2, truncate_to=500)
+
+    report = window.fit(messages, "any/model")
+
+    assert report.evictions[0].action == "truncated"
+    assert len(messages) == 5
+    assert "tokens truncated to fit the context budget" in messages[2]["content"]
+    assert not report.over_budget
+
+
+def test_fit_is_a_no_op_under_budget_and_private_keys_never_reach_the_wire():
+    messages = history(10, 10, pinned={0})
+
+    assert not ContextWindow().fit(messages, "anthropic/claude").changed
+    wire = build_chat_payload(messages, "anthropic/claude")["messages"]
+    assert all("_pinned" not in message for message in wire)
+    assert messages[1]["_pinned"] is True
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+
+from forge.context import Compactor
+from forge.context.compaction import SUMMARY_PREFIX
+
+
+def history(turns: int, size: int = 400) -> list[dict[str, object]]:
+    messages: list[dict[str, object]] = [{"role": "system", "content": "be helpful"}]
+    for index in range(turns):
+        role = "user" if index % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"turn {index} " + "x" * size})
+    return messages
+
+
+def test_swap_replaces_only_old_unpinned_turns():
+    async def scenario():
+        seen: list[str] = []
+
+        async def summarize(transcript: str) -> str:
+            seen.append(transcript)
+            return "- decided to use httpx"
+
+        messages = history(12)
+        messages[2]["_pinned"] = True
+        system, pinned, recent = messages[0], messages[2], messages[-4:]
+        compactor = Compactor(summarize, threshold_tokens=100, keep_recent=4)
+        assert compactor.maybe_start(messages)
+        await asyncio.sleep(0)
+        # New turns may arrive while the summary runs; they must survive the swap.
+        messages.append({"role": "user", "content": "latest"})
+        result = compactor.apply(messages)
+        return seen, messages, result, system, pinned, recent
+
+    seen, messages, result, system, pinned, recent = asyncio.run(scenario())
+    assert "turn 0" in seen[0] and "turn 1 " not in seen[0] and "turn 8" not in seen[0]
+    assert result is not None and result.replaced == 7
+    assert result.tokens_after < result.tokens_before
+    assert messages[0] is system
+    assert messages[1]["_summary"] and messages[1]["content"] == SUMMARY_PREFIX + "- decided to use httpx"
+    assert messages[2] is pinned
+    assert messages[3:7] == recent
+    assert messages[-1]["content"] == "latest"
+
+
+def test_does_not_start_under_threshold():
+    async def scenario():
+        async def summarize(transcript: str) -> str:
+            raise AssertionError("should not run")
+
+        compactor = Compactor(summarize, threshold_tokens=1_000_000)
+        messages = history(12)
+        return compactor.maybe_start(messages), compactor.apply(messages), len(messages)
+
+    started, result, length = asyncio.run(scenario())
+    assert not started and result is None and length == 13
+
+
+def test_summarizer_failure_leaves_history_untouched():
+    async def scenario():
+        async def summarize(transcript: str) -> str:
+            raise RuntimeError("rate limited")
+
+        compactor = Compactor(summarize, threshold_tokens=100, keep_recent=2)
+        messages = history(10)
+        before = list(messages)
+        compactor.maybe_start(messages)
+        await asyncio.sleep(0)
+        return compactor.apply(messages), compactor.last_error, messages, before
+
+    result, error, messages, before = asyncio.run(scenario())
+    assert result is None
+    assert isinstance(error, RuntimeError)
+    assert messages == before
+
+
+def test_cancel_discards_pending_summary():
+    async def scenario():
+        async def summarize(transcript: str) -> str:
+            await asyncio.sleep(10)
+            return "never"
+
+        compactor = Compactor(summarize, threshold_tokens=100, keep_recent=2)
+        messages = history(10)
+        compactor.maybe_start(messages)
+        compactor.cancel()
+        await asyncio.sleep(0)
+        return compactor.running, compactor.apply(messages), len(messages)
+
+    running, result, length = asyncio.run(scenario())
+    assert not running and result is None and length == 11
+
+
+def test_blob_backed_messages_are_summarized_from_their_content(tmp_path):
+    from forge.context import BlobStore
+
+    store = BlobStore(str(tmp_path))
+    body = "def handler():\n    return 42\n" * 300
+
+    async def scenario():
+        seen: list[str] = []
+
+        async def summarize(transcript: str) -> str:
+            seen.append(transcript)
+            return "- summary"
+
+        messages = history(8)
+        messages[1] = store.offload({"role": "user", "content": body}, min_chars=100)
+        compactor = Compactor(summarize, threshold_tokens=100, keep_recent=2, materialize=store.materialize)
+        assert compactor.maybe_start(messages)
+        await asyncio.sleep(0)
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert body in seen[0]
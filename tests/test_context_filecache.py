@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+
+from forge.context import FileCache
+
+
+def test_hit_until_file_changes(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("one\n")
+    cache = FileCache()
+    assert cache.read_text(str(path)) == "one\n"
+    assert cache.read_text(str(path)) == "one\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    path.write_text("changed\n")
+    assert cache.read_text(str(path)) == "changed\n"
+    assert cache.misses == 2 and len(cache) == 1
+
+
+def test_invalidate_catches_same_stat_rewrite(tmp_path):
+    path = tmp_path / "same.txt"
+    path.write_text("aaaa")
+    info = os.stat(path)
+    cache = FileCache()
+    cache.read_text(str(path))
+    path.write_text("bbbb")
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns))
+    cache.invalidate(str(path))
+    assert cache.read_text(str(path)) == "bbbb"
+
+
+def test_lru_bounded_by_bytes(tmp_path):
+    cache = FileCache(max_bytes=250)
+    for name in "abc":
+        (tmp_path / name).write_text(name * 100)
+    cache.read_text(str(tmp_path / "a"))
+    cache.read_text(str(tmp_path / "b"))
+    cache.read_text(str(tmp_path / "a"))
+    cache.read_text(str(tmp_path / "c"))
+    assert cache.cached_bytes == 200
+    cache.read_text(str(tmp_path / "a"))
+    assert cache.hits == 2  # "b" was the least recently used and got evicted
+
+
+def test_large_files_are_mapped_and_indexed(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"".join(b"line %d\r\n" % index for index in range(5000)))
+    cache = FileCache(mmap_threshold=1024)
+    entry = cache.get(str(path))
+    assert entry.is_text
+    assert entry.line_count() == 5000
+    assert entry.lines(10, 12) == "line 10\nline 11\n"
+    assert entry.line_at(entry.text.index("line 4321")) == 4321
+    assert entry.digest == cache.get(str(path)).digest
+
+
+def test_binary_verdict(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(bytes(range(256)) * 8)
+    cache = FileCache()
+    assert not cache.is_text(str(path))
+    assert cache.read_if_text(str(path)) is None
+    assert not cache.is_text(str(tmp_path / "missing"))
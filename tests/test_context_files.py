@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from forge.context import ADDED, UNCHANGED, UPDATED, ContextWindow, FileContextTable, OldestFirst
+
+
+def add(table: FileContextTable, history: list[dict[str, object]], files: dict[str, str]):
+    updates = [table.stage(path, content, history) for path, content in files.items()]
+    changed = [update for update in updates if update.kind != UNCHANGED]
+    if changed:
+        message = {"role": "user", "content": "".join(update.render() for update in changed)}
+        history.append(message)
+        table.commit(changed, files, message)
+    return updates
+
+
+SOURCE = "\n".join(f"line {index}" for index in range(200)) + "\n"
+
+
+def test_readding_unchanged_file_is_a_noop():
+    table, history = FileContextTable(), [{"role": "system", "content": "sys"}]
+    first = add(table, history, {"app.py": SOURCE})
+    second = add(table, history, {"app.py": SOURCE})
+    assert [update.kind for update in first] == [ADDED]
+    assert [update.kind for update in second] == [UNCHANGED]
+    assert len(history) == 2 and table.paths == ["app.py"]
+
+
+def test_changed_file_sends_compact_diff():
+    table, history = FileContextTable(), []
+    add(table, history, {"app.py": SOURCE})
+    edited = SOURCE.replace("line 120\n", "line 120 changed\n")
+    (update,) = add(table, history, {"app.py": edited})
+    assert update.kind == UPDATED
+    assert "-line 120\n+line 120 changed" in update.body
+    assert len(history[-1]["content"]) < len(SOURCE) // 4
+    assert table.content_of("app.py") == edited
+    assert add(table, history, {"app.py": edited})[0].kind == UNCHANGED
+
+
+def test_evicted_or_truncated_file_is_sent_in_full_again():
+    table, history = FileContextTable(), [{"role": "system", "content": "sys"}]
+    add(table, history, {"big.py": SOURCE * 20})
+    history.extend({"role": "user", "content": "hi"} for _ in range(4))
+    ContextWindow(OldestFirst(), budget_override=500, keep_recent=4, truncate_to=100).fit(history, "m")
+    assert add(table, history, {"big.py": SOURCE * 20})[0].kind == ADDED
+
+
+def test_identical_content_is_stored_once():
+    table, history = FileContextTable(), []
+    add(table, history, {"a.py": SOURCE, "b.py": SOURCE})
+    assert len(table._blobs) == 1
+    add(table, history, {"a.py": SOURCE + "extra\n"})
+    table.discard("b.py")
+    assert len(table._blobs) == 1 and table.paths == ["a.py"]
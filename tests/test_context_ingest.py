@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import random
+
+from forge.context import IgnoreRules, ingest_tree, looks_like_text
+
+
+def write(root, rel: str, data: bytes | str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path.write_bytes(data)
+
+
+def rel_paths(report, root) -> list[str]:
+    return [os.path.relpath(path, root).replace(os.sep, "/") for path, _ in report.files]
+
+
+def test_looks_like_text_matches_per_byte_rule():
+    text_characters = set(bytes(range(32, 127)) + b"\n\r\t\b")
+    rng = random.Random(7)
+    for _ in range(300):
+        printable = rng.random()
+        chunk = bytes(
+            rng.randrange(32, 127) if rng.random() < printable else rng.randrange(1, 256)
+            for _ in range(rng.randrange(1, 200))
+        )
+        expected = sum(byte in text_characters for byte in chunk) / len(chunk) > 0.7
+        assert looks_like_text(chunk) == expected
+    assert looks_like_text(b"") and not looks_like_text(b"abc\x00def")
+
+
+def test_recursive_walk_honours_gitignore(tmp_path):
+    write(tmp_path, ".gitignore", "build/\n*.log\n!keep.log\n/top.txt\n")
+    write(tmp_path, "src/app.py", "print('hi')\n")
+    write(tmp_path, "src/.gitignore", "generated_*.py\n")
+    write(tmp_path, "src/generated_api.py", "x = 1\n")
+    write(tmp_path, "src/top.txt", "nested is not anchored away\n")
+    write(tmp_path, "top.txt", "anchored\n")
+    write(tmp_path, "build/out.py", "artifact\n")
+    write(tmp_path, "debug.log", "noise\n")
+    write(tmp_path, "keep.log", "wanted\n")
+    write(tmp_path, "node_modules/pkg/index.js", "module\n")
+    write(tmp_path, "logo.bin", bytes(range(256)) * 4)
+
+    report = ingest_tree(str(tmp_path))
+    assert rel_paths(report, tmp_path) == [".gitignore", "keep.log", "src/.gitignore", "src/app.py", "src/top.txt"]
+    assert report.binary == 1 and report.ignored == 5
+
+    flat = ingest_tree(str(tmp_path), recursive=False)
+    assert "src/app.py" not in rel_paths(flat, tmp_path)
+
+
+def test_include_exclude_globs(tmp_path):
+    write(tmp_path, "a/one.py", "1\n")
+    write(tmp_path, "a/two.md", "2\n")
+    write(tmp_path, "tests/test_one.py", "3\n")
+    report = ingest_tree(str(tmp_path), include=["*.py"], exclude=["tests"])
+    assert rel_paths(report, tmp_path) == ["a/one.py"]
+
+
+def test_file_and_total_caps(tmp_path):
+    for index in range(10):
+        write(tmp_path, f"f{index}.txt", "x" * 100)
+    write(tmp_path, "huge.txt", "y" * 5000)
+    report = ingest_tree(str(tmp_path), max_file_bytes=1000, max_total_bytes=450, workers=3)
+    assert rel_paths(report, tmp_path) == ["f0.txt", "f1.txt", "f2.txt", "f3.txt"]
+    assert report.bytes_read == 400 and report.too_large == 1 and report.over_budget == 6
+    assert "4 files" in report.summary()
+
+
+def test_gitignore_rule_forms():
+    rules = IgnoreRules.from_patterns(["docs/**/draft?.md", "**/cache", "dist/**", "[Tt]emp*"])
+    assert rules.ignored("docs/a/b/draft1.md", "draft1.md", False)
+    assert rules.ignored("docs/draft2.md", "draft2.md", False)
+    assert rules.ignored("x/y/cache", "cache", True)
+    assert rules.ignored("dist/bundle.js", "bundle.js", False)
+    assert rules.ignored("Temp.txt", "Temp.txt", False) and rules.ignored("a/temp", "temp", True)
+    assert not rules.ignored("docs/final.md", "final.md", False)
@@ -0,0 +1,60 @@
+import asyncio
+
+from forge.edits import FileEdit, commit_edits, edit_concurrently
+
+
+def test_edit_concurrently_bounds_streams_and_keeps_input_order():
+    in_flight = 0
+    peak = 0
+
+    async def job(path):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (5 - int(path[1])))
+        in_flight -= 1
+        return FileEdit(path, "old", f"new {path}")
+
+    paths = [f"f{i}" for i in range(5)]
+    edits = asyncio.run(edit_concurrently(paths, job, limit=2))
+
+    assert [edit.path for edit in edits] == paths
+    assert [edit.result for edit in edits] == [f"new {path}" for path in paths]
+    assert peak == 2
+
+
+def test_edit_concurrently_records_failures_per_file():
+    async def job(path):
+        if path == "bad.py":
+            raise IOError("stream dropped")
+        return FileEdit(path, "old", "new")
+
+    edits = asyncio.run(edit_concurrently(["a.py", "bad.py"], job, limit=4))
+
+    assert edits[0].ok
+    assert edits[1].error == "stream dropped"
+
+
+def test_commit_edits_writes_nothing_when_any_edit_failed():
+    writes = []
+    edits = [FileEdit("a.py", "old", "new"), FileEdit("b.py", error="boom")]
+
+    blocked = commit_edits(edits, lambda path, content: writes.append(path) or True)
+
+    assert blocked == ["b.py"]
+    assert writes == []
+
+
+def test_commit_edits_rolls_back_when_a_write_fails():
+    files = {"a.py": "old a", "b.py": "old b", "c.py": "old c"}
+
+    def write(path, content):
+        if path == "c.py":
+            return False
+        files[path] = content
+        return True
+
+    edits = [FileEdit(path, files[path], f"new {path}") for path in ("a.py", "b.py", "c.py")]
+
+    assert commit_edits(edits, write) == ["c.py"]
+    assert files == {"a.py": "old a", "b.py": "old b", "c.py": "old c"}
@@ -0,0 +1,73 @@
+from forge.edits import apply_patch, parse_patch
+
+SOURCE = "\n".join([
+    "def greet(name):",
+    "    message = 'hello ' + name",
+    "    return message",
+    "",
+    "def main():",
+    "    print(greet('world'))",
+    "",
+])
+
+
+def test_search_replace_block_changes_only_the_matched_lines():
+    patch = (
+        "<<<<<<< SEARCH\n"
+        "    message = 'hello ' + name\n"
+        "=======\n"
+        "    message = f'hello {name}!'\n"
+        ">>>>>>> REPLACE\n"
+    )
+
+    result = apply_patch(SOURCE, patch)
+
+    assert result.ok and result.applied == 1 and result.fuzzy == 0
+    assert result.text == SOURCE.replace("'hello ' + name", "f'hello {name}!'")
+
+
+def test_unified_diff_hunk_applies_at_hinted_line():
+    patch = (
+        "--- a/app.py\n"
+        "+++ b/app.py\n"
+        "@@ -5,2 +5,3 @@\n"
+        " def main():\n"
+        "-    print(greet('world'))\n"
+        "+    name = 'world'\n"
+        "+    print(greet(name))\n"
+    )
+
+    result = apply_patch(SOURCE, patch)
+
+    assert result.ok
+    assert result.text.splitlines()[4:7] == ["def main():", "    name = 'world'", "    print(greet(name))"]
+
+
+def test_fuzzy_match_tolerates_lost_indentation_and_reindents_replacement():
+    patch = (
+        "<<<<<<< SEARCH\n"
+        "return message\n"
+        "=======\n"
+        "return message.upper()\n"
+        ">>>>>>> REPLACE\n"
+    )
+
+    result = apply_patch(SOURCE, patch)
+
+    assert result.ok and result.fuzzy == 1
+    assert "    return message.upper()" in result.text.splitlines()
+
+
+def test_unmatched_block_is_reported_and_not_ok():
+    patch = "<<<<<<< SEARCH\nclass Missing:\n=======\nclass Found:\n>>>>>>> REPLACE\n"
+
+    result = apply_patch(SOURCE, patch)
+
+    assert not result.ok
+    assert result.text == SOURCE
+    assert "search text not found" in result.failures[0].describe()
+
+
+def test_output_without_patch_blocks_is_a_failure():
+    assert parse_patch("def greet(name):\n    return name\n") == []
+    assert not apply_patch(SOURCE, "just some prose").ok
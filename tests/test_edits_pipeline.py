@@ -0,0 +1,52 @@
+import asyncio
+
+from forge.edits import EditPipeline, FileEdit, InstructionSplitter
+
+
+PLAN = (
+    "Plan: rename the helper everywhere.\n"
+    "### FILE: src/a.py\n"
+    "1. Rename foo to bar\n"
+    "### FILE: `./src/b.py`\n"
+    "2. Update the call site\n"
+)
+
+
+def test_splitter_emits_sections_as_headers_arrive_across_chunk_boundaries():
+    splitter = InstructionSplitter(["src/a.py", "src/b.py"])
+    completed = []
+    for start in range(0, len(PLAN), 7):
+        completed.extend(splitter.feed(PLAN[start:start + 7]))
+
+    assert completed == [("src/a.py", "1. Rename foo to bar")]
+    assert splitter.close() == [("src/b.py", "2. Update the call site")]
+
+
+def test_splitter_ignores_unknown_files_and_preamble():
+    splitter = InstructionSplitter(["a.py"])
+
+    sections = splitter.feed("intro\n### FILE: other.py\nnope\n## file: a.py\nyes\n") + splitter.close()
+
+    assert sections == [("a.py", "yes")]
+
+
+def test_pipeline_starts_edits_before_planning_finishes_and_falls_back_to_full_plan():
+    received = {}
+
+    async def job(path, instructions):
+        received[path] = instructions
+        return FileEdit(path, "old", "new")
+
+    async def run():
+        pipeline = EditPipeline(["a.py", "b.py", "c.py"], job, limit=2)
+        pipeline.feed("### FILE: a.py\nedit a\n### FILE: b.py\n")
+        started_early = pipeline.started
+        pipeline.feed("edit b\n")
+        edits = await pipeline.finish("FULL PLAN")
+        return started_early, edits
+
+    started_early, edits = asyncio.run(run())
+
+    assert started_early == ["a.py"]
+    assert [edit.path for edit in edits] == ["a.py", "b.py", "c.py"]
+    assert received == {"a.py": "edit a", "b.py": "edit b", "c.py": "FULL PLAN"}
@@ -0,0 +1,94 @@
+import pytest
+
+from forge.edits import UndoHistory, apply_delta, encode_delta
+
+
+class FakeFile:
+    def __init__(self, text):
+        self.text = text
+        self.fail = False
+
+    def write(self, path, text):
+        if self.fail:
+            return False
+        self.text = text
+        return True
+
+
+def edit(history, handle, new, path="a.py"):
+    history.record(path, handle.text, new)
+    handle.text = new
+
+
+def test_delta_round_trips_and_scales_with_the_change():
+    source = "".join(f"line {index}\n" for index in range(20_000))
+    target = source.replace("line 10000\n", "changed\n").rstrip("\n")
+    delta = encode_delta(source, target)
+
+    assert apply_delta(source, delta) == target
+    assert apply_delta(target, encode_delta(target, source)) == source
+    assert len(delta) < 200
+
+
+def test_multi_level_undo_then_redo():
+    history, handle = UndoHistory(), FakeFile("v1\n")
+    for version in ("v2\n", "v3\n", "v4\n"):
+        edit(history, handle, version)
+
+    assert history.undo("a.py", handle.text, handle.write, steps=2) == 2 and handle.text == "v2\n"
+    assert history.counts("a.py") == (1, 2)
+    assert history.redo("a.py", handle.text, handle.write) == 1 and handle.text == "v3\n"
+    assert history.undo("a.py", handle.text, handle.write, steps=10) == 2 and handle.text == "v1\n"
+    assert history.undo("a.py", handle.text, handle.write) == 0
+
+
+def test_new_edit_clears_redo_and_outside_changes_block_undo():
+    history, handle = UndoHistory(), FakeFile("one\n")
+    edit(history, handle, "two\n")
+    history.undo("a.py", handle.text, handle.write)
+    edit(history, handle, "three\n")
+    assert history.counts("a.py") == (1, 0)
+
+    with pytest.raises(ValueError):
+        history.undo("a.py", "edited by hand\n", handle.write)
+    handle.fail = True
+    with pytest.raises(OSError):
+        history.undo("a.py", handle.text, handle.write)
+    assert history.counts("a.py") == (1, 0) and handle.text == "three\n"
+
+
+def test_multi_step_undo_stops_at_an_outside_edit():
+    history, handle = UndoHistory(), FakeFile("x\nb\nz\n")
+    edit(history, handle, "a\nB\nc\n")
+    handle.text = "a\nB\nc\nhand\n"  # Changed outside the console
+    edit(history, handle, "a\nC\nc\nhand\n")
+
+    assert history.undo("a.py", handle.text, handle.write, steps=2) == 1
+    assert handle.text == "a\nB\nc\nhand\n"
+    assert history.counts("a.py") == (1, 1)
+    with pytest.raises(ValueError):
+        history.undo("a.py", handle.text, handle.write)
+
+
+def test_depth_and_byte_caps_drop_oldest_steps():
+    history, handle = UndoHistory(depth=3), FakeFile("0\n")
+    for index in range(1, 6):
+        edit(history, handle, f"{index}\n")
+    assert history.counts("a.py") == (3, 0)
+    assert history.undo("a.py", handle.text, handle.write, steps=5) == 3 and handle.text == "2\n"
+
+    capped, other = UndoHistory(max_bytes=60), FakeFile("x\n")
+    for index in range(5):
+        edit(capped, other, f"{index}\n", path="b.py")
+    assert capped.stats()["bytes"] <= 60 and 0 < capped.counts("b.py")[0] < 5
+
+
+def test_stacks_survive_a_restart(tmp_path):
+    db = str(tmp_path / "undo.sqlite")
+    history, handle = UndoHistory(db), FakeFile("before\n")
+    edit(history, handle, "after\n", path=str(tmp_path / "f.txt"))
+    history.close()
+
+    reopened = UndoHistory(db)
+    assert reopened.last_path() == str(tmp_path / "f.txt")
+    assert reopened.undo(str(tmp_path / "f.txt"), handle.text, handle.write) == 1 and handle.text == "before\n"
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from forge.llm import (  # noqa: E402
+    ModelTransport,
+    ResponseCache,
+    StreamEngine,
+    StreamEvent,
+    TransportConfig,
+    build_chat_payload,
+    payload_key,
+)
+from conftest import sse_body  # noqa: E402
+
+
+def make_engine(server, cache):
+    return StreamEngine(ModelTransport(TransportConfig(base_url=server.base_url, api_key="sk-test")), cache)
+
+
+def collect_twice(engine, payload):
+    async def run():
+        first, second = [], []
+        one = await engine.collect(payload, on_event=first.append)
+        two = await engine.collect(payload, on_event=second.append)
+        await engine.transport.aclose()
+        return one, two, first, second
+
+    return asyncio.run(run())
+
+
+def test_identical_request_replays_same_chunks(sse_server, tmp_path):
+    sse_server.responses = [sse_body([{"reasoning": "hm"}, {"content": "ans"}, {"content": "wer"}], usage={"total_tokens": 9})]
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    engine = make_engine(sse_server, cache)
+
+    one, two, first, second = collect_twice(engine, build_chat_payload([{"role": "user", "content": "hi"}], "m"))
+
+    assert len(sse_server.requests) == 1
+    assert (two.content, two.reasoning, two.usage) == ("answer", "hm", {"total_tokens": 9})
+    assert [event.text for event in second] == [event.text for event in first] == ["hm", "ans", "wer"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert engine.prompt_cache.requests == 1  # The replay's usage is not counted again
+
+
+def test_bypass_refetches_and_rerecords(sse_server, tmp_path):
+    sse_server.responses = [sse_body([{"content": "old"}]), sse_body([{"content": "new"}])]
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    engine = make_engine(sse_server, cache)
+    payload = build_chat_payload([{"role": "user", "content": "hi"}], "m")
+
+    async def run():
+        await engine.collect(payload)
+        engine.bypass_cache = True
+        fresh = await engine.collect(payload)
+        engine.bypass_cache = False
+        replayed = await engine.collect(payload)
+        await engine.transport.aclose()
+        return fresh, replayed
+
+    fresh, replayed = asyncio.run(run())
+    assert fresh.content == replayed.content == "new"
+    assert len(sse_server.requests) == 2
+
+
+def test_incomplete_stream_is_not_cached(sse_server, tmp_path):
+    sse_server.responses = [b'data: {"choices": [{"delta": {"content": "cut"}}]}\n\n', sse_body([{"content": "full"}])]
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    engine = make_engine(sse_server, cache)
+
+    one, two, _, _ = collect_twice(engine, build_chat_payload([], "m"))
+    assert (one.content, two.content) == ("cut", "full")
+    assert cache.stats()["entries"] == 1
+
+
+def test_key_is_canonical_and_covers_settings():
+    messages = [{"role": "user", "content": "hi"}]
+    assert payload_key({"b": 1, "a": [1, 2]}) == payload_key({"a": [1, 2], "b": 1})
+    assert payload_key(build_chat_payload(messages, "anthropic/x")) != payload_key(
+        build_chat_payload(messages, "anthropic/x", reasoning=False)
+    )
+
+
+def test_ttl_and_lru_eviction(tmp_path, monkeypatch):
+    import forge.llm.cache as cache_module
+
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    events = [StreamEvent("content", "x" * 2000), StreamEvent("done")]
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, max_bytes=120)  # Room for two entries
+    cache.put("a", events)
+    clock[0] += 1
+    cache.put("b", events)
+    clock[0] += 1
+    assert cache.get("a") == events  # "a" is now the most recent
+    clock[0] += 1
+    cache.put("c", events)
+    assert cache.get("b") is None and cache.get("a") is not None
+    clock[0] += 120
+    assert cache.get("c") is None
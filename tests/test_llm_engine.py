@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from forge.llm import ModelTransport, StreamEngine, TransportConfig, build_chat_payload  # noqa: E402
+from conftest import sse_body  # noqa: E402
+
+
+def make_engine(server):
+    return StreamEngine(ModelTransport(TransportConfig(base_url=server.base_url, api_key="sk-test")))
+
+
+def test_build_chat_payload_adds_reasoning_per_provider():
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert build_chat_payload(messages, "anthropic/claude")["reasoning"] == {"max_tokens": 8000}
+    assert build_chat_payload(messages, "openai/o1")["reasoning"] == {"effort": "high"}
+    editor = build_chat_payload(messages, "anthropic/claude", max_tokens=None, reasoning=False)
+    assert "reasoning" not in editor and "max_tokens" not in editor
+
+
+def test_collect_separates_reasoning_and_content(sse_server):
+    sse_server.responses = [sse_body([{"reasoning": "think "}, {"reasoning": "hard"}, {"content": "an"}, {"content": "swer"}])]
+    engine = make_engine(sse_server)
+
+    async def run():
+        seen = []
+        result = await engine.collect(build_chat_payload([], "m"), on_event=seen.append)
+        await engine.transport.aclose()
+        return seen, result
+
+    seen, result = asyncio.run(run())
+
+    assert [event.kind for event in seen] == ["reasoning", "reasoning", "content", "content"]
+    assert result.reasoning == "think hard"
+    assert result.content == "answer"
+    assert result.cancelled is False
+
+
+def test_cancelled_stream_keeps_partial_output_and_loop_stays_responsive(sse_server):
+    sse_server.frame_delay = 0.05
+    sse_server.responses = [sse_body([{"content": f"t{i} "} for i in range(40)])]
+    engine = make_engine(sse_server)
+
+    async def run():
+        ticks = 0
+        task = asyncio.create_task(engine.collect(build_chat_payload([], "m")))
+        while ticks < 10:
+            await asyncio.sleep(0.02)
+            ticks += 1
+        task.cancel()
+        result = await task
+        await engine.transport.aclose()
+        return ticks, result
+
+    ticks, result = asyncio.run(run())
+
+    assert ticks == 10
+    assert result.cancelled is True
+    assert result.content.startswith("t0 ")
+    assert len(result.content.split()) < 40
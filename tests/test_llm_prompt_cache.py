@@ -0,0 +1,58 @@
+from forge.llm import CacheStats, CacheUsage, build_chat_payload, mark_breakpoint, stable_first
+
+
+def conversation():
+    return [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "q1"},
+        {"role": "user", "content": "file a", "_pinned": True},
+        {"role": "assistant", "content": "a1"},
+        {"role": "user", "content": "file b", "_pinned": True},
+        {"role": "user", "content": "q2"},
+    ]
+
+
+def test_system_and_pinned_context_go_first():
+    ordered, stable = stable_first(conversation())
+    assert [message["content"] for message in ordered] == ["sys", "file a", "file b", "q1", "a1", "q2"]
+    assert stable == 3
+
+
+def test_breakpoints_only_for_models_that_need_them():
+    history = conversation()
+    wire = build_chat_payload(history, "anthropic/claude-3.7-sonnet")["messages"]
+    marked = [index for index, message in enumerate(wire) if isinstance(message["content"], list)]
+    assert marked == [0, 2, 5]
+    assert wire[2]["content"] == [{"type": "text", "text": "file b", "cache_control": {"type": "ephemeral"}}]
+    assert all(isinstance(message["content"], str) for message in history)
+
+    plain = build_chat_payload(history, "openai/gpt-4o")["messages"]
+    assert [message["content"] for message in plain] == ["sys", "file a", "file b", "q1", "a1", "q2"]
+    unordered = build_chat_payload(history, "anthropic/claude", prompt_cache=False)["messages"]
+    assert [message["content"] for message in unordered] == [message["content"] for message in history]
+
+
+def test_stable_prefix_is_identical_across_turns():
+    first = build_chat_payload(conversation(), "anthropic/claude")["messages"]
+    later = conversation() + [{"role": "assistant", "content": "a2"}, {"role": "user", "content": "q3"}]
+    second = build_chat_payload(later, "anthropic/claude")["messages"]
+    assert second[:3] == first[:3]
+
+
+def test_breakpoint_goes_on_the_last_text_part():
+    image = {"type": "image_url", "image_url": {"url": "https://x/y.png"}}
+    message = {"role": "user", "content": [{"type": "text", "text": "look"}, image]}
+    assert mark_breakpoint(message)["content"] == [{"type": "text", "text": "look", "cache_control": {"type": "ephemeral"}}, image]
+    assert mark_breakpoint({"role": "user", "content": [image]})["content"] == [image]
+
+
+def test_cache_usage_is_read_and_totalled():
+    openrouter = {"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 800}}
+    anthropic = {"input_tokens": 50, "cache_read_input_tokens": 0, "cache_creation_input_tokens": 900}
+    assert CacheUsage.from_usage(openrouter) == CacheUsage(1000, 800, 0)
+    assert CacheUsage.from_usage(None) == CacheUsage()
+    stats = CacheStats()
+    stats.add(openrouter)
+    stats.add(anthropic)
+    assert (stats.requests, stats.total) == (2, CacheUsage(1050, 800, 900))
+    assert "800 of 1,000 prompt tokens read from cache (80%)" in CacheUsage.from_usage(openrouter).describe()
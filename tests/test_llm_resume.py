@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from forge.llm import (  # noqa: E402
+    CONTINUE_PROMPT,
+    LineCheckpoint,
+    ModelTransport,
+    ResumableLineStream,
+    StreamEngine,
+    StreamInterrupted,
+    TransportConfig,
+    build_chat_payload,
+)
+from conftest import sse_body  # noqa: E402
+
+
+def dropped_body(deltas):
+    """An SSE body whose connection closes before ``[DONE]``."""
+
+    return sse_body(deltas).replace(b"data: [DONE]\n\n", b"")
+
+
+def make_stream(server, max_resumes=3):
+    engine = StreamEngine(ModelTransport(TransportConfig(base_url=server.base_url, api_key="sk-test")))
+    messages = [{"role": "user", "content": "edit this"}]
+    resumes = []
+    stream = ResumableLineStream(
+        engine,
+        messages,
+        lambda msgs: build_chat_payload(msgs, "editor", max_tokens=None, reasoning=False),
+        max_resumes=max_resumes,
+        on_resume=lambda attempt, received: resumes.append((attempt, received)),
+    )
+    return stream, resumes
+
+
+async def drain(stream):
+    try:
+        return [line async for line in stream.lines()]
+    finally:
+        await stream.engine.transport.aclose()
+
+
+def test_checkpoint_keeps_only_complete_lines():
+    checkpoint = LineCheckpoint()
+
+    assert checkpoint.feed("a\nb") == ["a"]
+    assert checkpoint.feed("c\n") == ["bc"]
+    assert checkpoint.feed("tail") == []
+    checkpoint.rollback_partial()
+    assert checkpoint.lines == ["a", "bc"] and checkpoint.tail == ""
+
+
+def test_dropped_stream_resumes_from_last_complete_line(sse_server):
+    sse_server.responses = [
+        dropped_body([{"content": "one\ntwo\nth"}]),
+        sse_body([{"content": "three\nfour\n"}]),
+    ]
+    stream, resumes = make_stream(sse_server)
+
+    lines = asyncio.run(drain(stream))
+
+    assert lines == ["one", "two", "three", "four"]
+    assert resumes == [(1, 2)]
+    continuation = sse_server.requests[1]["messages"]
+    assert continuation[-2] == {"role": "assistant", "content": "one\ntwo\n"}
+    assert continuation[-1] == {"role": "user", "content": CONTINUE_PROMPT}
+
+
+def test_final_line_without_newline_is_kept_as_tail_after_a_resume(sse_server):
+    sse_server.responses = [
+        dropped_body([{"content": "one\ntw"}]),
+        sse_body([{"content": "two\nlast"}]),
+    ]
+    stream, resumes = make_stream(sse_server)
+
+    lines = asyncio.run(drain(stream))
+
+    assert lines == ["one", "two"] and stream.tail == "last"
+    assert resumes == [(1, 1)]
+
+
+def test_stream_gives_up_after_max_resumes(sse_server):
+    sse_server.responses = [dropped_body([{"content": "one\n"}]) for _ in range(3)]
+    stream, resumes = make_stream(sse_server, max_resumes=2)
+
+    with pytest.raises(StreamInterrupted, match="after 3 lines and 2 resume attempts"):
+        asyncio.run(drain(stream))
+
+    assert len(resumes) == 2
+
+
+def test_editor_rebuild_keeps_a_last_line_without_newline(monkeypatch):
+    for dependency in ("dotenv", "colorama"):
+        pytest.importorskip(dependency)
+    import main
+    from forge.llm import CONTENT, DONE, StreamEvent
+
+    class ScriptedEngine:
+        async def events(self, payload):
+            for text in ("def f():\n", "    return 2"):
+                yield StreamEvent(CONTENT, text)
+            yield StreamEvent(DONE)
+
+    monkeypatch.setattr(main, "engine", ScriptedEngine())
+    edited = asyncio.run(main.stream_file_edit([{"role": "user", "content": "edit"}], "def f():\n    return 1", display="off"))
+
+    assert edited == "def f():\n    return 2"
@@ -0,0 +1,42 @@
+from forge.llm import CONTENT, DONE, REASONING, USAGE, ChunkAccumulator, SSEDecoder, iter_events
+
+TRANSCRIPT = (
+    ": OPENROUTER PROCESSING\r\n\r\n"
+    'data: {"choices": [{"delta": {"reasoning": "hmm"}}]}\r\n\r\n'
+    'data: {"choices": [{"delta": {"content": "café "}}]}\n\n'
+    "data: not json\n\n"
+    'data: {"choices": [{"delta": {"content": "✓"}}]}\n\n'
+    'data: {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 3}}\n\n'
+    "data: [DONE]\n\n"
+    'data: {"choices": [{"delta": {"content": "after done"}}]}\n\n'
+).encode("utf-8")
+
+
+def test_events_are_identical_for_every_chunking_of_the_byte_stream():
+    expected = list(iter_events([TRANSCRIPT]))
+
+    for size in (1, 2, 3, 7, 64):
+        chunks = [TRANSCRIPT[start:start + size] for start in range(0, len(TRANSCRIPT), size)]
+        assert list(iter_events(chunks)) == expected
+
+    assert [event.kind for event in expected] == [REASONING, CONTENT, CONTENT, USAGE, DONE]
+    assert expected[1].text == "café " and expected[2].text == "✓"
+    assert expected[3].usage == {"prompt_tokens": 5, "completion_tokens": 3}
+
+
+def test_decoder_joins_multiline_data_and_flushes_unterminated_event():
+    decoder = SSEDecoder()
+
+    assert decoder.feed(b"data: a\ndata: b\n\nevent: ping\ndata:c") == [b"a\nb"]
+    assert decoder.flush() == [b"c"]
+
+
+def test_chunk_accumulator_joins_lazily():
+    accumulator = ChunkAccumulator()
+    for piece in ("a", "", "b", "c"):
+        accumulator.append(piece)
+
+    assert len(accumulator) == 3
+    assert accumulator.getvalue() == "abc"
+    accumulator.append("d")
+    assert accumulator.getvalue() == "abcd"
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from forge.llm import ModelTransport, TransportConfig  # noqa: E402
+from conftest import sse_body  # noqa: E402
+
+
+def test_config_from_env_reads_overrides():
+    config = TransportConfig.from_env({
+        "OPENROUTER_API_KEY": "sk-test",
+        "OMNI_BASE_URL": "http://localhost:9999/api/v1/",
+        "OMNI_CONNECT_TIMEOUT": "2.5",
+        "OMNI_READ_TIMEOUT": "30",
+        "OMNI_HTTP2": "yes",
+    })
+
+    assert config.api_key == "sk-test"
+    assert config.base_url == "http://localhost:9999/api/v1"
+    assert config.timeout.connect == 2.5
+    assert config.timeout.read == 30.0
+    assert config.http2 is True
+
+
+def test_astream_chat_reuses_one_keepalive_connection(sse_server):
+    sse_server.responses = [sse_body([{"content": "hi"}]), sse_body([{"content": "again"}])]
+    transport = ModelTransport(TransportConfig(base_url=sse_server.base_url, api_key="sk-test"))
+
+    async def run():
+        try:
+            warmed = await transport.aprewarm()
+            bodies = []
+            for _ in range(2):
+                async with transport.astream_chat({"model": "m", "messages": [], "stream": True}) as response:
+                    bodies.append([line async for line in response.aiter_lines() if line])
+            return warmed, bodies
+        finally:
+            await transport.aclose()
+
+    warmed, bodies = asyncio.run(run())
+    assert warmed is True
+    assert bodies[0][0].startswith('data: {"choices"')
+    assert bodies[1][-1] == "data: [DONE]"
+    assert len(sse_server.requests) == 2
+    assert sse_server.connections == 1
+
+
+def test_prewarm_reports_unreachable_host():
+    transport = ModelTransport(TransportConfig(base_url="http://127.0.0.1:1", connect_timeout=0.5))
+
+    assert asyncio.run(transport.aprewarm()) is False
@@ -0,0 +1,114 @@
+import asyncio
+import base64
+import random
+from io import BytesIO
+
+import pytest
+
+pytest.importorskip("httpx")
+Image = pytest.importorskip("PIL.Image")
+
+from forge.media import ImageFailure, ImageLimits, ImagePipeline, PreparedImage, sniff_format  # noqa: E402
+import forge.media.images as images_module  # noqa: E402
+
+
+def png_bytes(width: int, height: int, noisy: bool = False) -> bytes:
+    image = Image.new("RGB", (width, height), (30, 120, 200))
+    if noisy:
+        image = Image.frombytes("RGB", (width, height), random.Random(width).randbytes(width * height * 3))
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def decode(prepared: PreparedImage):
+    header, payload = prepared.url.split(",", 1)
+    assert header.startswith(f"data:image/{prepared.format};base64")
+    return Image.open(BytesIO(base64.b64decode(payload)))
+
+
+def run(pipeline: ImagePipeline, sources: list[str]):
+    async def go():
+        try:
+            return await pipeline.prepare_all(sources)
+        finally:
+            await pipeline.aclose()
+
+    return asyncio.run(go())
+
+
+def test_oversized_local_image_is_downscaled(tmp_path):
+    path = tmp_path / "shot.png"
+    path.write_bytes(png_bytes(3000, 1000))
+    (image,) = run(ImagePipeline(ImageLimits(max_dimension=1024)), [str(path)])
+
+    assert image.resized and image.original_size == (3000, 1000)
+    assert decode(image).size == (1024, 341)
+
+
+def test_byte_budget_forces_reencode(tmp_path):
+    path = tmp_path / "noise.png"
+    path.write_bytes(png_bytes(600, 600, noisy=True))
+    (image,) = run(ImagePipeline(ImageLimits(max_dimension=4096, max_bytes=60_000)), [str(path)])
+
+    assert image.resized and image.size <= 60_000 and image.format == "jpeg"
+
+
+def test_same_content_is_encoded_once(tmp_path, monkeypatch):
+    data = png_bytes(64, 64)
+    (tmp_path / "a.png").write_bytes(data)
+    (tmp_path / "b.png").write_bytes(data)
+    calls = []
+    real = images_module.shrink_image
+    monkeypatch.setattr(images_module, "shrink_image", lambda *args: calls.append(1) or real(*args))
+    pipeline = ImagePipeline()
+
+    async def go():
+        first = await pipeline.prepare_all([str(tmp_path / "a.png")])
+        second = await pipeline.prepare_all([str(tmp_path / "b.png")])
+        return first + second
+
+    first, second = asyncio.run(go())
+    assert len(calls) == 1
+    assert second.cached and second.url == first.url and second.source.endswith("b.png")
+
+
+def test_invalid_sources_fail_without_stopping_the_rest(tmp_path):
+    (tmp_path / "notes.txt").write_text("not an image")
+    (tmp_path / "ok.png").write_bytes(png_bytes(10, 10))
+    results = run(ImagePipeline(), [str(tmp_path / "notes.txt"), str(tmp_path / "missing.png"), str(tmp_path / "ok.png")])
+
+    assert [type(result) for result in results] == [ImageFailure, ImageFailure, PreparedImage]
+    assert results[1].error == "file not found"
+    assert sniff_format(b"GIF89a....") == "gif" and sniff_format(b"RIFF\0\0\0\0WEBPVP8 ") == "webp"
+
+
+def test_decompression_bombs_and_bad_urls_fail_per_item(tmp_path, monkeypatch):
+    from PIL import Image
+
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    (tmp_path / "bomb.png").write_bytes(png_bytes(100, 100))
+    (tmp_path / "ok.png").write_bytes(png_bytes(10, 10))
+    results = run(ImagePipeline(), [str(tmp_path / "bomb.png"), "http://[::1/x.png", str(tmp_path / "ok.png")])
+
+    assert [type(result) for result in results] == [ImageFailure, ImageFailure, PreparedImage]
+    assert "too large" in results[0].error
+
+
+def test_urls_are_probed_and_only_large_ones_downloaded(sse_server):
+    sse_server.pages = {
+        "/small.png": png_bytes(40, 40),
+        "/wide.png": png_bytes(900, 300),  # Few bytes but too many pixels
+        "/big.png": png_bytes(200, 200, noisy=True),  # Few pixels but too many bytes
+        "/page": b"<html></html>",
+    }
+    base = sse_server.base_url
+    small, wide, big, page = run(
+        ImagePipeline(ImageLimits(max_dimension=300, max_bytes=50_000)),
+        [f"{base}/small.png", f"{base}/wide.png", f"{base}/big.png", f"{base}/page"],
+    )
+
+    assert small.url == f"{base}/small.png" and (small.width, small.height) == (40, 40)
+    assert wide.resized and decode(wide).size == (300, 100)
+    assert big.resized and big.size <= 50_000
+    assert isinstance(page, ImageFailure)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+
+from forge.search import SearchCache, SearchResult, SearchService, normalize_query
+
+
+class FakeBackend:
+    """Offline provider returning ``total`` numbered results per query."""
+
+    def __init__(self, total: int = 30) -> None:
+        self.total = total
+        self.calls: list[tuple[str, int]] = []
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        self.calls.append((query, max_results))
+        count = min(max_results, self.total)
+        return [SearchResult(f"{query} {index}", f"https://example.com/{index}", "snippet") for index in range(count)]
+
+
+def test_fetches_only_what_is_used_and_caches_by_normalized_query():
+    backend = FakeBackend()
+    service = SearchService(backend, page_size=8)
+
+    async def run():
+        first = await service.results("Python  asyncio")
+        again = await service.results("  python ASYNCIO ")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert backend.calls == [("Python  asyncio", 8)]
+    assert len(first) == 8 and again == first
+    assert (service.hits, service.misses) == (1, 1)
+    assert normalize_query(" A\tB  c ") == "a b c"
+
+
+def test_paging_extends_lazily_and_stops_when_exhausted():
+    backend = FakeBackend(total=12)
+    service = SearchService(backend, page_size=8)
+
+    async def run():
+        return [await service.page("q", number) for number in range(3)] + [await service.page("q", 1)]
+
+    page0, page1, page2, page1_again = asyncio.run(run())
+    assert [result.url[-1] for result in page0] == list("01234567")
+    assert len(page1) == 4 and page1 == page1_again
+    assert page2 == []
+    assert backend.calls == [("q", 8), ("q", 16)]
+
+
+def test_distinct_queries_with_shared_prefix_do_not_collide():
+    service = SearchService(FakeBackend())
+
+    async def run():
+        return await service.results("rust async runtime"), await service.results("rust async traits")
+
+    runtime, traits = asyncio.run(run())
+    assert runtime[0].title.startswith("rust async runtime") and traits[0].title.startswith("rust async traits")
+
+
+def test_cache_persists_across_instances_and_expires(tmp_path, monkeypatch):
+    import forge.search.cache as cache_module
+
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    path = str(tmp_path / "search.sqlite")
+    SearchCache(path, ttl_seconds=60).put("query", [SearchResult("t", "u")], exhausted=True)
+
+    reopened = SearchCache(path, ttl_seconds=60)
+    assert reopened.get("QUERY").results == [SearchResult("t", "u")]
+    clock[0] += 61
+    assert reopened.get("query") is None
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from forge.search import SearchResult, SearchService, fan_out, normalize_url
+
+
+class SlowBackend:
+    """Fake provider with per-query latency and scripted URLs."""
+
+    def __init__(self, scripted: dict[str, tuple[float, list[str]]]) -> None:
+        self.scripted = scripted
+        self.in_flight = 0
+        self.peak = 0
+
+    async def search(self, query: str, max_results: int) -> list[SearchResult]:
+        delay, urls = self.scripted[query]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+            if not urls:
+                raise RuntimeError("rate limited")
+            return [SearchResult(f"{query}: {url}", url) for url in urls[:max_results]]
+        finally:
+            self.in_flight -= 1
+
+
+def test_wall_time_tracks_slowest_query():
+    backend = SlowBackend({f"q{index}": (0.1 + index * 0.02, [f"https://site/{index}"]) for index in range(5)})
+
+    async def run():
+        start = time.perf_counter()
+        report = await fan_out(SearchService(backend), list(backend.scripted), concurrency=5)
+        return time.perf_counter() - start, report
+
+    elapsed, report = asyncio.run(run())
+    assert elapsed < 0.3  # Serial would be ~0.7s
+    assert len(report.merged) == 5 and backend.peak == 5
+
+
+def test_concurrency_cap_is_respected():
+    backend = SlowBackend({f"q{index}": (0.02, ["https://a"]) for index in range(6)})
+    asyncio.run(fan_out(SearchService(backend), list(backend.scripted), concurrency=2))
+    assert backend.peak == 2
+
+
+def test_merge_dedupes_by_normalized_url_and_ranks_by_frequency():
+    backend = SlowBackend({
+        "one": (0, ["https://solo.dev/a", "https://www.shared.dev/page/?utm_source=x", "https://both.dev#intro"]),
+        "two": (0, ["http://shared.dev/page", "https://both.dev/"]),
+        "three": (0, ["https://shared.dev/page?fbclid=1"]),
+    })
+    report = asyncio.run(fan_out(SearchService(backend), ["one", "two", "three", "one"]))
+
+    assert report.queries == ["one", "two", "three"]
+    assert [len(item.queries) for item in report.merged] == [3, 2, 1]
+    assert "shared.dev" in report.merged[0].result.url and "both.dev" in report.merged[1].result.url
+    block = report.render()
+    assert block.count("\n") == 4 and "[3 queries]" in block
+
+
+def test_failed_query_does_not_sink_the_others():
+    backend = SlowBackend({"ok": (0, ["https://a"]), "bad": (0, [])})
+    report = asyncio.run(fan_out(SearchService(backend), ["ok", "bad"]))
+    assert list(report.per_query) == ["ok"] and isinstance(report.errors["bad"], RuntimeError)
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://WWW.Example.com/a/?b=2&a=1&utm_medium=m#top") == "//example.com/a?a=1&b=2"
+    assert normalize_url("http://example.com/a") == normalize_url("https://example.com/a/")
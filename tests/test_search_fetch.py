@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from forge.search import Document, FetchFailure, PageFetcher, extract_text, render_documents  # noqa: E402
+
+
+PAGE = b"""<html><head><title>Async  IO</title><style>body{}</style></head>
+<body><nav>Home | Docs</nav><h1>Event loops</h1><p>An event loop runs tasks.</p>
+<script>var x = 1;</script><p>Coroutines &amp; futures.</p><footer>(c) site</footer></body></html>"""
+
+
+def test_extract_text_keeps_readable_content():
+    title, text = extract_text(PAGE.decode())
+    assert title == "Async IO"
+    assert text == "Event loops\n\nAn event loop runs tasks.\n\nCoroutines & futures."
+
+
+def test_fetch_all_respects_per_host_limit_and_keeps_order(sse_server):
+    sse_server.frame_delay = 0.05
+    sse_server.pages = {f"/p{index}": PAGE for index in range(6)}
+    urls = [f"{sse_server.base_url}/p{index}" for index in range(6)] + [f"{sse_server.base_url}/missing"]
+
+    async def run():
+        fetcher = PageFetcher(per_host=2)
+        try:
+            return await fetcher.fetch_all(urls)
+        finally:
+            await fetcher.aclose()
+
+    results = asyncio.run(run())
+    assert sse_server.peak_gets == 2
+    assert [doc.url for doc in results] == urls
+    assert all(isinstance(doc, Document) and doc.title == "Async IO" for doc in results[:6])
+    assert isinstance(results[6], FetchFailure) and "404" in results[6].error
+
+
+def test_malformed_url_fails_without_stopping_the_rest(sse_server):
+    sse_server.pages = {"/ok": PAGE}
+
+    async def run():
+        fetcher = PageFetcher()
+        try:
+            return await fetcher.fetch_all(["http://[::1", f"{sse_server.base_url}/ok"])
+        finally:
+            await fetcher.aclose()
+
+    bad, good = asyncio.run(run())
+    assert isinstance(bad, FetchFailure) and isinstance(good, Document)
+
+
+def test_fetcher_built_outside_a_loop_works_across_runs(sse_server):
+    sse_server.frame_delay = 0.02
+    sse_server.pages = {f"/p{index}": PAGE for index in range(3)}
+    urls = [f"{sse_server.base_url}/p{index}" for index in range(3)]
+    fetcher = PageFetcher(max_concurrency=1, per_host=1, cache_size=0)
+
+    async def run():
+        try:
+            return await fetcher.fetch_all(urls)
+        finally:
+            await fetcher.aclose()
+
+    for _ in range(2):
+        assert all(isinstance(doc, Document) for doc in asyncio.run(run()))
+
+
+def test_repeat_fetch_revalidates_with_etag(sse_server):
+    sse_server.pages = {"/doc": PAGE}
+    url = f"{sse_server.base_url}/doc"
+
+    async def run():
+        fetcher = PageFetcher()
+        try:
+            return await fetcher.fetch(url), await fetcher.fetch(url)
+        finally:
+            await fetcher.aclose()
+
+    first, second = asyncio.run(run())
+    assert sse_server.gets[0][1] is None and sse_server.gets[1][1] == first.etag
+    assert second.revalidated and second.text == first.text
+
+
+def test_size_cap_truncates_body(sse_server):
+    sse_server.pages = {"/big": b"<p>" + b"word " * 50_000 + b"</p>"}
+
+    async def run():
+        fetcher = PageFetcher(max_bytes=10_000)
+        try:
+            return await fetcher.fetch(f"{sse_server.base_url}/big")
+        finally:
+            await fetcher.aclose()
+
+    document = asyncio.run(run())
+    assert document.truncated and len(document.text) <= 10_000
+
+
+def test_render_documents_shares_token_budget():
+    docs = [Document(f"https://s/{index}", f"Doc {index}", ("Sentence here. " * 400)) for index in range(4)]
+    block = render_documents(docs, token_budget=400)
+    assert block.count("Fetched page:") == 4
+    assert len(block) < 400 * 4 + 400
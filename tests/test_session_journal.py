@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from forge.session import SessionJournal, decode_record, encode_record, is_journal, latest_session
+import forge.session.journal as journal_module
+
+
+def turns(count, start=0):
+    history = []
+    for index in range(start, start + count):
+        history += [{"role": "user", "content": f"q{index}"}, {"role": "assistant", "content": f"a{index}"}]
+    return history
+
+
+def test_sync_appends_only_new_messages(tmp_path):
+    journal = SessionJournal(str(tmp_path / "s.jsonl"))
+    history = [{"role": "system", "content": "sys"}] + turns(2)
+
+    assert journal.sync(history) == 4
+    history += turns(1, start=2)
+    assert journal.sync(history) == 2 and len(journal) == 6
+    assert history[0] == {"role": "system", "content": "sys"}  # Never journaled
+    assert journal.read(5) == {"role": "assistant", "content": "a2"}
+
+
+def test_tail_reads_only_the_last_turns(tmp_path, monkeypatch):
+    path = str(tmp_path / "s.jsonl")
+    journal = SessionJournal(path)
+    journal.sync(turns(5000))
+    journal.close()
+
+    decoded = []
+    real = journal_module.decode_record
+    monkeypatch.setattr(journal_module, "decode_record", lambda line: decoded.append(1) or real(line))
+    resumed = SessionJournal(path)
+    tail = resumed.tail(3)
+
+    assert [message["content"] for message in tail] == ["q4997", "a4997", "q4998", "a4998", "q4999", "a4999"]
+    assert len(decoded) == 6 and tail[0]["_j"] == 9994
+    assert resumed.sync(tail) == 0
+
+
+def test_reset_bounds_the_tail(tmp_path):
+    journal = SessionJournal(str(tmp_path / "s.jsonl"))
+    journal.sync(turns(3))
+    journal.mark_reset()
+    journal.sync(turns(1, start=3) + [{"role": "user", "content": "pending"}])
+
+    assert [message["content"] for message in journal.tail(10)] == ["q3", "a3", "pending"]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_large_records_are_compressed(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    message = {"role": "user", "content": "repeated text " * 1000, "_pinned": True}
+    line = encode_record(message, compression)
+
+    assert json.loads(line)["_z"] == compression and len(line) < 1000
+    assert decode_record(line) == message
+    assert decode_record(encode_record({"role": "user", "content": "tiny"}, compression)) == {"role": "user", "content": "tiny"}
+
+
+def test_torn_write_and_missing_index_are_recovered(tmp_path):
+    path = tmp_path / "s.jsonl"
+    journal = SessionJournal(str(path), compression="gzip")
+    journal.sync(turns(3))
+    journal.close()
+    (tmp_path / "s.jsonl.idx").unlink()
+    with open(path, "ab") as handle:
+        handle.write(b'{"role":"user","con')
+
+    recovered = SessionJournal(str(path), compression="gzip")
+    assert len(recovered) == 6 and recovered.tail(1)[-1]["content"] == "a2"
+    recovered.append({"role": "user", "content": "after"})
+    assert recovered.read(6)["content"] == "after"
+    assert is_journal(str(path)) and latest_session(str(tmp_path)) == str(path)
+
+
+def test_unused_journal_is_never_created_or_resumed(tmp_path):
+    used = SessionJournal(str(tmp_path / "session-1.jsonl"))
+    used.sync([{"role": "user", "content": "hi"}])
+    used.close()
+    idle = SessionJournal(str(tmp_path / "session-2.jsonl"))
+    assert len(idle) == 0 and idle.tail(5) == []
+    idle.close()
+
+    assert not (tmp_path / "session-2.jsonl").exists()
+    (tmp_path / "session-3.jsonl").touch()  # Left behind by an older version
+    assert latest_session(str(tmp_path)) == str(tmp_path / "session-1.jsonl")
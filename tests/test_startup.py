@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+for dependency in ("dotenv", "colorama", "httpx"):
+    pytest.importorskip(dependency)
+
+ROOT = Path(__file__).resolve().parents[1]
+# Cumulative `-X importtime` of `import main`; override on slow machines
+COLD_BUDGET_MS = float(os.getenv("OMNI_IMPORT_BUDGET_COLD_MS", "1500"))
+WARM_BUDGET_MS = float(os.getenv("OMNI_IMPORT_BUDGET_WARM_MS", "400"))
+# Loaded on first use by the command that needs them, never at startup
+LAZY_MODULES = ("atproto", "PIL", "duckduckgo_search", "prompt_toolkit")
+
+
+def import_main(tmp_path, pycache):
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    env.update(PYTHONPATH=str(ROOT), PYTHONPYCACHEPREFIX=str(pycache))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=tmp_path, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+@pytest.fixture(scope="module")
+def startup(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("startup")
+    pycache = tmp_path_factory.mktemp("pyc")
+    cold = import_main(tmp_path, pycache)
+    warm = import_main(tmp_path, pycache)
+    return cold, warm, sorted(path.name for path in tmp_path.iterdir())
+
+
+def test_heavy_dependencies_are_not_imported_at_startup(startup):
+    _, warm, _ = startup
+    loaded = sorted(name for name in warm if name.split(".")[0] in LAZY_MODULES)
+    assert loaded == []
+
+
+def test_import_time_within_budgets(startup):
+    cold, warm, _ = startup
+    assert cold["main"] < COLD_BUDGET_MS, f"cold import of main took {cold['main']:.0f} ms"
+    assert warm["main"] < WARM_BUDGET_MS, f"warm import of main took {warm['main']:.0f} ms"
+
+
+def test_startup_creates_no_files(startup):
+    _, _, created = startup
+    assert created == []  # Caches, undo stores and journals are opened by the commands that use them